@@ -1,36 +1,34 @@
-
 import sys
 import collections
 
+from inp_index import load_index, print_stats
+
 def analyze_inp(filename):
     print(f"Analyzing {filename}...")
     keywords = collections.defaultdict(list)
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for i, line in enumerate(f, 1):
-                stripped = line.strip()
-                if stripped.startswith('*'):
-                    # Get the keyword (up to the first comma)
-                    keyword = stripped.split(',')[0]
-                    if len(keywords[keyword]) < 3: # Store first 3 locations
-                        keywords[keyword].append(i)
-                    
-                    if keyword.lower() == '*element':
-                        # Try to extract type
-                        if 'type=' in stripped.lower():
-                            parts = stripped.split(',')
-                            for p in parts:
-                                if 'type=' in p.lower():
-                                    print(f"Found Element Type at {i}: {p.strip()}")
-                                    break
+        # Keyword blocks (header text, line number, byte range) come from the keyword index
+        index = load_index(filename)
+        for block in index['blocks']:
+            stripped, i = block['header'], block['line']
+            # Get the keyword (up to the first comma)
+            keyword = stripped.split(',')[0]
+            if len(keywords[keyword]) < 3: # Store first 3 locations
+                keywords[keyword].append(i)
+            
+            if keyword.lower() == '*element' and block['type']:
+                print(f"Found Element Type at {i}: {block['type']} ({block['lines']} lines)")
 
     except Exception as e:
         print(f"Error: {e}")
+        return
 
     print("\nSubject Keywords found:")
     for k, v in keywords.items():
         print(f"{k}: found at lines {v}...")
+    print()
+    print_stats(index)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Converter benchmark on synthetic decks (synth_mesh.py)
+
+For every size (total tets) a deck is generated once into --workdir and the
+phases below are timed (best of --repeat runs); each phase then runs a second time under tracemalloc
+for its peak Python/NumPy allocation (memory-mapped files are not counted),
+so the tracing overhead never shows in the timings:
+
+    parse_inp_file          legacy line parser (up to LEGACY_MAX tets)
+    parse_inp_file_fast     memory-mapped NumPy parser (--fast, no cache)
+    extract_surface_faces   legacy extractor on the Material part (up to LEGACY_MAX)
+    extract_surfaces_np     vectorized Punch / Material / Die extraction
+    write_starter_file      full starter deck from the fast parse
+    clean_vtk               fix_vtk on an ASCII frame of the mesh with nan/inf values
+
+Results go to a JSON file; --compare old.json new.json prints the ratios and
+exits with 1 when a phase got slower or bigger than --tolerance.
+
+    python bench.py --sizes 1e4 1e5 1e6 --json bench_results.json
+    python bench.py --compare bench_base.json bench_results.json
+
+--no-memory skips the second (traced) run.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+LEGACY_MAX = 1_000_000      # tets; the pure-Python phases are skipped above this
+REPEAT = 3                  # timed runs per phase, the best one is kept
+PHASES = ('parse_inp_file', 'parse_inp_file_fast', 'extract_surface_faces', 'extract_surfaces_np',
+          'write_starter_file', 'clean_vtk')
+
+
+def write_vtk_frame(path, nodes, elements, bad_every=997):
+    """ASCII legacy VTK of the tets with one cell scalar, every bad_every-th value non-finite."""
+    from inp_fast import node_arrays
+    ids, xyz = node_arrays(nodes)
+    conn = np.searchsorted(ids, np.asarray(elements.conn))
+    n, e = len(ids), len(conn)
+    with open(path, 'w') as f:
+        f.write(f"# vtk DataFile Version 3.0\nbench frame\nASCII\nDATASET UNSTRUCTURED_GRID\nPOINTS {n} float\n")
+        for a in range(0, n, 1 << 16):
+            rows = xyz[a:a + (1 << 16)]
+            f.write(("%.6g %.6g %.6g\n" * len(rows)) % tuple(rows.ravel().tolist()))
+        f.write(f"CELLS {e} {5 * e}\n")
+        for a in range(0, e, 1 << 16):
+            rows = conn[a:a + (1 << 16)]
+            f.write(("4 %d %d %d %d\n" * len(rows)) % tuple(rows.ravel().tolist()))
+        f.write(f"CELL_TYPES {e}\n" + "10\n" * e)
+        values = [f"{v:.6g}" for v in np.linspace(0.0, 1.0, e)]
+        for k in range(0, e, bad_every):
+            values[k] = ('nan', 'inf', '-nan(ind)', '-1.#INF')[(k // bad_every) % 4]
+        f.write(f"CELL_DATA {e}\nSCALARS EPSP float 1\nLOOKUP_TABLE default\n" + "\n".join(values) + "\n")
+
+
+def measure(results, name, func, memory=True, repeat=REPEAT, setup=None):
+    """Run func() quietly, record the best of `repeat` timings and the peak MB
+    under results[name]; setup() runs untimed before every call. Returns the
+    value of the last call."""
+    seconds = float('inf')
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = func()
+        seconds = min(seconds, time.perf_counter() - t0)
+    entry = {'seconds': round(seconds, 4)}
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            entry['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        finally:
+            tracemalloc.stop()
+    results[name] = entry
+    print(f"    {name:24s} {seconds:9.3f} s" + (f"  {entry['peak_mb']:9.1f} MB" if memory else ""))
+    return value
+
+
+def bench_size(size, workdir, phases=PHASES, memory=True, repeat=REPEAT):
+    from inp2radioss_v6 import extract_surface_faces, parse_inp_file, write_starter_file
+    from inp_fast import element_rows, node_arrays
+    from strip_model import role_of_elset
+    from surface_fast import extract_surfaces
+    import fix_vtk
+    import synth_mesh
+
+    deck = os.path.join(workdir, f"synth_{size}.inp")
+    if not os.path.exists(deck):
+        synth_mesh.write_deck(deck, size)
+    out = {'deck': os.path.basename(deck), 'deck_mb': round(os.path.getsize(deck) / 1e6, 2), 'phases': {}}
+    res = out['phases']
+    legacy = size <= LEGACY_MAX
+    print(f"  {size} tets ({out['deck_mb']} MB)")
+
+    if legacy and 'parse_inp_file' in phases:
+        nodes, elements, elsets = measure(res, 'parse_inp_file', lambda: parse_inp_file(deck), memory, repeat)
+        if 'extract_surface_faces' in phases:
+            material = [e for name, ids in elsets.items() if role_of_elset(name) == 'MATERIAL' for e in ids]
+            measure(res, 'extract_surface_faces', lambda: extract_surface_faces(elements, material, nodes), memory, repeat)
+        del nodes, elements, elsets
+    nodes, elements, elsets = measure(res, 'parse_inp_file_fast', lambda: parse_inp_file(deck, fast=True), memory, repeat)
+    out['nodes'], out['elements'] = len(nodes), len(elements.ids)
+    if 'extract_surfaces_np' in phases:
+        ids, xyz = node_arrays(nodes)
+        by_role = {}
+        for name, eids in elsets.items():
+            by_role.setdefault(role_of_elset(name), []).append(element_rows(elements, eids))
+        conn = {r: np.concatenate(by_role[r]) for r in ('PUNCH', 'MATERIAL', 'DIE') if r in by_role}
+        measure(res, 'extract_surfaces_np', lambda: extract_surfaces(conn, ids, xyz), memory, repeat)
+    if 'write_starter_file' in phases:
+        rad = os.path.join(workdir, f"synth_{size}_0000.rad")
+        measure(res, 'write_starter_file', lambda: write_starter_file(rad, nodes, elements, elsets), memory, repeat)
+        out['rad_mb'] = round(os.path.getsize(rad) / 1e6, 2)
+        os.remove(rad)
+    if 'clean_vtk' in phases:
+        # clean_vtk fixes the frame in place: every run starts from a fresh copy
+        src = os.path.join(workdir, f"synth_{size}_src.vtk")
+        vtk = os.path.join(workdir, f"synth_{size}.vtk")
+        write_vtk_frame(src, nodes, elements)
+        out['vtk_mb'] = round(os.path.getsize(src) / 1e6, 2)
+        measure(res, 'clean_vtk', lambda: fix_vtk.clean_vtk(vtk), memory, repeat,
+                setup=lambda: shutil.copyfile(src, vtk))
+        os.remove(vtk)
+        os.remove(src)
+    return out
+
+
+def compare(old, new, tolerance):
+    """Print new / old time and memory ratios; returns the list of regressions."""
+    slower = []
+    print(f"  {'size':>10s} {'phase':24s} {'old s':>9s} {'new s':>9s} {'ratio':>7s}")
+    for size, run in new['sizes'].items():
+        base = old['sizes'].get(size)
+        if base is None:
+            continue
+        for phase, r in run['phases'].items():
+            b = base['phases'].get(phase)
+            if not b:
+                continue
+            ratio = r['seconds'] / b['seconds'] if b['seconds'] else float('inf')
+            flag = ""
+            if ratio > tolerance:
+                flag = "  SLOWER"
+                slower.append((size, phase, ratio))
+            mem = ""
+            if r.get('peak_mb') and b.get('peak_mb'):
+                mem = f"  {b['peak_mb']:.1f} -> {r['peak_mb']:.1f} MB"
+                if r['peak_mb'] / b['peak_mb'] > tolerance:
+                    flag += "  BIGGER"
+                    slower.append((size, phase + ' memory', r['peak_mb'] / b['peak_mb']))
+            print(f"  {size:>10s} {phase:24s} {b['seconds']:9.3f} {r['seconds']:9.3f} {ratio:7.2f}{mem}{flag}")
+    return slower
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the converter on synthetic decks")
+    ap.add_argument("--sizes", type=float, nargs="+", default=[1e4, 1e5, 1e6], help="deck sizes (tets)")
+    ap.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    ap.add_argument("--workdir", default="bench_decks", help="generated decks are kept here")
+    ap.add_argument("--json", default="bench_results.json", help="results file")
+    ap.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per phase (best is kept)")
+    ap.add_argument("--no-memory", action="store_true", help="skip tracemalloc (plain timings)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None,
+                    help="compare two results files instead of running")
+    ap.add_argument("--tolerance", type=float, default=1.2, help="slower-than ratio reported as a regression")
+    args = ap.parse_args()
+    if args.compare:
+        old, new = [json.load(open(p, 'r', encoding='utf-8')) for p in args.compare]
+        slower = compare(old, new, args.tolerance)
+        print(f"{len(slower)} regression(s) above x{args.tolerance}")
+        return 1 if slower else 0
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpus",
+        'memory': not args.no_memory,
+        'sizes': {},
+    }
+    for size in (int(s) for s in args.sizes):
+        results['sizes'][str(size)] = bench_size(size, args.workdir, args.phases, not args.no_memory,
+                                                 max(1, args.repeat))
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+    print(f"Results written: {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
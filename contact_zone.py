@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Contact-zone localization of the TYPE7 interfaces
+
+Only a band around the cutting edges ever comes into contact, but the
+converter puts every Material skin node into the slave group and the full
+Punch / Die skins into the master surfaces. localize_interface() keeps the
+slave nodes and master faces that lie within a band around the opposing
+side (spatial_index.UniformGrid): a margin in every direction, stretched by
+the punch stroke (read from the velocity /FUNCT) along the stroke axis.
+"""
+
+import numpy as np
+
+from spatial_index import UniformGrid
+
+
+def table_stroke(points, t_end):
+    """Travel |integral v dt| over [0, t_end] of a piecewise-linear (t, v) table."""
+    t = np.array([p[0] for p in points], dtype=np.float64)
+    v = np.array([p[1] for p in points], dtype=np.float64)
+    inner = t[(t > 0.0) & (t < t_end)]
+    tt = np.concatenate([[0.0], inner, [t_end]])
+    vv = np.interp(tt, t, v)
+    return abs(float(np.sum(0.5 * (vv[1:] + vv[:-1]) * np.diff(tt))))
+
+
+def _face_points(faces, node_ids, coords):
+    """Vertices and centroids of (F,3) faces, so large faces are not missed."""
+    xyz = coords[np.searchsorted(node_ids, faces)]
+    return np.concatenate([xyz.reshape(-1, 3), xyz.mean(axis=1)])
+
+
+def localize_interface(slave_nodes, master_faces, node_ids, coords, margin, stroke=0.0, axis=2):
+    """(slave_nodes, master_faces) reduced to the entities inside the band of
+    the other side: ellipsoid with semi-axes margin and margin + stroke (along
+    `axis`), all in mm. A face is kept when a vertex or its centroid is."""
+    slave_nodes = np.asarray(slave_nodes)
+    master_faces = np.asarray(master_faces)
+    if not len(slave_nodes) or not len(master_faces):
+        return slave_nodes, master_faces
+    # Shrink the stroke axis so the band becomes a sphere of radius margin
+    coords = np.array(coords, dtype=np.float64)
+    coords[:, axis] *= margin / (margin + stroke)
+    slave_xyz = coords[np.searchsorted(node_ids, slave_nodes)]
+    master_grid = UniformGrid(_face_points(master_faces, node_ids, coords), cell=margin / 3.0)
+    kept_nodes = slave_nodes[master_grid.within(slave_xyz, margin)]
+
+    slave_grid = UniformGrid(slave_xyz, cell=margin / 3.0)
+    n = len(master_faces)
+    hit = slave_grid.within(_face_points(master_faces, node_ids, coords), margin)
+    near = hit[:3 * n].reshape(n, 3).any(axis=1) | hit[3 * n:]
+    return kept_nodes, master_faces[near]
+
+
+def print_report(report, margin, stroke):
+    print(f"  Contact zone: {margin:.3f} mm margin, {margin + stroke:.3f} mm along the stroke")
+    for name, (before, after) in report.items():
+        pct = 100.0 * (1.0 - after / before) if before else 0.0
+        print(f"    {name:28s} {before:9d} -> {after:9d}  (-{pct:.1f} %)")
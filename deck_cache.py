@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Content-addressed block cache for incremental deck generation
+
+In a parameter sweep over one mesh only the small parameter cards change
+(/FUNCT, /MAT, /INTER, ...), yet /NODE, /TETRA4, /SH3N and /GRNOD make up
+nearly all of the deck. write_starter_file(block_cache=BlockCache(dir))
+renders each of these geometry blocks once, stores the text under the sha1
+of the writer name and its input arrays, and assembles later decks by
+copying the cached files between the freshly written parameter cards.
+The skin-face extraction is cached the same way (.npz of the face arrays).
+
+The output is byte-identical to an uncached write. Blocks are written to a
+temporary file and renamed, so concurrent sweep jobs can share one cache.
+There is no eviction: delete the directory to reclaim the space.
+
+    python deck_cache.py deck.inp     (cached == uncached check, also with an empty Die part)
+"""
+
+import contextlib
+import filecmp
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from rad_writer import WRITE_BUFFER
+
+CACHE_VERSION = 1
+
+
+def _hash_update(h, value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        a = np.ascontiguousarray(value)
+        h.update(f"{a.dtype.str}{a.shape}".encode('ascii'))
+        # Empty arrays (a part without elements) cannot be cast; the shape says it all
+        if a.size:
+            h.update(memoryview(a).cast('B'))
+    else:
+        h.update(repr(value).encode('utf-8'))
+
+
+class BlockCache:
+    """Directory of rendered deck blocks keyed by the hash of their inputs."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.hits = self.misses = 0
+        self.bytes_reused = 0
+
+    def key(self, name, args):
+        h = hashlib.sha1(f"{CACHE_VERSION}:{name}".encode('ascii'))
+        for a in args:
+            _hash_update(h, a)
+        return h.hexdigest()
+
+    def _path(self, key, ext):
+        sub = os.path.join(self.root, key[:2])
+        os.makedirs(sub, exist_ok=True)
+        return os.path.join(sub, key + ext)
+
+    def _tmp(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def write(self, f, writer, *args):
+        """Append writer(f, *args) to the text file f, from the cache when possible."""
+        path = self._path(self.key(writer.__name__, args), '.blk')
+        if os.path.exists(path):
+            self.hits += 1
+            self.bytes_reused += os.path.getsize(path)
+        else:
+            self.misses += 1
+            tmp = self._tmp(path)
+            with open(tmp, 'w', buffering=WRITE_BUFFER) as out:
+                writer(out, *args)
+            os.replace(tmp, path)
+        # Same text mode on both sides, so the cached bytes can go straight to the buffer
+        f.flush()
+        with open(path, 'rb') as src:
+            shutil.copyfileobj(src, f.buffer, WRITE_BUFFER)
+
+    def arrays(self, name, args, compute):
+        """{key: array} computed by compute() and cached as .npz."""
+        path = self._path(self.key(name, args), '.npz')
+        if os.path.exists(path):
+            self.hits += 1
+            with np.load(path) as data:
+                return {k: data[k] for k in data.files}
+        self.misses += 1
+        result = compute()
+        tmp = self._tmp(path)
+        with open(tmp, 'wb') as out:
+            np.savez(out, **result)
+        os.replace(tmp, path)
+        return result
+
+    def print_stats(self):
+        print(f"  Block cache: {self.hits} reused ({self.bytes_reused / 1e6:.1f} MB), "
+              f"{self.misses} rendered ({self.root})")
+
+
+def verify(inp_path):
+    """Write the starter deck of inp_path without cache, into an empty cache
+    and from the filled cache, also with the Die elsets removed (empty part);
+    True when all decks are identical."""
+    from inp2radioss_v6 import DIE_ELSETS, parse_inp_file, write_starter_file
+    nodes, elements, elsets = parse_inp_file(inp_path, fast=True)
+    cases = {'full deck': elsets,
+             'empty Die part': {n: e for n, e in elsets.items() if n not in DIE_ELSETS}}
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BlockCache(os.path.join(tmp, 'blocks'))
+        for label, sets in cases.items():
+            paths = [os.path.join(tmp, f"{run}.rad") for run in ('plain', 'cold', 'warm')]
+            with contextlib.redirect_stdout(io.StringIO()):
+                for path, bc in zip(paths, (None, cache, cache)):
+                    write_starter_file(path, nodes, elements, sets, block_cache=bc)
+            same = all(filecmp.cmp(paths[0], p, shallow=False) for p in paths[1:])
+            ok = ok and same
+            print(f"  {label}: {'identical' if same else 'MISMATCH'} "
+                  f"({os.path.getsize(paths[0]) / 1e6:.2f} MB)")
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python deck_cache.py file.inp   (cached == uncached check)")
+        sys.exit(1)
+    sys.exit(0 if verify(sys.argv[1]) else 1)
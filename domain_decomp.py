@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Domain-decomposition preview: choosing -np / -nt without trial runs
+
+Partitions the tets into k domains by recursive coordinate bisection of the
+element centroids (each cut along the longest extent at the element-count
+quantile, so any k works) and reports, per k:
+  - element load balance (largest domain / mean)
+  - interface nodes (nodes shared by two or more domains), total and the
+    largest per-domain share
+  - contact imbalance: how the contact zone (Material skin nodes within the
+    contact band of the Punch / Die skins, contact_zone.localize_interface)
+    is spread over the domains
+
+The Starter does its own (graph) decomposition; RCB is a cheap geometric
+stand-in that is close enough to compare layouts. recommend() turns the
+table into a -np x -nt split of a core count with a rough cost model:
+MPI domains scale with the load and contact balance and pay for their
+interface nodes, OpenMP threads lose THREAD_OVERHEAD per extra thread.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from inp2radioss_v6 import PUNCH_VELOCITY, RUN_END_TIME
+from preflight_dt import part_rows
+from strip_model import element_centroids
+from surface_fast import extract_surface_faces_np
+
+# Rough cost model (fractions of the serial cycle time)
+CONTACT_SHARE = 0.3         # share of the cycle spent in the TYPE7 contact search
+THREAD_OVERHEAD = 0.12      # OpenMP efficiency lost per extra thread
+INTERFACE_COST = 4.0        # exchange cost of an interface node, in element updates
+
+
+def rcb_partition(points, k):
+    """(N,) domain index 0..k-1 of (N,3) points, recursive coordinate bisection."""
+    points = np.asarray(points, dtype=np.float64)
+    parts = np.zeros(len(points), dtype=np.int64)
+    stack = [(np.arange(len(points)), 0, k)]
+    while stack:
+        idx, first, kk = stack.pop()
+        if kk <= 1 or len(idx) == 0:
+            parts[idx] = first
+            continue
+        p = points[idx]
+        axis = int(np.argmax(np.ptp(p, axis=0)))
+        k1 = kk // 2
+        cut = int(round(len(idx) * k1 / kk))
+        order = np.argpartition(p[:, axis], cut - 1) if 0 < cut < len(idx) else np.arange(len(idx))
+        stack.append((idx[order[:cut]], first, k1))
+        stack.append((idx[order[cut:]], first + k1, kk - k1))
+    return parts
+
+
+def contact_nodes(mesh, margin=0.5):
+    """Material skin nodes inside the contact band of the Punch or Die skin."""
+    from contact_zone import localize_interface, table_stroke
+    node_ids = np.asarray(mesh['node_ids'])
+    coords = np.asarray(mesh['coords'])
+    conn = np.asarray(mesh['conn'])
+    rows = part_rows(mesh)
+    if 'MATERIAL' not in rows:
+        return np.zeros(0, dtype=np.int64)
+    skin = np.unique(extract_surface_faces_np(conn[rows['MATERIAL']], node_ids, coords))
+    stroke = 1000.0 * table_stroke(PUNCH_VELOCITY, RUN_END_TIME)
+    near = [np.zeros(0, dtype=np.int64)]
+    for role in ('PUNCH', 'DIE'):
+        if role in rows:
+            faces = extract_surface_faces_np(conn[rows[role]], node_ids, coords)
+            near.append(localize_interface(skin, faces, node_ids, coords, margin, stroke)[0])
+    return np.unique(np.concatenate(near))
+
+
+def domain_stats(parts, k, pos, n_nodes, contact_pos):
+    """Balance / interface / contact figures of one partition.
+    pos: (E,4) node positions of the tets; contact_pos: contact node positions."""
+    elems = np.bincount(parts, minlength=k)
+    # (node, domain) pairs: a node seen by more than one domain is an interface node
+    pairs = np.unique((pos * k + parts[:, None]).ravel())
+    node_of = pairs // k
+    shared = np.bincount(node_of, minlength=n_nodes) > 1
+    iface_pairs = pairs[shared[node_of]]
+    iface_per_domain = np.bincount(iface_pairs % k, minlength=k)
+    # Contact nodes belong to the lowest domain that sees them
+    owner = np.full(n_nodes, k, dtype=np.int64)
+    np.minimum.at(owner, node_of, pairs % k)
+    contact = np.bincount(owner[contact_pos], minlength=k + 1)[:k]
+    return {
+        'k': k,
+        'elements_max': int(elems.max()),
+        'load_imbalance': float(elems.max() / elems.mean()),
+        'interface_nodes': int(shared.sum()),
+        'interface_max': int(iface_per_domain.max()),
+        'contact_nodes_max': int(contact.max()),
+        'contact_domains': int(np.count_nonzero(contact)),
+        'contact_imbalance': float(contact.max() / contact.mean()) if contact.sum() else 1.0,
+    }
+
+
+def preview(mesh, ks, margin=0.5):
+    """Model size and the domain_stats of every k in ks."""
+    node_ids = np.asarray(mesh['node_ids'])
+    pos = np.searchsorted(node_ids, np.asarray(mesh['conn']))
+    centroids = element_centroids(mesh)
+    contact_pos = np.searchsorted(node_ids, contact_nodes(mesh, margin))
+    rows = []
+    for k in sorted(set(ks)):
+        rows.append(domain_stats(rcb_partition(centroids, k), k, pos, len(node_ids), contact_pos))
+    return {'elements': int(len(pos)), 'nodes': int(len(node_ids)),
+            'contact_nodes': int(len(contact_pos)), 'domains': rows}
+
+
+def relative_cycle_time(row, elements, nt):
+    """Cycle time of np = row['k'] domains x nt threads relative to 1 x 1."""
+    np_ = row['k']
+    balance = (1.0 - CONTACT_SHARE) * row['load_imbalance'] + CONTACT_SHARE * row['contact_imbalance']
+    threads = nt / (1.0 + THREAD_OVERHEAD * (nt - 1))
+    exchange = INTERFACE_COST * row['interface_max'] / elements if np_ > 1 else 0.0
+    return balance / (np_ * threads) + exchange / threads
+
+
+def recommend(report, cores):
+    """[(np, nt, relative time)] for the previewed k up to cores, best first."""
+    out = []
+    for row in report['domains']:
+        if row['k'] <= cores:
+            nt = cores // row['k']
+            out.append((row['k'], nt, relative_cycle_time(row, report['elements'], nt)))
+    return sorted(out, key=lambda r: r[2])
+
+
+def default_ks(cores):
+    ks = {1, cores}
+    ks.update(2 ** i for i in range(1, cores.bit_length()) if 2 ** i <= cores)
+    ks.update(d for d in range(2, cores + 1) if cores % d == 0)
+    return sorted(ks)
+
+
+def print_report(report, cores):
+    print(f"  Decomposition preview: {report['elements']} elements, {report['nodes']} nodes, "
+          f"{report['contact_nodes']} contact nodes")
+    print("       k  el/domain  load   interface  (max/dom)  contact max  domains  contact imb")
+    for r in report['domains']:
+        print(f"    {r['k']:4d} {r['elements_max']:10d} {r['load_imbalance']:5.3f} {r['interface_nodes']:10d}"
+              f" {r['interface_max']:10d} {r['contact_nodes_max']:12d} {r['contact_domains']:8d}"
+              f" {r['contact_imbalance']:11.2f}")
+    ranked = recommend(report, cores)
+    if ranked:
+        print(f"  Layouts for {cores} cores (relative cycle time, 1 x 1 = 1.000):")
+        for np_, nt, t in ranked[:5]:
+            print(f"    -np {np_:3d} -nt {nt:3d}   {t:.3f}")
+        best = ranked[0]
+        print(f"  Recommended: -np {best[0]} (starter and mpirun) with -nt {best[1]} threads per domain")
+
+
+def main():
+    from mesh_cache import load_mesh
+    ap = argparse.ArgumentParser(description="Preview domain decompositions and recommend -np / -nt")
+    ap.add_argument("inp_path")
+    ap.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="cores available to one run")
+    ap.add_argument("--domains", type=int, nargs="+", default=None,
+                    help="domain counts to preview (default: powers of two and divisors of --cores)")
+    ap.add_argument("--contact-margin", type=float, default=0.5, help="contact band width (mm)")
+    ap.add_argument("--json", default=None, help="write the report to this JSON file")
+    args = ap.parse_args()
+    report = preview(load_mesh(args.inp_path), args.domains or default_ks(args.cores), args.contact_margin)
+    print_report(report, args.cores)
+    if args.json:
+        report['recommended'] = recommend(report, args.cores)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Live monitor of the engine listing (*_0001.out)
+
+Attempt 6 dropped from dt = 1e-9 to 4e-11 s at ~70 % of the run and went
+15x slower, which was only seen afterwards. This tails the listing while
+the engine runs: new bytes are read from the last offset (the file is never
+loaded, memory stays constant on multi-GB logs) and every cycle line
+
+    CYCLE  TIME  TIME-STEP  ELEMENT  id  ERROR%  I-ENERGY  K-ENERGY T  K-ENERGY R  EXT-WORK  MAS.ERR
+
+goes into a rolling window, together with the EXCEEDED EPS_MAX element
+deletions counted since the previous cycle line. From the window it keeps
+the simulated-time rate and the ETA to the /RUN end time (read from the
+engine deck next to the listing, or --t-end).
+
+Alerts (thresholds are options):
+    dt collapse     time step below --dt-drop x the step of the first cycles
+                    (or below --dt-min)
+    energy error    |ERROR| above --max-error %
+    non-finite      NaN / Inf / ***** in a cycle line
+--on-alert stop writes /STOP to <deck>.ctl (e.g. run_0001.ctl), which the
+engine reads between cycles: it writes a restart file and ends the run.
+
+Every cycle line is appended to a CSV history (<listing>.csv); --parquet
+also converts it to Parquet at the end when pyarrow is installed.
+
+    python engine_monitor.py run_0001.out [--interval 10] [--on-alert stop]
+    python engine_monitor.py run_0001.out --once        (parse a finished listing)
+"""
+
+import argparse
+import collections
+import csv
+import math
+import os
+import re
+import sys
+import time
+
+READ_BYTES = 4 << 20        # bytes read per poll at most
+WINDOW = 50                 # cycle lines kept for rates and the dt reference
+REFERENCE_LINES = 10        # first cycle lines: reference time step
+_CYCLE_RE = re.compile(r'^\s*(\d+)\s+(\S+)\s+(\S+)\s+([A-Z][A-Z0-9_-]*)\s+(\d+)\s+(\S+?)%\s+(.*?)\s*$')
+_DELETION_RE = re.compile(r'EXCEEDED EPS_MAX')
+_TERMINATION_RE = re.compile(r'(NORMAL|ERROR) TERMINATION')
+_RUN_RE = re.compile(r'^/RUN/[^/\s]*/(\d+)')
+FIELDS = ('cycle', 'time', 'dt', 'element', 'elem_id', 'error_pct', 'i_energy', 'k_energy_t', 'k_energy_r',
+          'ext_work', 'mass_error', 'deleted', 'wall')
+
+
+def _float(token):
+    """float of a listing value; NaN for Infinity / NaN / overflowed *****."""
+    try:
+        return float(token)
+    except ValueError:
+        return math.nan
+
+
+def parse_cycle_line(line):
+    """Dict of the cycle-table columns, or None for any other line."""
+    m = _CYCLE_RE.match(line)
+    if not m:
+        return None
+    energies = [_float(t) for t in m.group(7).split()[:5]]
+    energies += [math.nan] * (5 - len(energies))
+    return {
+        'cycle': int(m.group(1)),
+        'time': _float(m.group(2)),
+        'dt': _float(m.group(3)),
+        'element': m.group(4),
+        'elem_id': int(m.group(5)),
+        'error_pct': _float(m.group(6)),
+        'i_energy': energies[0],
+        'k_energy_t': energies[1],
+        'k_energy_r': energies[2],
+        'ext_work': energies[3],
+        'mass_error': energies[4],
+    }
+
+
+def run_end_time(rad_path):
+    """(run number, end time) of the /RUN card of an engine deck, (None, None) if absent."""
+    try:
+        with open(rad_path, 'r', errors='replace') as f:
+            for line in f:
+                m = _RUN_RE.match(line)
+                if m:
+                    return int(m.group(1)), float(next(f).split()[0])
+    except (OSError, StopIteration, ValueError, IndexError):
+        pass
+    return None, None
+
+
+def engine_deck(listing_path):
+    """run_0001.out -> run_0001.rad"""
+    return os.path.splitext(listing_path)[0] + '.rad'
+
+
+class LogTail:
+    """Complete new lines of a growing text file, read from the last offset."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = b''
+
+    def read(self, limit=READ_BYTES):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # Listing rewritten (run restarted): start over
+            self.offset, self.partial = 0, b''
+        if size == self.offset:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(limit, size - self.offset))
+        self.offset += len(data)
+        data = self.partial + data
+        cut = data.rfind(b'\n') + 1
+        self.partial = data[cut:]
+        return data[:cut].decode('latin-1').splitlines()
+
+
+class EngineMonitor:
+    """Rolling state of one engine run, fed line by line."""
+
+    def __init__(self, t_end=None, dt_drop=0.1, dt_min=None, max_error=5.0, history=None):
+        self.t_end = t_end
+        self.dt_drop = dt_drop
+        self.dt_min = dt_min
+        self.max_error = max_error
+        self.window = collections.deque(maxlen=WINDOW)
+        self.reference = []
+        self.dt_ref = None
+        self.deleted = 0
+        self.deleted_total = 0
+        self.lines = 0
+        self.last = None
+        self.status = None
+        self.alerts = []
+        self._raised = set()
+        self.history = history
+
+    def feed(self, line, wall=None):
+        """Take one listing line; returns the alerts it raised."""
+        self.lines += 1
+        if _DELETION_RE.search(line):
+            self.deleted += 1
+            self.deleted_total += 1
+            return []
+        m = _TERMINATION_RE.search(line)
+        if m:
+            self.status = m.group(1)
+            return []
+        row = parse_cycle_line(line)
+        if row is None:
+            return []
+        row['deleted'] = self.deleted
+        row['wall'] = time.time() if wall is None else wall
+        self.deleted = 0
+        self.last = row
+        self.window.append(row)
+        if self.history:
+            self.history.writerow([row[k] for k in FIELDS])
+        if self.dt_ref is None and row['dt'] > 0:
+            self.reference.append(row['dt'])
+            if len(self.reference) == REFERENCE_LINES:
+                self.dt_ref = sorted(self.reference)[REFERENCE_LINES // 2]
+        return self._check(row)
+
+    def _alert(self, kind, message, row):
+        # Each kind is reported once; the run keeps being monitored
+        if kind in self._raised:
+            return []
+        self._raised.add(kind)
+        alert = {'kind': kind, 'cycle': row['cycle'], 'time': row['time'], 'message': message}
+        self.alerts.append(alert)
+        return [alert]
+
+    def _check(self, row):
+        out = []
+        values = [row[k] for k in FIELDS if isinstance(row[k], float)]
+        if not all(math.isfinite(v) for v in values):
+            out += self._alert('non-finite', "NaN / Inf in the cycle line", row)
+        dt = row['dt']
+        ref = self.dt_ref or (self.reference[len(self.reference) // 2] if self.reference else None)
+        if ref and dt < self.dt_drop * ref:
+            out += self._alert('dt-collapse', f"time step {dt:.3E} s < {self.dt_drop:g} x {ref:.3E} s "
+                                              f"(element {row['element']} {row['elem_id']})", row)
+        if self.dt_min and dt < self.dt_min:
+            out += self._alert('dt-min', f"time step {dt:.3E} s < {self.dt_min:.3E} s", row)
+        if abs(row['error_pct']) > self.max_error:
+            out += self._alert('energy-error', f"energy error {row['error_pct']:.1f} % > {self.max_error:g} %", row)
+        return out
+
+    def rates(self):
+        """(simulated s per wall s, cycles per wall s) over the window, None when unknown."""
+        if len(self.window) < 2:
+            return None, None
+        a, b = self.window[0], self.window[-1]
+        wall = b['wall'] - a['wall']
+        if wall <= 0:
+            return None, None
+        return (b['time'] - a['time']) / wall, (b['cycle'] - a['cycle']) / wall
+
+    def summary(self):
+        row = self.last
+        if row is None:
+            return {'cycles': 0}
+        out = {'cycle': row['cycle'], 'time': row['time'], 'dt': row['dt'], 'error_pct': row['error_pct'],
+               'deleted': self.deleted_total, 'status': self.status, 'alerts': len(self.alerts)}
+        if self.t_end:
+            out['progress'] = row['time'] / self.t_end
+            remaining = max(self.t_end - row['time'], 0.0)
+            out['cycles_left'] = remaining / row['dt'] if row['dt'] > 0 else math.inf
+            sim_rate, _ = self.rates()
+            out['eta_s'] = remaining / sim_rate if sim_rate else None
+        return out
+
+
+def format_summary(s):
+    if 'cycle' not in s:
+        return "  waiting for the first cycle line"
+    text = f"  cycle {s['cycle']:9d}  t {s['time']:.4E} s  dt {s['dt']:.3E} s  error {s['error_pct']:5.1f} %"
+    if 'progress' in s:
+        text += f"  {100.0 * s['progress']:5.1f} %  {s['cycles_left']:.3g} cycles left"
+        if s['eta_s'] is not None:
+            eta = int(s['eta_s'])
+            text += f"  ETA {eta // 3600}:{eta // 60 % 60:02d}:{eta % 60:02d}"
+    text += f"  deleted {s['deleted']}"
+    if s['status']:
+        text += f"  {s['status']} TERMINATION"
+    return text
+
+
+def request_stop(listing_path):
+    """Ask the engine to write a restart and stop (/STOP in <deck>.ctl)."""
+    path = os.path.splitext(listing_path)[0] + '.ctl'
+    with open(path, 'w') as f:
+        f.write("/STOP\n")
+    return path
+
+
+def write_parquet(csv_path):
+    try:
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        print("  pyarrow is not installed: Parquet history skipped")
+        return None
+    path = os.path.splitext(csv_path)[0] + '.parquet'
+    pyarrow.parquet.write_table(pyarrow.csv.read_csv(csv_path), path)
+    return path
+
+
+def monitor(listing_path, t_end=None, interval=10.0, once=False, on_alert='warn', history_path=None,
+            **thresholds):
+    """Follow the listing until the engine terminates (or once); returns the monitor."""
+    if t_end is None:
+        _, t_end = run_end_time(engine_deck(listing_path))
+    tail = LogTail(listing_path)
+    stopped = False
+    with open(history_path or listing_path + '.csv', 'w', newline='') as hist:
+        writer = csv.writer(hist)
+        writer.writerow(FIELDS)
+        mon = EngineMonitor(t_end, history=writer, **thresholds)
+        last_print = 0.0
+        while True:
+            lines = tail.read()
+            while lines:
+                for line in lines:
+                    for alert in mon.feed(line, wall=None if not once else 0.0):
+                        print(f"  ALERT {alert['kind']} at cycle {alert['cycle']}: {alert['message']}")
+                        if on_alert == 'stop' and not once and not stopped:
+                            print(f"  Stop requested: {request_stop(listing_path)}")
+                            stopped = True
+                lines = tail.read()
+            hist.flush()
+            now = time.monotonic()
+            if once or mon.status or now - last_print >= interval:
+                print(format_summary(mon.summary()), flush=True)
+                last_print = now
+            if once or mon.status:
+                break
+            time.sleep(min(interval, 2.0))
+    return mon
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Follow an OpenRadioss engine listing: time step, energy, ETA, alerts")
+    ap.add_argument("listing", help="engine listing, e.g. run_0001.out")
+    ap.add_argument("--t-end", type=float, default=None, help="/RUN end time (s, default from the engine deck)")
+    ap.add_argument("--interval", type=float, default=10.0, help="status line every N seconds")
+    ap.add_argument("--once", action="store_true", help="parse the listing as it is and exit")
+    ap.add_argument("--dt-drop", type=float, default=0.1,
+                    help="alert when dt falls below this fraction of the initial time step")
+    ap.add_argument("--dt-min", type=float, default=None, help="alert when dt falls below this value (s)")
+    ap.add_argument("--max-error", type=float, default=5.0, help="alert when |energy error| exceeds this (%%)")
+    ap.add_argument("--on-alert", choices=["warn", "stop"], default="warn",
+                    help="stop: write /STOP to the engine control file on the first alert")
+    ap.add_argument("--history", default=None, help="CSV history (default <listing>.csv)")
+    ap.add_argument("--parquet", action="store_true", help="also write the history as Parquet (pyarrow)")
+    args = ap.parse_args()
+    history = args.history or args.listing + '.csv'
+    mon = monitor(args.listing, args.t_end, args.interval, args.once, args.on_alert, history,
+                  dt_drop=args.dt_drop, dt_min=args.dt_min, max_error=args.max_error)
+    print(f"History written: {history}")
+    if args.parquet:
+        path = write_parquet(history)
+        if path:
+            print(f"History written: {path}")
+    return 1 if mon.alerts or mon.status == 'ERROR' else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Multi-stage engine decks chained by restart
+
+Attempt 6 ran at ~1e-9 s per cycle until ~70 % of the stroke and then slowed
+15x when element deletion started; one /RUN with one /ANIM/DT spends the same
+output density on the approach as on the separation. plan_stages() splits
+the run at:
+
+    t_contact   the punch closes the initial clearance to the Material
+                (lowest Punch node vs top of the Material, /FUNCT/1 stroke)
+    t_crunch    the punch has travelled crunch_fraction of the Material
+                thickness past contact
+
+into approach / cutting / separation runs written as <base>_0001.rad,
+<base>_0002.rad, ... (/RUN/Punch_Die_Shearing/1, /2, ...); each run restarts
+from the previous one. The approach gets coarse output, the cutting stage
+keeps the single-run settings and the separation gets dense output. Tool-only
+mass scaling is the starter's /ADMAS (--target-dt); approach_tmin adds a
+/DT/NODA/CST minimum step to the approach only, but Radioss keeps that added
+mass in the later runs, so it is off by default.
+"""
+
+import numpy as np
+
+from contact_zone import table_stroke
+from inp2radioss_v6 import (ANIM_DT, ANIM_ELEM, ANIM_VECT, PUNCH_VELOCITY, RFILE_CYCLES, RUN_END_TIME,
+                            write_engine_file)
+from preflight_dt import part_rows
+
+CRUNCH_FRACTION = 0.7
+# Output and time-step settings per stage (missing keys: single-run defaults)
+STAGE_SETTINGS = {
+    'approach': {'anim_dt': 2.0 * ANIM_DT, 'anim_elem': ('EPSP', 'VONM'), 'rfile': 4 * RFILE_CYCLES},
+    'cutting': {},
+    'separation': {'anim_dt': 0.2 * ANIM_DT, 'rfile': RFILE_CYCLES // 2},
+}
+
+
+def stroke_mm(t, points=PUNCH_VELOCITY):
+    return 1000.0 * table_stroke(points, t)
+
+
+def time_at_stroke(d, points=PUNCH_VELOCITY, t_end=RUN_END_TIME):
+    """First time (s) the /FUNCT stroke reaches d mm, or None past t_end."""
+    if d <= 0:
+        return 0.0
+    if stroke_mm(t_end, points) < d:
+        return None
+    lo, hi = 0.0, t_end
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        if stroke_mm(mid, points) < d:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def clearance(mesh):
+    """(gap, thickness) in mm: lowest Punch node above the Material top, Material Z extent."""
+    rows = part_rows(mesh)
+    if 'PUNCH' not in rows or 'MATERIAL' not in rows:
+        return None, None
+    node_ids = np.asarray(mesh['node_ids'])
+    z = np.asarray(mesh['coords'])[:, 2]
+    conn = np.asarray(mesh['conn'])
+    zp = z[np.searchsorted(node_ids, np.unique(conn[rows['PUNCH']]))]
+    zm = z[np.searchsorted(node_ids, np.unique(conn[rows['MATERIAL']]))]
+    return max(float(zp.min() - zm.max()), 0.0), float(zm.max() - zm.min())
+
+
+def plan_stages(mesh, t_end=RUN_END_TIME, crunch_fraction=CRUNCH_FRACTION, approach_tmin=0.0):
+    """[{name, t_start, t_end, settings...}] with empty stages dropped."""
+    gap, thickness = clearance(mesh)
+    if gap is None:
+        raise ValueError("staged run needs Punch and Material parts")
+    t_contact = time_at_stroke(gap, t_end=t_end)
+    t_crunch = time_at_stroke(gap + crunch_fraction * thickness, t_end=t_end)
+    bounds = [('approach', t_contact if t_contact is not None else t_end),
+              ('cutting', t_crunch if t_crunch is not None else t_end),
+              ('separation', t_end)]
+    stages = []
+    t0 = 0.0
+    for name, t1 in bounds:
+        if t1 > t0:
+            stage = {'name': name, 't_start': t0, 't_end': t1}
+            stage.update(STAGE_SETTINGS[name])
+            if name == 'approach' and approach_tmin:
+                stage['dt_noda'] = (0.9, approach_tmin)
+            stages.append(stage)
+            t0 = t1
+    return {'gap_mm': gap, 'thickness_mm': thickness, 'stages': stages}
+
+
+def write_stage_files(base_path, plan, nodal_dt=False):
+    """Write <base_path>_0001.rad ... one engine deck per stage. Returns the paths."""
+    paths = []
+    for k, st in enumerate(plan['stages']):
+        path = f"{base_path}_{k + 1:04d}.rad"
+        tmin = st.get('dt_noda', (0.9, 0.0))
+        write_engine_file(path, nodal_dt=nodal_dt or bool(tmin[1]), run_number=k + 1, t_end=st['t_end'],
+                          anim_start=st['t_start'], anim_dt=st.get('anim_dt', ANIM_DT),
+                          anim_elem=st.get('anim_elem', ANIM_ELEM), anim_vect=st.get('anim_vect', ANIM_VECT),
+                          rfile=st.get('rfile', RFILE_CYCLES), dt_noda=tmin)
+        paths.append(path)
+    return paths
+
+
+def print_plan(plan):
+    print(f"  Engine stages: clearance {plan['gap_mm']:.4f} mm, Material thickness {plan['thickness_mm']:.4f} mm")
+    for k, st in enumerate(plan['stages']):
+        frames = (st['t_end'] - st['t_start']) / st.get('anim_dt', ANIM_DT)
+        fields = len(st.get('anim_elem', ANIM_ELEM)) + len(st.get('anim_vect', ANIM_VECT))
+        tmin = st.get('dt_noda', (0.9, 0.0))[1]
+        print(f"    run {k + 1}  {st['name']:10s} {st['t_start']:.4E} - {st['t_end']:.4E} s  "
+              f"stroke {stroke_mm(st['t_start']):.3f} - {stroke_mm(st['t_end']):.3f} mm  "
+              f"~{frames:.0f} frames x {fields} fields" + (f"  Tmin {tmin:.2E} s" if tmin else ""))
@@ -1,6 +1,10 @@
-import re
+import sys
 
-with open('ASSY_OpenRadioss_PM7T1C_20260102.inp', 'r', encoding='utf-8') as f:
-    for i, line in enumerate(f, 1):
-        if '*Element' in line and 'Elset=' in line:
-            print(f"Line {i}: {line.strip()}")
+from inp_index import load_index
+
+if len(sys.argv) < 2:
+    print("Usage: python find_elsets.py file.inp")
+    sys.exit(1)
+for block in load_index(sys.argv[1], verbose=False)['blocks']:
+    if block['kind'] == 'element':
+        print(f"Line {block['line']}: {block['header']}")
@@ -1,29 +1,347 @@
+"""
+VTK sanitizer for the anim_to_vtk frames (A001.vtk ...)
+
+inf / -inf / nan / -nan values (also the Windows forms -nan(ind), 1.#INF,
+1.#QNAN) make ParaView reject a frame; they are replaced by 0.0.
+Each file is streamed in CHUNK_BYTES pieces cut at line ends, so a value is
+never split between two chunks. Only data lines (all tokens numeric) are
+touched; the header and keyword lines (POINTS, SCALARS name type, ...) are
+copied as they are. A file is rewritten only when something was fixed, via a
+temporary file and os.replace, and the frames are processed across a
+process pool.
+
+--binary legacy|vtu also converts the cleaned ASCII frames to binary legacy
+VTK (in place) or to VTU with raw appended data (A001.vtu next to A001.vtk),
+which ParaView loads much faster and which take less disk.
+
+Usage: python fix_vtk.py [pattern ...] [--workers N] [--binary legacy|vtu]
+"""
+
 import glob
+import mmap
 import os
+import re
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_BYTES = 8 << 20
+HEADER_LINES = 3        # version, title, ASCII/BINARY: never modified
+
+_NONFINITE = rb'[-+]?(?:inf(?:inity)?|nan(?:\([a-z]*\))?|1\.#(?:inf|qnan|snan|ind)\d*)'
+_NONFINITE_RE = re.compile(rb'(?<!\S)' + _NONFINITE + rb'(?!\S)', re.I)
+_TOKEN_RE = re.compile(rb'(?:' + _NONFINITE + rb'|[-+0-9.eE]+)', re.I)
+_KEYWORD_RE = re.compile(rb'^[A-Za-z_][^\n]*', re.M)
+
+
+def _fix_chunk(chunk):
+    """(fixed chunk, number of replaced values) for a chunk of whole lines."""
+    count = 0
+    checked = {}        # line start -> data line?
+
+    def repl(m):
+        nonlocal count
+        a = chunk.rfind(b'\n', 0, m.start()) + 1
+        if a not in checked:
+            # Only lines of numbers / non-finite tokens are data (one token at a time:
+            # a single regex over the whole line backtracks exponentially on bad lines)
+            b = chunk.find(b'\n', m.end())
+            checked[a] = all(_TOKEN_RE.fullmatch(t) for t in chunk[a:len(chunk) if b < 0 else b].split())
+        if not checked[a]:
+            return m.group(0)
+        count += 1
+        return b'0.0'
 
-def clean_vtk(file_path):
+    fixed = _NONFINITE_RE.sub(repl, chunk)
+    return fixed, count
+
+
+def _header_end(head):
+    pos = 0
+    for _ in range(HEADER_LINES):
+        pos = head.find(b'\n', pos) + 1
+        if pos == 0:
+            return len(head)
+    return pos
+
+
+def clean_vtk(file_path, chunk_bytes=CHUNK_BYTES):
+    """Stream-fix the non-finite values of an ASCII legacy VTK file.
+    Returns the number of replaced values."""
     print(f"Cleaning {file_path}...")
-    with open(file_path, 'r', errors='ignore') as f:
-        content = f.read()
-    
-    # Replace common issues
-    # Note: simplistic replacement, but effective for VTK ASCII data
-    # Be careful not to replace "infinite" word if it existed, but VTK is mostly numbers.
-    # We target isolated "inf" usually, but simplist replacement is often " inf " -> " 0.0 "
-    # or just replace string "inf" if it appears as a value.
-    
-    new_content = content.replace(" -inf", " 0.0").replace(" inf", " 0.0").replace(" nan", " 0.0").replace(" -nan", " 0.0")
-    
-    # Also handle lowercase if any (OpenRadioss usually uses inf, but just in case)
-    new_content = new_content.replace("\n-inf", "\n0.0").replace("\ninf", "\n0.0")
-    
-    if content != new_content:
-        print(f"  -> Fixed numerical errors in {file_path}")
-        with open(file_path, 'w') as f:
-            f.write(new_content)
-    else:
-        print("  -> No issues found.")
-
-vtk_files = glob.glob("*.vtk")
-for vtk in vtk_files:
-    clean_vtk(vtk)
+    tmp_path = file_path + '.tmp'
+    out = None
+    fixed_total = 0
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(min(chunk_bytes, 1 << 16))
+            hend = _header_end(head)
+            if b'BINARY' in head[:hend].upper():
+                print("  -> Binary file, skipped.")
+                return 0
+            f.seek(hend)
+            pos = hend          # bytes of the source already handled
+            tail = b''
+            while True:
+                block = f.read(chunk_bytes)
+                data = tail + block
+                if block:
+                    cut = data.rfind(b'\n') + 1
+                    if cut == 0:
+                        tail = data
+                        continue
+                    data, tail = data[:cut], data[cut:]
+                elif not data:
+                    break
+                else:
+                    tail = b''
+                fixed, n = _fix_chunk(data)
+                if n and out is None:
+                    # First fix: copy the untouched prefix, then write as we go
+                    out = open(tmp_path, 'wb')
+                    with open(file_path, 'rb') as src:
+                        left = pos
+                        while left:
+                            buf = src.read(min(left, chunk_bytes))
+                            out.write(buf)
+                            left -= len(buf)
+                if out is not None:
+                    out.write(fixed)
+                fixed_total += n
+                pos += len(data)
+                if not block:
+                    break
+        if out is not None:
+            out.close()
+            out = None
+            os.replace(tmp_path, file_path)
+            print(f"  -> Fixed {fixed_total} numerical errors in {file_path}")
+        else:
+            print("  -> No issues found.")
+    finally:
+        if out is not None:
+            out.close()
+            os.remove(tmp_path)
+    return fixed_total
+
+
+# --- Binary conversion -----------------------------------------------------
+
+_LEGACY_TYPES = {'float': '>f4', 'double': '>f8', 'int': '>i4', 'unsigned_int': '>u4',
+                 'long': '>i8', 'unsigned_long': '>u8', 'short': '>i2', 'unsigned_short': '>u2',
+                 'char': '>i1', 'unsigned_char': '>u1', 'bit': '>u1',
+                 'vtktypeint64': '>i8', 'vtktypeint32': '>i4'}
+_VTU_TYPES = {'f4': 'Float32', 'f8': 'Float64', 'i1': 'Int8', 'u1': 'UInt8', 'i2': 'Int16',
+              'u2': 'UInt16', 'i4': 'Int32', 'u4': 'UInt32', 'i8': 'Int64', 'u8': 'UInt64'}
+# Points per VTK cell type (fixed-size types only)
+_CELL_SIZES = {1: 1, 3: 2, 5: 3, 8: 4, 9: 4, 10: 4, 11: 8, 12: 8, 13: 6, 14: 5,
+               21: 3, 22: 6, 23: 8, 24: 10, 25: 20}
+
+
+def read_legacy_ascii(file_path, names=None):
+    """Sections of an ASCII legacy VTK file.
+
+    Returns (header lines, [(keyword line, dtype or None, values or None)]);
+    the keyword lines are found with one regex pass over the memory-mapped
+    file (data lines are purely numeric once cleaned) and the values between
+    two keyword lines are parsed with np.fromstring. With `names`, only the
+    data arrays of those names (SCALARS/VECTORS/TENSORS/FIELD array name, or
+    POINTS/CELLS/CELL_TYPES) are parsed; the others are returned as None.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        hend = _header_end(mm[:1 << 16])
+        header = mm[:hend].decode('ascii', 'replace').splitlines()
+        if len(header) < HEADER_LINES or header[2].strip().upper() != 'ASCII':
+            raise ValueError(f"{file_path}: not an ASCII legacy VTK file")
+        marks = [(m.start(), m.end(), m.group(0).rstrip(b'\r').decode('ascii'))
+                 for m in _KEYWORD_RE.finditer(mm, hend)]
+        sections = []
+        dtype = name = None
+        for k, (start, end, line) in enumerate(marks):
+            tok = line.split()
+            key = tok[0].upper()
+            if key in ('POINTS', 'VECTORS', 'NORMALS', 'TENSORS', 'SCALARS'):
+                dtype = tok[2].lower() if len(tok) > 2 else 'float'
+                name = key if key == 'POINTS' else tok[1]
+            elif key in ('CELLS', 'CELL_TYPES', 'POLYGONS', 'LINES', 'VERTICES', 'TRIANGLE_STRIPS'):
+                dtype, name = 'int', key
+            elif key in ('OFFSETS', 'CONNECTIVITY'):
+                dtype, name = tok[1].lower(), 'CELLS'
+            elif key not in ('LOOKUP_TABLE', 'DATASET', 'POINT_DATA', 'CELL_DATA', 'FIELD'):
+                if len(tok) == 4 and tok[3].lower() in _LEGACY_TYPES:
+                    dtype, name = tok[3].lower(), tok[0]    # FIELD array: name ncomp ntuples type
+                else:
+                    raise ValueError(f"{file_path}: unsupported section '{line}'")
+            values = None
+            if names is not None and name not in names:
+                sections.append((line, dtype, values))
+                continue
+            body = mm[end:marks[k + 1][0] if k + 1 < len(marks) else len(mm)]
+            if body.strip():
+                if dtype not in _LEGACY_TYPES:
+                    raise ValueError(f"{file_path}: unsupported data type in '{line}'")
+                np_type = np.dtype(_LEGACY_TYPES[dtype]).newbyteorder('=')
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', DeprecationWarning)
+                    values = np.fromstring(body.decode('ascii'), dtype=np.float64 if np_type.kind == 'f'
+                                           else np.int64, sep=' ').astype(np_type)
+            sections.append((line, dtype, values))
+    return header, sections
+
+
+def _atomic_write(path, write):
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_legacy_binary(path, header, sections):
+    """Binary legacy VTK (big-endian data blocks)."""
+    def write(f):
+        f.write(f"{header[0]}\n{header[1]}\nBINARY\n".encode('ascii'))
+        for line, dtype, values in sections:
+            f.write(line.encode('ascii') + b'\n')
+            if values is not None:
+                f.write(values.astype(_LEGACY_TYPES[dtype]).tobytes() + b'\n')
+    _atomic_write(path, write)
+
+
+def _cells(sections):
+    """(connectivity, offsets, types) of an UNSTRUCTURED_GRID."""
+    by_key = {line.split()[0].upper(): values for line, _, values in sections}
+    types = by_key['CELL_TYPES'].astype(np.uint8)
+    if 'CONNECTIVITY' in by_key:            # legacy 5.x layout
+        return by_key['CONNECTIVITY'].astype(np.int64), by_key['OFFSETS'][1:].astype(np.int64), types
+    flat = by_key['CELLS'].astype(np.int64)
+    sizes = np.array([_CELL_SIZES.get(int(t), -1) for t in range(256)])[types]
+    starts = np.concatenate([[0], np.cumsum(sizes + 1)[:-1]])
+    if (sizes < 0).any() or starts[-1] + sizes[-1] + 1 != len(flat) or np.any(flat[starts] != sizes):
+        # Variable-size cells: walk the list
+        starts, pos = [], 0
+        for _ in range(len(types)):
+            starts.append(pos)
+            pos += int(flat[pos]) + 1
+        starts = np.array(starts, dtype=np.int64)
+        sizes = flat[starts]
+    keep = np.ones(len(flat), dtype=bool)
+    keep[starts] = False
+    return flat[keep], np.cumsum(sizes), types
+
+
+def write_vtu(path, header, sections):
+    """VTU (XML UnstructuredGrid) with raw little-endian appended data."""
+    dataset = next((l.split()[1].upper() for l, _, _ in sections if l.split()[0].upper() == 'DATASET'), '')
+    if dataset != 'UNSTRUCTURED_GRID':
+        raise ValueError(f"VTU output needs an UNSTRUCTURED_GRID, got {dataset or 'no DATASET'}")
+    arrays = []                     # (xml, array) in appended order
+    groups = {'FieldData': [], 'PointData': [], 'CellData': []}
+
+    def add(group, name, values, ncomp):
+        values = np.ascontiguousarray(values.astype(values.dtype.newbyteorder('<')))
+        offset = sum(8 + a.nbytes for _, a in arrays)
+        xml = (f'<DataArray type="{_VTU_TYPES[values.dtype.str[1:]]}" Name="{name}" '
+               f'NumberOfComponents="{ncomp}" format="appended" offset="{offset}"/>')
+        arrays.append((xml, values))
+        if group:
+            groups[group].append(xml)
+
+    group = 'FieldData'
+    points = None
+    pending = None                  # (name, ncomp) of the next data block
+    for line, _, values in sections:
+        tok = line.split()
+        key = tok[0].upper()
+        if key == 'POINTS':
+            points = values
+        elif key == 'POINT_DATA':
+            group = 'PointData'
+        elif key == 'CELL_DATA':
+            group = 'CellData'
+        elif key == 'SCALARS':
+            pending = (tok[1], int(tok[3]) if len(tok) > 3 else 1)
+        elif key in ('VECTORS', 'NORMALS'):
+            pending = (tok[1], 3)
+        elif key == 'TENSORS':
+            pending = (tok[1], 9)
+        elif len(tok) == 4 and key not in ('CELLS', 'FIELD', 'DATASET'):
+            pending = (tok[0], int(tok[1]))
+        if values is not None and pending is not None and key not in ('POINTS', 'CELLS', 'CELL_TYPES'):
+            add(group, pending[0], values, pending[1])
+            pending = None
+    conn, offsets, types = _cells(sections)
+    n_points = len(points) // 3
+    point_xml = len(arrays)
+    add(None, 'Points', points, 3)
+    add(None, 'connectivity', conn, 1)
+    add(None, 'offsets', offsets, 1)
+    add(None, 'types', types, 1)
+    xml = [xml for xml, _ in arrays[point_xml:]]
+
+    def write(f):
+        f.write(b'<?xml version="1.0"?>\n<VTKFile type="UnstructuredGrid" version="1.0" '
+                b'byte_order="LittleEndian" header_type="UInt64">\n<UnstructuredGrid>\n')
+        if groups['FieldData']:
+            f.write(("<FieldData>\n" + "\n".join(groups['FieldData']) + "\n</FieldData>\n").encode('ascii'))
+        f.write(f'<Piece NumberOfPoints="{n_points}" NumberOfCells="{len(types)}">\n'.encode('ascii'))
+        for name in ('PointData', 'CellData'):
+            f.write((f"<{name}>\n" + "".join(x + "\n" for x in groups[name]) + f"</{name}>\n").encode('ascii'))
+        f.write(f"<Points>\n{xml[0]}\n</Points>\n<Cells>\n{xml[1]}\n{xml[2]}\n{xml[3]}\n</Cells>\n"
+                "</Piece>\n</UnstructuredGrid>\n<AppendedData encoding=\"raw\">\n_".encode('ascii'))
+        for _, a in arrays:
+            f.write(np.uint64(a.nbytes).tobytes())
+            f.write(a.tobytes())
+        f.write(b'\n</AppendedData>\n</VTKFile>\n')
+    _atomic_write(path, write)
+
+
+def process_frame(file_path, binary=None, remove_vtk=False):
+    """Clean one frame and optionally convert it (binary = 'legacy' or 'vtu')."""
+    fixed = clean_vtk(file_path)
+    if binary:
+        try:
+            header, sections = read_legacy_ascii(file_path)
+        except ValueError as e:
+            print(f"  -> Not converted: {e}")
+            return fixed
+        if binary == 'vtu':
+            vtu_path = os.path.splitext(file_path)[0] + '.vtu'
+            write_vtu(vtu_path, header, sections)
+            if remove_vtk:
+                os.remove(file_path)
+            print(f"  -> Written {vtu_path}")
+        else:
+            write_legacy_binary(file_path, header, sections)
+            print(f"  -> Converted {file_path} to binary")
+    return fixed
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Fix inf/nan values in anim_to_vtk frames")
+    ap.add_argument("patterns", nargs="*", default=["*.vtk"], help="files or glob patterns (default *.vtk)")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--binary", choices=["legacy", "vtu"], default=None,
+                    help="also convert the cleaned frames to binary legacy VTK or to VTU")
+    ap.add_argument("--remove-vtk", action="store_true", help="with --binary vtu, delete the ASCII .vtk")
+    args = ap.parse_args()
+    vtk_files = sorted({p for pat in args.patterns for p in glob.glob(pat)})
+    workers = min(args.workers or os.cpu_count() or 1, max(len(vtk_files), 1))
+    if workers <= 1:
+        for vtk in vtk_files:
+            process_frame(vtk, args.binary, args.remove_vtk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        n = len(vtk_files)
+        list(pool.map(process_frame, vtk_files, [args.binary] * n, [args.remove_vtk] * n))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,9 @@ Format based on actual working OpenRadioss file
 import sys
 import os
 
-def parse_inp_sections(inp_file):
+from mesh_cache import load_mesh, nset_dict
+
+def parse_inp_sections(inp_file, mesh=None):
     """Pass 1: Identify Node ownership based on Node Sets"""
     print("  Pass 1: Parsing Node Sets...")
     node_to_part = {}
@@ -20,30 +22,11 @@ def parse_inp_sections(inp_file):
         'Node_Set-Stripper': 5,
         'Node_Set-Die': 6
     }
-    current_nset = None
-    
-    with open(inp_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('*Nset'):
-                parts = line.split(',')
-                current_nset = None
-                for p in parts:
-                    if 'nset=' in p.lower():
-                        name = p.split('=')[1].strip()
-                        if name in part_map_names:
-                            current_nset = part_map_names[name]
-                continue
-            if line.startswith('*'):
-                current_nset = None
-                continue
-            if current_nset is not None:
-                try:
-                    ids = [int(x) for x in line.split(',') if x.strip()]
-                    for nid in ids:
-                        node_to_part[nid] = current_nset
-                except:
-                    pass
+    if mesh is None:
+        mesh = load_mesh(inp_file)
+    for name, ids in nset_dict(mesh).items():
+        if name in part_map_names:
+            node_to_part.update(dict.fromkeys(ids.tolist(), part_map_names[name]))
     return node_to_part
 
 def convert_inp_to_rad(inp_file):
@@ -54,6 +37,9 @@ def convert_inp_to_rad(inp_file):
     node_part_map = parse_inp_sections(inp_file)
     
     print("  Pass 2: Processing Geometry...")
+    # Geometry is read from the deck itself: every *Element, type=C3D4 block
+    # (also blocks without ELSET=, which the mesh cache does not keep), nodes
+    # in file order
     nodes = []
     elements = []
     current_section = None
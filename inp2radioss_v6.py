@@ -1,10 +1,67 @@
 #!/usr/bin/env python3
 import re
 import os
+import numpy as np
 from datetime import datetime
 
-def parse_inp_file(inp_path):
+from inp_fast import node_arrays, element_rows, max_element_id
+from surface_fast import extract_surfaces
+from phase_profile import file_size, phase, profiled
+from rad_writer import WRITE_BUFFER, write_node_block, write_element_block, write_id_list, write_segment_block
+
+# Elset names per part role (PrePoMax writes Solid_part-XXX or From_parts-XXX)
+# Punch parts (3 punch tools that move together)
+PUNCH_ELSETS = ['Solid_part-1', 'Solid_part-Punch_Hole', 'Solid_part-Punch_Trim', 'Solid_part-Punch_Rectangle',
+                'From_parts-Punch_Hole', 'From_parts-Punch_Trim', 'From_parts-Punch_Rectangle']
+# Material (free, no BC)
+MATERIAL_ELSETS = ['Solid_part-5', 'Solid_part-6', 'Solid_part-Material', 'From_parts-Material']
+# Die (fixed)
+DIE_ELSETS = ['Solid_part-4', 'Solid_part-Die', 'From_parts-Die']
+# Stripper (moves with punch)
+STRIPPER_ELSETS = ['Solid_part-Stripper', 'From_parts-Stripper']
+ROLE_ELSETS = {'PUNCH': PUNCH_ELSETS, 'MATERIAL': MATERIAL_ELSETS, 'DIE': DIE_ELSETS, 'STRIPPER': STRIPPER_ELSETS}
+ROLE_MATERIAL = {'PUNCH': 1, 'MATERIAL': 2, 'DIE': 1, 'STRIPPER': 1}
+
+# Elastic constants of the /MAT cards (SI: kg, m, s); also used by preflight_dt.py
+MATERIALS = {
+    1: {'name': 'S185_Steel', 'law': 1, 'rho': 7800.0, 'E': 2.1e11, 'nu': 0.28},
+    2: {'name': '1060_Alloy_Plastic', 'law': 2, 'rho': 2700.0, 'E': 6.9e10, 'nu': 0.33},
+}
+RUN_END_TIME = 0.0007   # /RUN end time (s)
+# Engine output: animation interval (s), restart file interval (cycles), fields
+ANIM_DT = 1.0e-4
+RFILE_CYCLES = 5000
+ANIM_ELEM = ('EPSP', 'VONM', 'ENER', 'SIGX', 'SIGY', 'SIGZ', 'SIGXY', 'SIGYZ', 'SIGZX')
+ANIM_VECT = ('DISP', 'VEL')
+
+# /FUNCT tables: (time s, velocity m/s)
+PUNCH_VELOCITY = [(0.0, 0.0), (0.00002, -5.0), (0.05, -5.0)]
+ZERO_VELOCITY = [(0.0, 0.0), (0.1, 0.0)]
+# Stripper stops at 0.2 mm: ramp 0 -> -5.0 in 0.00002 s, 0.2 mm / 5000 mm/s = 0.00004 s
+STRIPPER_VELOCITY = [(0.0, 0.0), (0.00002, -5.0), (0.00004, -5.0), (0.00005, 0.0), (0.1, 0.0)]
+
+def _sci(x):
+    # Shortest round-trip scientific notation, e.g. 2.1E+11
+    return np.format_float_scientific(x, unique=True, exp_digits=2, trim='0').upper()
+
+def elastic_cards(mat):
+    """RHO_I and E/NU lines of a /MAT card."""
+    return (f"#              RHO_I\n{mat['rho']!r:>17}\n"
+            f"#                  E                  NU\n{_sci(mat['E']):>17}{mat['nu']!r:>19}\n")
+
+@profiled(counts=lambda r, inp_path, *a, **k: {'nodes': len(r[0]), 'elements': len(r[1]),
+                                               'bytes_in': file_size(inp_path)})
+def parse_inp_file(inp_path, fast=False, workers=None, cache=False):
     print(f"Parsing: {inp_path}")
+    if cache:
+        # Binary mesh cache next to the INP (mesh_cache.py), rebuilt when the INP changes
+        from mesh_cache import load_mesh
+        from inp_fast import mesh_views
+        return mesh_views(load_mesh(inp_path, workers=workers))
+    if fast:
+        # Memory-mapped NumPy parser; returns dict-like views over the arrays
+        from inp_fast import parse_inp_arrays, mesh_views
+        return mesh_views(parse_inp_arrays(inp_path, workers=workers))
     nodes = {}
     elements = {}
     elset_elements = {}
@@ -44,6 +101,7 @@ def parse_inp_file(inp_path):
                 except: pass
     return nodes, elements, elset_elements
 
+@profiled(counts=lambda r, *a, **k: {'faces': len(r)})
 def extract_surface_faces(all_elements, part_element_ids, nodes_coords):
     face_counts = {}
     face_to_elem = {}
@@ -86,52 +144,56 @@ def extract_surface_faces(all_elements, part_element_ids, nodes_coords):
             external_faces.append(current_face)
     return external_faces
 
-def collect_nodes(faces):
-    s = set()
-    for f in faces:
-        s.update(f)
-    return s
+def impvel_card(impvel_id, title, funct_id, direction, grnod_id):
+    return (f"/IMPVEL/{impvel_id}\n{title}\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n"
+            f"{funct_id:10d}{direction:>10}{0:10d}{0:10d}{grnod_id:10d}{0:10d}{0:10d}\n"
+            "#             Ascale_x            Fscale_y            Tstart              Tstop\n"
+            "             1.00000             1.00000             0.00000         1.00000E+30\n")
+
+def funct_card(funct_id, title, points):
+    return (f"/FUNCT/{funct_id}\n{title}\n#                  X                   Y\n"
+            + "".join(f"{x:20.5f}{y:20.5f}\n" for x, y in points))
 
-def write_starter_file(output_path, nodes, elements, elset_elements):
+def admas_card(admas_id, title, mass, grnod_id):
+    # Type 0: mass (kg) added to each node of the group
+    return (f"/ADMAS/0/{admas_id}\n{title}\n#               MASS   grnd_ID\n"
+            f"{mass:20.6E}{grnod_id:10d}\n")
+
+@profiled(counts=lambda r, output_path, nodes, elements, *a, **k: {'nodes': len(nodes), 'elements': len(elements),
+                                                                   'bytes_out': file_size(output_path)})
+def write_starter_file(output_path, nodes, elements, elset_elements, symmetry_groups=None,
+                       mass_groups=None, contact_band=None, block_cache=None, contact_surface='skin'):
     print(f"Writing Starter: {output_path}")
     # Flexible part mapping - check for various possible elset names
     # Match the actual Elset names in the INP file
     parts = {}
     all_elements_list = []
     
-    # Punch parts (3 punch tools that move together)
-    punch_names = ['Solid_part-1', 'Solid_part-Punch_Hole', 'Solid_part-Punch_Trim', 'Solid_part-Punch_Rectangle',
-                   'From_parts-Punch_Hole', 'From_parts-Punch_Trim', 'From_parts-Punch_Rectangle']
-    
-    # Material (free, no BC)
-    material_names = ['Solid_part-5', 'Solid_part-6', 'Solid_part-Material', 'From_parts-Material']
-    
-    # Die (fixed)
-    die_names = ['Solid_part-4', 'Solid_part-Die', 'From_parts-Die']
-    
-    # Stripper (moves with punch)
-    stripper_names = ['Solid_part-Stripper', 'From_parts-Stripper']
+    punch_names = PUNCH_ELSETS
+    material_names = MATERIAL_ELSETS
+    die_names = DIE_ELSETS
+    stripper_names = STRIPPER_ELSETS
     
     punch_elements = []
     for name in punch_names:
         if name in elset_elements:
             punch_elements.extend(elset_elements[name])
     if punch_elements:
-        parts[1] = {'name': 'Punch', 'role': 'PUNCH', 'elements': punch_elements, 'mat_id': 1, 'prop_id': 1}
+        parts[1] = {'name': 'Punch', 'role': 'PUNCH', 'elements': punch_elements, 'mat_id': ROLE_MATERIAL['PUNCH'], 'prop_id': 1}
     
     material_elements = []
     for name in material_names:
         if name in elset_elements:
             material_elements.extend(elset_elements[name])
     if material_elements:
-        parts[2] = {'name': 'Material', 'role': 'MATERIAL', 'elements': material_elements, 'mat_id': 2, 'prop_id': 2}
+        parts[2] = {'name': 'Material', 'role': 'MATERIAL', 'elements': material_elements, 'mat_id': ROLE_MATERIAL['MATERIAL'], 'prop_id': 2}
     
     die_elements = []
     for name in die_names:
         if name in elset_elements:
             die_elements.extend(elset_elements[name])
     if die_elements:
-        parts[3] = {'name': 'Die', 'role': 'DIE', 'elements': die_elements, 'mat_id': 1, 'prop_id': 1}
+        parts[3] = {'name': 'Die', 'role': 'DIE', 'elements': die_elements, 'mat_id': ROLE_MATERIAL['DIE'], 'prop_id': 1}
     
     # Stripper - moves like punch
     stripper_elements = []
@@ -139,7 +201,7 @@ def write_starter_file(output_path, nodes, elements, elset_elements):
         if name in elset_elements:
             stripper_elements.extend(elset_elements[name])
     if stripper_elements:
-        parts[4] = {'name': 'Stripper', 'role': 'STRIPPER', 'elements': stripper_elements, 'mat_id': 1, 'prop_id': 1}
+        parts[4] = {'name': 'Stripper', 'role': 'STRIPPER', 'elements': stripper_elements, 'mat_id': ROLE_MATERIAL['STRIPPER'], 'prop_id': 1}
     
     # If no parts matched, use all elements as a single part
     if not parts and elset_elements:
@@ -148,47 +210,85 @@ def write_starter_file(output_path, nodes, elements, elset_elements):
             all_elems.extend(eset_elems)
         parts[1] = {'name': 'AllElements', 'role': 'PUNCH', 'elements': all_elems, 'mat_id': 1, 'prop_id': 1}
 
-    punch_nodes = set()
-    stripper_nodes = set()
-    die_nodes = set()
-    for pid, pdata in parts.items():
-        for eid in pdata['elements']:
-            if eid in elements:
-                for nid in elements[eid]:
-                    if pdata['role'] == 'PUNCH': punch_nodes.add(nid)
-                    elif pdata['role'] == 'DIE': die_nodes.add(nid)
-                    elif pdata['role'] == 'STRIPPER': stripper_nodes.add(nid)
+    # Connectivity arrays per part; node groups are the unique node ids by role
+    part_conn = {pid: element_rows(elements, pdata['elements']) for pid, pdata in parts.items()}
+    empty = np.zeros((0, 4), dtype=np.int64)
+
+    def role_nodes(role):
+        rows = [part_conn[pid] for pid, pdata in parts.items() if pdata['role'] == role]
+        return np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+
+    punch_nodes = role_nodes('PUNCH')
+    stripper_nodes = role_nodes('STRIPPER')
+    die_nodes = role_nodes('DIE')
     
     print("  Extracting surface faces...")
-    punch_faces = extract_surface_faces(elements, parts.get(1, {}).get('elements', []), nodes)
-    material_faces = extract_surface_faces(elements, parts.get(2, {}).get('elements', []), nodes)
-    die_faces = extract_surface_faces(elements, parts.get(3, {}).get('elements', []), nodes)
+    # Vectorized extractor (surface_fast.py), the three parts run concurrently
+    node_ids, node_xyz = node_arrays(nodes)
+    skin_conn = {pid: part_conn.get(pid, empty) for pid in (1, 2, 3)}
+    with phase('extract_surfaces') as prof:
+        if block_cache is None:
+            faces = extract_surfaces(skin_conn, node_ids, node_xyz)
+        else:
+            faces = block_cache.arrays('faces', [node_ids, node_xyz] + list(skin_conn.values()), lambda: {
+                str(pid): fc for pid, fc in extract_surfaces(skin_conn, node_ids, node_xyz).items()})
+            faces = {int(pid): fc for pid, fc in faces.items()}
+        prof.count(elements=sum(len(c) for c in skin_conn.values()), faces=sum(len(fc) for fc in faces.values()))
+    punch_faces, material_faces, die_faces = faces[1], faces[2], faces[3]
     print(f"  Extracted faces: Punch={len(punch_faces)}, Material={len(material_faces)}, Die={len(die_faces)}")
 
     # Collect nodes for Slave Groups
-    material_skin_nodes = collect_nodes(material_faces)
+    material_skin_nodes = np.unique(material_faces)
+    punch_slaves = die_slaves = material_skin_nodes
+    if contact_band:
+        with phase('contact_zone'):
+            # Contact zone only: slaves 400 (Punch) / 401 (Die), masters cut to the band
+            from contact_zone import localize_interface, print_report
+            before = {'Punch_Contact_Slave_Nodes': len(material_skin_nodes), 'Punch_Master_Faces': len(punch_faces),
+                      'Die_Contact_Slave_Nodes': len(material_skin_nodes), 'Die_Master_Faces': len(die_faces)}
+            punch_slaves, punch_faces = localize_interface(material_skin_nodes, punch_faces, node_ids, node_xyz,
+                                                           *contact_band)
+            die_slaves, die_faces = localize_interface(material_skin_nodes, die_faces, node_ids, node_xyz,
+                                                       *contact_band)
+            after = [len(punch_slaves), len(punch_faces), len(die_slaves), len(die_faces)]
+            print_report({k: (b, a) for (k, b), a in zip(before.items(), after)}, *contact_band)
+    die_slave_id = 401 if contact_band else 400
+    skins = contact_surface == 'skin'
+    if not skins:
+        n_skin = len(punch_faces) + len(material_faces) + len(die_faces)
+        n_solid = sum(len(c) for c in part_conn.values())
+        # Deck: 41-byte SH3N lines out, 51-byte segment lines in (masters only);
+        # animation: 9 /ANIM/ELEM float arrays + 3 node ids per skin element and frame
+        deck_delta = 41 * n_skin - 51 * (len(punch_faces) + len(die_faces))
+        print(f"  Segment contact surfaces: {n_skin} SH3N skin elements not written "
+              f"({n_solid + n_skin} -> {n_solid} elements, -{100.0 * n_skin / max(n_solid + n_skin, 1):.1f} %)")
+        print(f"    starter deck {-deck_delta / 1e6:+.2f} MB, animation ~{-n_skin * (9 + 3) * 4 / 1e6:+.2f} MB per frame")
     
-    max_elem_id = max(elements.keys()) if elements else 0
+    max_elem_id = max_element_id(elements)
     current_skin_eid = max_elem_id + 1
 
-    with open(output_path, 'w') as f:
+    with open(output_path, 'w', buffering=WRITE_BUFFER) as f:
+        # Geometry blocks (nodes, elements, skins, id lists) go through the block cache
+        def emit(writer, *args):
+            if block_cache is None:
+                writer(f, *args)
+            else:
+                block_cache.write(f, writer, *args)
+
         f.write("#RADIOSS STARTER\n/BEGIN\nPunch_Die_Shearing\n      2022         0\n")
         f.write("                  kg                   m                   s\n")
         f.write("                  kg                   m                   s\n")
         f.write("/TITLE\nPunch Die Shearing - V6 with AMS (Fine Blanking Optimized)\n")
         f.write("/NODE\n")
-        for nid in sorted(nodes.keys()):
-            x, y, z = nodes[nid]
-            f.write(f"{nid:10d}{x/1000.0:20.12E}{y/1000.0:20.12E}{z/1000.0:20.12E}\n")
-            
-        f.write("/MAT/LAW1/1\nS185_Steel\n#              RHO_I\n           7800.0\n#                  E                  NU\n          2.1E+11               0.28\n")
+        emit(write_node_block, node_ids, node_xyz)
+
+        f.write(f"/MAT/LAW1/1\n{MATERIALS[1]['name']}\n" + elastic_cards(MATERIALS[1]))
         f.write("                   0                   0                   0                   0                   0\n")
         
         # LAW2 (Elasto-Plastic) for 1060 Aluminum Alloy with element deletion
         # A (Sigma_y) = 110 MPa, B (E_tan) = 150 MPa, Xmax = 0.5 (50% plastic strain for deletion)
-        f.write("/MAT/LAW2/2\n1060_Alloy_Plastic\n")
-        f.write("#              RHO_I\n           2700.0\n")
-        f.write("#                  E                  NU\n          6.9E+10               0.33\n")
+        f.write(f"/MAT/LAW2/2\n{MATERIALS[2]['name']}\n")
+        f.write(elastic_cards(MATERIALS[2]))
         f.write("#                  a                   b                   n           EPS_p_max               Xmax\n")
         f.write("          1.1E+08           1.5E+08                0.20               1.0               0.5\n")
         f.write("                 0.0                 0.0                 0.0                 0.0                 0.0\n")
@@ -202,151 +302,310 @@ def write_starter_file(output_path, nodes, elements, elset_elements):
         f.write("                   0                   0                   0                   0                   0\n")
 
         # Skin Property with corrected 5-line format & N=5
-        f.write("/PROP/SHELL/999\nSkin_Property\n")
-        f.write("#   Ishell    Ismstr      Ish3n    Idrill\n")
-        f.write(f"{1:10d}{2:10d}{2:10d}{0:10d}\n")
-        f.write(f"{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}\n")
-        # Line 5: N(5), Thick(2), Ashear(3), Ithick(4), Iplas(5), Ipos(6)
-        f.write(f"{5.0:20.5f}{0.001:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}\n")
-        f.write(f"{0:20d}{0:20d}{0:20d}{0:20d}{0:20d}\n")
+        if skins:
+            f.write("/PROP/SHELL/999\nSkin_Property\n")
+            f.write("#   Ishell    Ismstr      Ish3n    Idrill\n")
+            f.write(f"{1:10d}{2:10d}{2:10d}{0:10d}\n")
+            f.write(f"{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}\n")
+            # Line 5: N(5), Thick(2), Ashear(3), Ithick(4), Iplas(5), Ipos(6)
+            f.write(f"{5.0:20.5f}{0.001:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}{0.0:20.5f}\n")
+            f.write(f"{0:20d}{0:20d}{0:20d}{0:20d}{0:20d}\n")
 
         for pid, pdata in parts.items():
             f.write(f"/PART/{pid}\n{pdata['name']}_{pdata['role']}\n#    Prop_ID     Mat_ID\n{pdata['prop_id']:10d}{pdata['mat_id']:10d}\n")
         
         # Skin Parts
-        if punch_faces: f.write(f"/PART/101\nPunch_Skin\n#    Prop_ID     Mat_ID\n       999         1\n")
-        if material_faces: f.write(f"/PART/102\nMaterial_Skin\n#    Prop_ID     Mat_ID\n       999         2\n")
-        if die_faces: f.write(f"/PART/103\nDie_Skin\n#    Prop_ID     Mat_ID\n       999         1\n")
+        if skins:
+            if len(punch_faces): f.write(f"/PART/101\nPunch_Skin\n#    Prop_ID     Mat_ID\n       999         1\n")
+            if len(material_faces): f.write(f"/PART/102\nMaterial_Skin\n#    Prop_ID     Mat_ID\n       999         2\n")
+            if len(die_faces): f.write(f"/PART/103\nDie_Skin\n#    Prop_ID     Mat_ID\n       999         1\n")
 
         # Surfaces Definitions (Masters only: Punch=300, Die=500)
         # Using strict formatting /300/0 and blanklines
-        if punch_faces:
-             f.write(f"/SURF/PART/300/0\nPunch_Skin_Surf\n{101:10d}\n\n")
-        
-        if die_faces:
-             f.write(f"/SURF/PART/500/0\nDie_Skin_Surf\n{103:10d}\n\n")
+        if skins:
+            if len(punch_faces):
+                 f.write(f"/SURF/PART/300/0\nPunch_Skin_Surf\n{101:10d}\n\n")
+
+            if len(die_faces):
+                 f.write(f"/SURF/PART/500/0\nDie_Skin_Surf\n{103:10d}\n\n")
+        else:
+            # Segment surfaces straight from the extracted faces, no shell elements
+            for surf_id, title, seg_faces in ((300, "Punch_Skin_Surf", punch_faces), (500, "Die_Skin_Surf", die_faces)):
+                if len(seg_faces):
+                    f.write(f"/SURF/SEG/{surf_id}\n{title}\n#  seg_ID  node_ID1  node_ID2  node_ID3  node_ID4\n")
+                    emit(write_segment_block, seg_faces)
 
         # Elements
         for pid, pdata in parts.items():
             f.write(f"/TETRA4/{pid}\n")
-            for eid in pdata['elements']:
-                ns = elements[eid]
-                f.write(f"{eid:10d}{ns[0]:10d}{ns[1]:10d}{ns[2]:10d}{ns[3]:10d}\n")
-        
-        # Skin Elements
-        if punch_faces:
-            f.write(f"/SH3N/101\n")
-            for face in punch_faces:
-                f.write(f"{current_skin_eid:10d}{face[0]:10d}{face[1]:10d}{face[2]:10d}\n")
-                current_skin_eid += 1
+            emit(write_element_block, pdata['elements'], part_conn[pid])
         
-        if material_faces:
-            f.write(f"/SH3N/102\n")
-            for face in material_faces:
-                f.write(f"{current_skin_eid:10d}{face[0]:10d}{face[1]:10d}{face[2]:10d}\n")
-                current_skin_eid += 1
-        
-        if die_faces:
-            f.write(f"/SH3N/103\n")
-            for face in die_faces:
-                f.write(f"{current_skin_eid:10d}{face[0]:10d}{face[1]:10d}{face[2]:10d}\n")
-                current_skin_eid += 1
+        # Skin Elements (ids continue past the largest solid id)
+        for skin_pid, skin_faces in ((101, punch_faces), (102, material_faces), (103, die_faces)):
+            if skins and len(skin_faces):
+                f.write(f"/SH3N/{skin_pid}\n")
+                skin_eids = np.arange(current_skin_eid, current_skin_eid + len(skin_faces))
+                emit(write_element_block, skin_eids, skin_faces)
+                current_skin_eid += len(skin_faces)
 
         # Node Groups
-        if punch_nodes:
+        if len(punch_nodes):
             f.write("/GRNOD/NODE/100\nPunch_Nodes\n")
-            for i, nid in enumerate(sorted(punch_nodes)):
-                f.write(f"{nid:10d}" + ("\n" if (i+1)%10==0 else ""))
-            f.write("\n")
-        if die_nodes:
+            emit(write_id_list, punch_nodes)
+        if len(die_nodes):
             f.write("/GRNOD/NODE/200\nDie_Nodes\n")
-            for i, nid in enumerate(sorted(die_nodes)):
-                f.write(f"{nid:10d}" + ("\n" if (i+1)%10==0 else ""))
-            f.write("\n")
+            emit(write_id_list, die_nodes)
             # Using IMPVEL with zero velocity instead of BCS for Die (more reliable)
             pass  # BCS removed, using IMPVEL instead
         
         # Stripper Node Group - ID 300 (moves with punch)
-        if stripper_nodes:
+        if len(stripper_nodes):
             f.write("/GRNOD/NODE/300\nStripper_Nodes\n")
-            for i, nid in enumerate(sorted(stripper_nodes)):
-                f.write(f"{nid:10d}" + ("\n" if (i+1)%10==0 else ""))
-            f.write("\n")
+            emit(write_id_list, stripper_nodes)
 
         # Material Skin Nodes Group (Slave) - ID 400
-        if material_skin_nodes:
+        if contact_band:
+            if len(punch_slaves):
+                f.write("/GRNOD/NODE/400\nPunch_Contact_Slave_Nodes\n")
+                emit(write_id_list, punch_slaves)
+            if len(die_slaves):
+                f.write("/GRNOD/NODE/401\nDie_Contact_Slave_Nodes\n")
+                emit(write_id_list, die_slaves)
+        elif len(material_skin_nodes):
             f.write("/GRNOD/NODE/400\nMaterial_Skin_Nodes\n")
-            for i, nid in enumerate(sorted(material_skin_nodes)):
-                f.write(f"{nid:10d}" + ("\n" if (i+1)%10==0 else ""))
-            f.write("\n")
+            emit(write_id_list, material_skin_nodes)
+
+        # Symmetry / cut-plane node groups - ID 600+ (strip or half models)
+        symmetry_groups = [g for g in (symmetry_groups or []) if len(g['nodes'])]
+        for k, grp in enumerate(symmetry_groups):
+            f.write(f"/GRNOD/NODE/{600 + k}\n{grp['name']}\n")
+            emit(write_id_list, grp['nodes'])
             
         # Velocity functions
-        f.write("/FUNCT/1\nVelocity_Ramp\n#                  X                   Y\n             0.00000             0.00000\n             0.00002            -5.00000\n             0.05000            -5.00000\n")
-        f.write("/FUNCT/2\nZero_Velocity\n#                  X                   Y\n             0.00000             0.00000\n             0.10000             0.00000\n")
+        f.write(funct_card(1, "Velocity_Ramp", PUNCH_VELOCITY))
+        f.write(funct_card(2, "Zero_Velocity", ZERO_VELOCITY))
         # Function 3: Stripper Velocity (Stop at 0.2mm)
-        # Velocity = 5000 mm/s. Target Dist = 0.2mm.
-        # Time = 0.2 / 5000 = 0.00004 s.
-        # Ramp: 0 -> -5.0 in 0.00002s.
-        f.write("/FUNCT/3\nStripper_Limit\n#                  X                   Y\n             0.00000             0.00000\n             0.00002            -5.00000\n             0.00004            -5.00000\n             0.00005             0.00000\n             0.10000             0.00000\n")
+        f.write(funct_card(3, "Stripper_Limit", STRIPPER_VELOCITY))
         
         # Punch velocity (Z direction, moving down)
-        if punch_nodes:
-            f.write("/IMPVEL/1\nPunch_Velocity\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n         1         Z         0         0       100         0         0\n#             Ascale_x            Fscale_y            Tstart              Tstop\n             1.00000             1.00000             0.00000         1.00000E+30\n")
+        if len(punch_nodes):
+            f.write(impvel_card(1, "Punch_Velocity", 1, "Z", 100))
         
         # Die fixed in all directions using zero velocity
-        if die_nodes:
-            f.write("/IMPVEL/2\nDie_Fixed_X\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n         2         X         0         0       200         0         0\n#             Ascale_x            Fscale_y            Tstart              Tstop\n             1.00000             1.00000             0.00000         1.00000E+30\n")
-            f.write("/IMPVEL/3\nDie_Fixed_Y\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n         2         Y         0         0       200         0         0\n#             Ascale_x            Fscale_y            Tstart              Tstop\n             1.00000             1.00000             0.00000         1.00000E+30\n")
-            f.write("/IMPVEL/4\nDie_Fixed_Z\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n         2         Z         0         0       200         0         0\n#             Ascale_x            Fscale_y            Tstart              Tstop\n             1.00000             1.00000             0.00000         1.00000E+30\n")
+        if len(die_nodes):
+            f.write(impvel_card(2, "Die_Fixed_X", 2, "X", 200))
+            f.write(impvel_card(3, "Die_Fixed_Y", 2, "Y", 200))
+            f.write(impvel_card(4, "Die_Fixed_Z", 2, "Z", 200))
         
         # Stripper velocity (Z direction, moving down with punch)
-        if stripper_nodes:
-            f.write("/IMPVEL/5\nStripper_Velocity\n#   Funct_ID    Dir   Skew_ID   Sens_ID   Gnod_ID     Icoor    Iframe\n         3         Z         0         0       300         0         0\n#             Ascale_x            Fscale_y            Tstart              Tstop\n             1.00000             1.00000             0.00000         1.00000E+30\n")
+        if len(stripper_nodes):
+            f.write(impvel_card(5, "Stripper_Velocity", 3, "Z", 300))
+
+        # Zero normal velocity on cut planes (symmetry condition), IMPVEL 10+
+        for k, grp in enumerate(symmetry_groups):
+            f.write(impvel_card(10 + k, f"{grp['name']}_Vn", 2, grp['dir'], 600 + k))
         
         # Contact using Slave Node Group 400 and Master Surfaces 300/500
         # Contact with AMS-optimized settings (Istf=4, Iform=2)
-        if punch_faces and material_faces:
+        if len(punch_faces) and len(punch_slaves):
             f.write("/INTER/TYPE7/1\nPunch_Material_Contact\n#   Slav_id    Mast_id       Istf       Ithe       Igap       Ibag       Idel      Icurv\n       400       300         4         0         2         0         1         0\n#               Fric            Gap_min            Gapmax            Tstart             Tstop\n             0.10000             0.00010             1.00000             0.00000         1.00000E+30\n#              Stfac            Fpenmax               I_BC             Iform\n              20.000             0.00000         0         2\n")
         
-        if die_faces and material_faces:
-            f.write("/INTER/TYPE7/2\nDie_Material_Contact\n#   Slav_id    Mast_id       Istf       Ithe       Igap       Ibag       Idel      Icurv\n       400       500         4         0         2         0         1         0\n#               Fric            Gap_min            Gapmax            Tstart             Tstop\n             0.10000             0.00010             1.00000             0.00000         1.00000E+30\n#              Stfac            Fpenmax               I_BC             Iform\n              20.000             0.00000         0         2\n")
+        if len(die_faces) and len(die_slaves):
+            f.write("/INTER/TYPE7/2\nDie_Material_Contact\n#   Slav_id    Mast_id       Istf       Ithe       Igap       Ibag       Idel      Icurv\n"
+                    f"{die_slave_id:10d}       500         4         0         2         0         1         0\n#               Fric            Gap_min            Gapmax            Tstart             Tstop\n             0.10000             0.00010             1.00000             0.00000         1.00000E+30\n#              Stfac            Fpenmax               I_BC             Iform\n              20.000             0.00000         0         2\n")
 
-        # AMS (Advanced Mass Scaling) for fine blanking
-        # Note: /AMS is recognized by Starter, but /DT/AMS not supported in OSS Engine
-        # Using aggressive Mass Scaling (Tmin=5E-7) for ~3-5x speed improvement
+        # Selective mass scaling (mass_scaling.py): added mass on the tool nodes only,
+        # node groups 700+ / ADMAS 1+. /AMS is recognized by Starter, but /DT/AMS
+        # is not supported in the OSS Engine.
+        for k, grp in enumerate(g for g in (mass_groups or []) if len(g['nodes'])):
+            f.write(f"/GRNOD/NODE/{700 + k}\n{grp['name']}\n")
+            emit(write_id_list, grp['nodes'])
+            f.write(admas_card(k + 1, grp['name'], grp['mass'], 700 + k))
+    if block_cache is not None:
+        block_cache.print_stats()
 
 
-def write_engine_file(output_path):
+@profiled(counts=lambda r, output_path, *a, **k: {'bytes_out': file_size(output_path)})
+def write_engine_file(output_path, nodal_dt=False, run_number=1, t_end=RUN_END_TIME, anim_start=0.0,
+                      anim_dt=ANIM_DT, anim_elem=ANIM_ELEM, anim_vect=ANIM_VECT, rfile=RFILE_CYCLES,
+                      dt_noda=(0.9, 0.0)):
+    """Engine deck of one run. The defaults give the single-run deck; engine_stages.py
+    writes runs 2, 3, ... (restarts) with their own end time, output and dt controls."""
     print(f"Writing Engine: {output_path}")
     with open(output_path, 'w') as f:
-        f.write("/RUN/Punch_Die_Shearing/1\n             0.0007000000\n")
-
-        f.write("/RFILE/5000\n/ANIM/DT\n             0.0000000000         1.00000E-04\n")
-        f.write("/ANIM/ELEM/EPSP\n/ANIM/ELEM/VONM\n/ANIM/ELEM/ENER\n")
-        # Stress components for η, Lode, σ1 calculation in post-processing
-        f.write("/ANIM/ELEM/SIGX\n")
-        f.write("/ANIM/ELEM/SIGY\n")
-        f.write("/ANIM/ELEM/SIGZ\n")
-        f.write("/ANIM/ELEM/SIGXY\n")
-        f.write("/ANIM/ELEM/SIGYZ\n")
-        f.write("/ANIM/ELEM/SIGZX\n")
-        f.write("/ANIM/VECT/DISP\n/ANIM/VECT/VEL\n/END\n")
+        f.write(f"/RUN/Punch_Die_Shearing/{run_number}\n{t_end:25.10f}\n")
+        if nodal_dt:
+            # Nodal time step so the /ADMAS mass sets the step; Tmin = 0 adds no further mass
+            tscale, tmin = dt_noda
+            f.write("/DT/NODA/CST/0\n#             Tscale                Tmin\n"
+                    f"{tscale:20.5f}" + (f"{tmin:20.5E}" if tmin else f"{tmin:20.5f}") + "\n")
+
+        f.write(f"/RFILE/{rfile}\n/ANIM/DT\n{anim_start:25.10f}{anim_dt:20.5E}\n")
+        # SIGX ... SIGZX: stress components for η, Lode, σ1 calculation in post-processing
+        f.write("".join(f"/ANIM/ELEM/{name}\n" for name in anim_elem))
+        f.write("".join(f"/ANIM/VECT/{name}\n" for name in anim_vect))
+        f.write("/END\n")
 
 def main():
-    import sys
-    if len(sys.argv) > 1:
-        inp_path = sys.argv[1]
-    else:
-        inp_path = r"ASSY_OpenRadioss_PM7T1C_20260102.inp"
+    import argparse
+    ap = argparse.ArgumentParser(description="Calculix INP -> OpenRadioss RAD converter")
+    ap.add_argument("inp_path", nargs="?", default=r"ASSY_OpenRadioss_PM7T1C_20260102.inp")
+    ap.add_argument("--fast", action="store_true", help="memory-mapped parallel NumPy parser")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes (default: all cores)")
+    ap.add_argument("--no-cache", action="store_true", help="parse the INP text instead of the .meshcache")
+    ap.add_argument("--strip-width", type=float, default=None, help="strip model: keep a slab of this width (mm)")
+    ap.add_argument("--strip-axis", choices=["x", "y"], default="x", help="slab normal (default x)")
+    ap.add_argument("--strip-center", type=float, default=None, help="slab centre (mm, default Material centre)")
+    ap.add_argument("--clip-box", type=float, nargs=6, default=None, metavar=("X0", "Y0", "Z0", "X1", "Y1", "Z1"),
+                    help="strip model: keep tets with centroid inside this box (mm)")
+    ap.add_argument("--symmetry", action="store_true",
+                    help="detect X/Y mirror planes per part and convert a half or quarter model")
+    ap.add_argument("--symmetry-tol", type=float, default=1.0e-3,
+                    help="with --symmetry: node match tolerance (mm)")
+    ap.add_argument("--refine-box", type=float, nargs=6, default=None, metavar=("X0", "Y0", "Z0", "X1", "Y1", "Z1"),
+                    help="split the Material tets with centroid inside this box (mm) 1:8, conforming")
+    ap.add_argument("--refine-edges", type=float, default=None, metavar="RADIUS",
+                    help="split the Material tets within RADIUS mm (XY) of the Punch/Die cutting edges")
+    ap.add_argument("--refine-levels", type=int, default=1, help="with --refine-box / --refine-edges: passes")
+    ap.add_argument("--renumber", choices=["rcm", "morton"], default=None,
+                    help="renumber nodes/elements for locality (reverse Cuthill-McKee or Morton curve)")
+    ap.add_argument("--preflight", action="store_true", help="print the initial time step and runtime estimate")
+    ap.add_argument("--decomp-preview", type=int, default=None, metavar="CORES",
+                    help="preview domain decompositions and recommend -np / -nt for this many cores")
+    ap.add_argument("--contact-zone", action="store_true",
+                    help="restrict the TYPE7 slave nodes / master faces to a band around the opposing side")
+    ap.add_argument("--contact-margin", type=float, default=0.5,
+                    help="contact band width (mm); the punch stroke is added along Z")
+    ap.add_argument("--target-dt", type=float, default=None,
+                    help="selective mass scaling: add mass on Punch/Die/Stripper up to this time step (s)")
+    ap.add_argument("--material-cap", type=float, default=None,
+                    help="with --target-dt, also scale the Material by at most this added-mass fraction per node")
+    ap.add_argument("--stages", action="store_true",
+                    help="approach / cutting / separation engine runs (_0001, _0002, ...) chained by restart")
+    ap.add_argument("--crunch-fraction", type=float, default=0.7,
+                    help="with --stages: start of the separation run, fraction of the Material thickness cut")
+    ap.add_argument("--approach-tmin", type=float, default=0.0,
+                    help="with --stages: minimum nodal time step (s) in the approach run (added mass is kept)")
+    ap.add_argument("--contact-surface", choices=["skin", "seg"], default="skin",
+                    help="TYPE7 masters as SH3N skin parts 101-103 (default) or /SURF/SEG segments without skins")
+    ap.add_argument("--block-cache", nargs="?", const=".radblocks", default=None, metavar="DIR",
+                    help="reuse rendered /NODE, /TETRA4, /SH3N, /GRNOD blocks from this directory "
+                         "(default .radblocks; share it across a sweep)")
+    ap.add_argument("--profile", nargs="?", const="", default=None, metavar="JSON",
+                    help="time every phase (wall, CPU, RSS, tracemalloc, throughput) and write a JSON "
+                         "report (default <base>_profile.json)")
+    ap.add_argument("--profile-cprofile", default=None, metavar="PROF", help="with --profile: cProfile stats file")
+    ap.add_argument("--profile-flame", default=None, metavar="FOLDED",
+                    help="with --profile: sampled folded stacks for flamegraph.pl / speedscope")
+    ap.add_argument("--profile-no-trace", action="store_true",
+                    help="with --profile: skip tracemalloc (clean timings, no allocation sites)")
+    args = ap.parse_args()
+    if args.symmetry and (args.strip_width or args.clip_box):
+        ap.error("--symmetry cannot be combined with --strip-width / --clip-box")
+    inp_path = args.inp_path
     output_dir = r"."
     base_name = os.path.splitext(os.path.basename(inp_path))[0]
     starter_path = os.path.join(output_dir, f"{base_name}_0000.rad")
     engine_path = os.path.join(output_dir, f"{base_name}_0001.rad")
     print(f"Calculix to OpenRadioss Converter V6 (AMS - Fine Blanking Optimized)")
-    nodes, elements, elset_elements = parse_inp_file(inp_path)
-    write_starter_file(starter_path, nodes, elements, elset_elements)
-    write_engine_file(engine_path)
+    if args.profile is not None:
+        import phase_profile
+        phase_profile.start(trace=not args.profile_no_trace, cprofile=args.profile_cprofile,
+                            flame=args.profile_flame)
+    nodes, elements, elset_elements = parse_inp_file(inp_path, fast=args.fast, workers=args.workers,
+                                                     cache=not args.no_cache)
+    symmetry_groups = []
+    # Mesh stages work on the NumPy arrays (inp_fast mesh dict)
+    from inp_fast import mesh_from_views, mesh_views
+    mesh = None
+    if args.strip_width or args.clip_box or args.symmetry or args.refine_box or args.refine_edges \
+            or args.preflight or args.target_dt or args.renumber or args.decomp_preview or args.stages:
+        mesh = mesh_from_views(nodes, elements, elset_elements)
+    if args.strip_width or args.clip_box:
+        with phase('strip_model'):
+            import strip_model
+            if args.clip_box:
+                lo, hi = args.clip_box[:3], args.clip_box[3:]
+            else:
+                lo, hi = strip_model.slab_box(mesh, args.strip_axis, args.strip_width, args.strip_center)
+            mesh, groups, report = strip_model.clip_mesh(mesh, lo, hi)
+            strip_model.print_report(report, lo, hi)
+            if not report['elements_after']:
+                ap.error("the strip / clip box keeps no elements")
+            symmetry_groups.extend(groups)
+            nodes, elements, elset_elements = mesh_views(mesh)
+    if args.symmetry:
+        with phase('symmetry'):
+            import symmetry
+            found = symmetry.detect_planes(mesh, args.symmetry_tol)
+            symmetry.print_detection(found)
+            if found['planes']:
+                mesh, groups, report = symmetry.symmetric_model(mesh, found['planes'], np.asarray(found['center']))
+                symmetry.print_report(report)
+                symmetry.write_sidecar(os.path.join(output_dir, f"{base_name}_symmetry.json"), report)
+                symmetry_groups.extend(groups)
+                nodes, elements, elset_elements = mesh_views(mesh)
+    if args.refine_box or args.refine_edges:
+        with phase('local_refine'):
+            import local_refine
+            box = (args.refine_box[:3], args.refine_box[3:]) if args.refine_box else None
+            mesh, symmetry_groups, report = local_refine.refine_mesh(mesh, box, args.refine_edges, args.refine_levels,
+                                                                     groups=symmetry_groups)
+            local_refine.print_report(report)
+            nodes, elements, elset_elements = mesh_views(mesh)
+    if args.renumber:
+        with phase('renumber'):
+            import renumber
+            old_ids = mesh['node_ids']
+            mesh, new_id_of, report = renumber.renumber_mesh(mesh, args.renumber)
+            renumber.print_report(report)
+            symmetry_groups = renumber.remap_groups(symmetry_groups, old_ids, new_id_of)
+            nodes, elements, elset_elements = mesh_views(mesh)
+    if mesh is not None and 'orig_node_ids' in mesh:
+        import renumber
+        renumber.write_id_map(os.path.join(output_dir, f"{base_name}_idmap.csv"), mesh)
+    if args.preflight:
+        with phase('preflight_dt'):
+            import preflight_dt
+            preflight_dt.print_report(preflight_dt.preflight(mesh, skins=args.contact_surface == 'skin'))
+    if args.decomp_preview:
+        with phase('domain_decomp'):
+            import domain_decomp
+            report = domain_decomp.preview(mesh, domain_decomp.default_ks(args.decomp_preview), args.contact_margin)
+            domain_decomp.print_report(report, args.decomp_preview)
+    mass_groups = []
+    if args.target_dt:
+        with phase('mass_scaling'):
+            import mass_scaling
+            plan = mass_scaling.plan_mass_scaling(mesh, args.target_dt, material_cap=args.material_cap)
+            mass_scaling.print_plan(plan)
+            mass_groups = plan['groups']
+    contact_band = None
+    if args.contact_zone:
+        if args.contact_margin <= 0:
+            ap.error("--contact-margin must be positive")
+        from contact_zone import table_stroke
+        # (margin, stroke) in mm; /FUNCT/1 is in m/s
+        contact_band = (args.contact_margin, 1000.0 * table_stroke(PUNCH_VELOCITY, RUN_END_TIME))
+    block_cache = None
+    if args.block_cache:
+        from deck_cache import BlockCache
+        block_cache = BlockCache(args.block_cache)
+    write_starter_file(starter_path, nodes, elements, elset_elements, symmetry_groups=symmetry_groups,
+                       mass_groups=mass_groups, contact_band=contact_band, block_cache=block_cache,
+                       contact_surface=args.contact_surface)
+    if args.stages:
+        with phase('engine_stages'):
+            import engine_stages
+            plan = engine_stages.plan_stages(mesh, crunch_fraction=args.crunch_fraction,
+                                             approach_tmin=args.approach_tmin)
+            engine_stages.print_plan(plan)
+            engine_stages.write_stage_files(os.path.join(output_dir, base_name), plan, nodal_dt=bool(mass_groups))
+    else:
+        write_engine_file(engine_path, nodal_dt=bool(mass_groups))
     print("Conversion complete!")
+    if args.profile is not None:
+        phase_profile.finish(args.profile or os.path.join(output_dir, f"{base_name}_profile.json"))
 
 if __name__ == "__main__":
     main()
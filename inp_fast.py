@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped Calculix/Abaqus INP parser (NumPy arrays)
+
+The deck is memory-mapped, *Node / *Element block boundaries are located with
+one regex pass over the raw bytes, and the data lines are parsed as whole
+byte ranges with np.fromstring. Large blocks are split into chunks at line
+boundaries and parsed across a process pool.
+
+The block rules follow inp2radioss_v6.parse_inp_file:
+  - *Node blocks without NSET/FILE in the header hold node coordinates
+  - *Element blocks with ELSET= hold connectivity (first 4 nodes are kept)
+Lines that the legacy parser would skip are skipped here as well.
+*Nset blocks (plain lists or GENERATE ranges) are read into flat id arrays.
+"""
+
+import mmap
+import os
+import re
+import sys
+import warnings
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_BYTES = 8 << 20           # target size of one parse task
+PARALLEL_MIN_BYTES = 32 << 20   # below this the pool costs more than it saves
+
+_KEYWORD_RE = re.compile(rb'^[ \t]*\*(?!\*)[^\r\n]*', re.M)
+_ELSET_RE = re.compile(r'ELSET=([^,\s]+)', re.IGNORECASE)
+_NSET_RE = re.compile(r'NSET=([^,\s]+)', re.IGNORECASE)
+_TYPE_RE = re.compile(r'TYPE=([^,\s]+)', re.IGNORECASE)
+_INT_RE = re.compile(rb'-?\d+')
+
+
+def scan_blocks(mm, with_lines=False):
+    """One pass over the mapped deck: return every keyword block as a dict
+    with header text, header offset and the [data_start, data_end) byte range.
+    with_lines=True also records the 1-based line number of each header."""
+    blocks = []
+    size = len(mm)
+    line = 1
+    prev = 0
+    for m in _KEYWORD_RE.finditer(mm):
+        if with_lines:
+            line += mm[prev:m.start()].count(b'\n')
+            prev = m.start()
+        nl = mm.find(b'\n', m.end())
+        data_start = size if nl < 0 else nl + 1
+        if blocks:
+            blocks[-1]['data_end'] = m.start()
+        blocks.append({
+            'header': m.group(0).decode('utf-8', 'replace').strip(),
+            'offset': m.start(),
+            'data_start': data_start,
+            'data_end': size,
+        })
+        if with_lines:
+            blocks[-1]['line'] = line
+    return blocks
+
+
+def classify_block(header):
+    """Return ('node', None), ('element', elset_name), ('nset', nset_name),
+    ('nset_gen', nset_name) for GENERATE ranges, or (None, None)."""
+    up = header.upper()
+    if up.startswith('*NODE') and 'NSET' not in up and 'FILE' not in up:
+        return 'node', None
+    if up.startswith('*ELEMENT'):
+        match = _ELSET_RE.search(header)
+        if match:
+            return 'element', match.group(1)
+    if up.startswith('*NSET'):
+        match = _NSET_RE.search(header)
+        if match:
+            return ('nset_gen' if 'GENERATE' in up else 'nset'), match.group(1)
+    return None, None
+
+
+def _split_range(mm, start, end, chunk_bytes):
+    """Split [start, end) into ranges of about chunk_bytes ending on a newline."""
+    ranges = []
+    pos = start
+    while pos < end:
+        stop = min(pos + chunk_bytes, end)
+        if stop < end:
+            nl = mm.find(b'\n', stop, end)
+            stop = end if nl < 0 else nl + 1
+        ranges.append((pos, stop))
+        pos = stop
+    return ranges
+
+
+def _first_ncols(buf):
+    for line in buf.split(b'\n', 64)[:64]:
+        s = line.strip()
+        if s and not s.startswith(b'*'):
+            return len([p for p in s.split(b',') if p.strip()])
+    return 0
+
+
+def _parse_lines(buf, kind):
+    # Line-by-line fallback with exactly the legacy acceptance rules
+    ids, vals = [], []
+    for line in buf.decode('utf-8', 'replace').splitlines():
+        line_s = line.strip()
+        if not line_s or line_s.startswith('*'):
+            continue
+        parts = line_s.replace(' ', '').split(',')
+        try:
+            if kind == 'node':
+                if len(parts) >= 4:
+                    row = (float(parts[1]), float(parts[2]), float(parts[3]))
+                    ids.append(int(parts[0]))
+                    vals.append(row)
+            elif len(parts) >= 5:
+                row = [int(p) for p in parts[1:5]]
+                ids.append(int(parts[0]))
+                vals.append(row)
+        except ValueError:
+            pass
+    width = 3 if kind == 'node' else 4
+    dtype = np.float64 if kind == 'node' else np.int64
+    return (np.array(ids, dtype=np.int64),
+            np.array(vals, dtype=dtype).reshape(-1, width))
+
+
+def _parse_ids(buf, generate):
+    if b'*' in buf:
+        buf = b'\n'.join(l for l in buf.split(b'\n') if not l.strip().startswith(b'*'))
+    ids = np.fromiter(map(int, _INT_RE.findall(buf)), dtype=np.int64)
+    if generate:
+        rng = ids[:len(ids) // 3 * 3].reshape(-1, 3)
+        parts = [np.arange(a, b + 1, c if c else 1) for a, b, c in rng.tolist()]
+        ids = np.concatenate(parts) if parts else ids[:0]
+    return ids, None
+
+
+def _parse_chunk(buf, kind, ncols):
+    """Parse one byte range of data lines into (ids, values)."""
+    if kind in ('nset', 'nset_gen'):
+        return _parse_ids(buf, kind == 'nset_gen')
+    body = buf.strip()
+    if not body:
+        return _parse_lines(b'', kind)
+    nlines = body.count(b'\n') + 1
+    min_cols = 4 if kind == 'node' else 5
+    if ncols >= min_cols and b'*' not in body:
+        dtype = np.float64 if kind == 'node' else np.int64
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                flat = np.fromstring(body.replace(b'\n', b',').decode('ascii'),
+                                     dtype=dtype, sep=',')
+        except (ValueError, DeprecationWarning, UnicodeDecodeError):
+            flat = None
+        if flat is not None and flat.size == nlines * ncols:
+            table = flat.reshape(nlines, ncols)
+            if kind == 'node':
+                ids = table[:, 0]
+                if np.array_equal(ids, np.trunc(ids)):
+                    return ids.astype(np.int64), np.ascontiguousarray(table[:, 1:4])
+            else:
+                return table[:, 0].copy(), np.ascontiguousarray(table[:, 1:5])
+    return _parse_lines(body, kind)
+
+
+_worker_map = {}
+
+
+def _parse_task(task):
+    path, start, end, kind, ncols = task
+    mm = _worker_map.get(path)
+    if mm is None:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _worker_map[path] = mm
+    return _parse_chunk(mm[start:end], kind, ncols)
+
+
+def parse_inp_arrays(inp_path, workers=None, chunk_bytes=CHUNK_BYTES, keywords=False):
+    """Parse nodes, elset connectivity and nsets into contiguous arrays.
+
+    Returns a dict with
+      node_ids (N,) int64 sorted, coords (N,3) float64,
+      elem_ids (E,) int64, conn (E,4) int64 grouped by elset,
+      elset_names [K], elset_types [K], elset_offsets (K+1,) int64 row offsets,
+      nset_names [S], nset_offsets (S+1,), nset_members int64.
+    keywords=True adds 'keywords': [[header, line], ...] for every keyword line.
+    """
+    inp_path = os.path.abspath(inp_path)
+    with open(inp_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _assemble([], [], [], {}, [] if keywords else None)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        tasks = []
+        owners = []     # per task: None for nodes, elset/nset name otherwise
+        elset_types = {}
+        blocks = scan_blocks(mm, with_lines=keywords)
+        for block in blocks:
+            kind, name = classify_block(block['header'])
+            if kind == 'element' and name not in elset_types:
+                match = _TYPE_RE.search(block['header'])
+                elset_types[name] = match.group(1).upper() if match else ''
+            if kind is None or block['data_end'] <= block['data_start']:
+                continue
+            start, end = block['data_start'], block['data_end']
+            ncols = _first_ncols(mm[start:min(end, start + 4096)])
+            for a, b in _split_range(mm, start, end, chunk_bytes):
+                tasks.append((inp_path, a, b, kind, ncols))
+                owners.append(name)
+
+        total = sum(t[2] - t[1] for t in tasks)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(tasks) > 1 and total >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                results = list(pool.map(_parse_task, tasks))
+        else:
+            results = [_parse_chunk(mm[t[1]:t[2]], t[3], t[4]) for t in tasks]
+    finally:
+        mm.close()
+
+    node_parts = []
+    elem_parts = []
+    nset_parts = []
+    for task, owner, res in zip(tasks, owners, results):
+        if task[3] == 'node':
+            node_parts.append(res)
+        elif task[3] == 'element':
+            elem_parts.append((owner, res))
+        else:
+            nset_parts.append((owner, res[0]))
+    kw = [[b['header'], b['line']] for b in blocks] if keywords else None
+    return _assemble(node_parts, elem_parts, nset_parts, elset_types, kw)
+
+
+def _group(parts):
+    names, groups = [], {}
+    for name, res in parts:
+        if name not in groups:
+            groups[name] = []
+            names.append(name)
+        groups[name].append(res)
+    return names, groups
+
+
+def _assemble(node_parts, elem_parts, nset_parts, elset_types, keywords):
+    if node_parts:
+        ids = np.concatenate([p[0] for p in node_parts])
+        xyz = np.concatenate([p[1] for p in node_parts])
+    else:
+        ids = np.zeros(0, dtype=np.int64)
+        xyz = np.zeros((0, 3), dtype=np.float64)
+    # Same result as the legacy dict: sorted ids, the last definition wins
+    order = np.argsort(ids, kind='stable')
+    ids, xyz = ids[order], xyz[order]
+    if ids.size:
+        keep = np.append(ids[1:] != ids[:-1], True)
+        ids, xyz = ids[keep], xyz[keep]
+
+    names, groups = _group(elem_parts)
+    elem_ids, conn, offsets = [], [], [0]
+    for name in names:
+        elem_ids.extend(r[0] for r in groups[name])
+        conn.extend(r[1] for r in groups[name])
+        offsets.append(offsets[-1] + sum(len(r[0]) for r in groups[name]))
+    mesh = {
+        'node_ids': np.ascontiguousarray(ids),
+        'coords': np.ascontiguousarray(xyz),
+        'elem_ids': np.concatenate(elem_ids) if elem_ids else np.zeros(0, dtype=np.int64),
+        'conn': np.concatenate(conn) if conn else np.zeros((0, 4), dtype=np.int64),
+        'elset_names': names,
+        'elset_types': [elset_types.get(name, '') for name in names],
+        'elset_offsets': np.array(offsets, dtype=np.int64),
+    }
+    snames, sgroups = _group(nset_parts)
+    members = [m for name in snames for m in sgroups[name]]
+    soff = np.cumsum([0] + [sum(len(m) for m in sgroups[name]) for name in snames])
+    mesh['nset_names'] = snames
+    mesh['nset_offsets'] = soff.astype(np.int64)
+    mesh['nset_members'] = np.concatenate(members) if members else np.zeros(0, dtype=np.int64)
+    if keywords is not None:
+        mesh['keywords'] = keywords
+    return mesh
+
+
+class NodeView(Mapping):
+    """Read-only {nid: (x, y, z)} view over sorted node arrays."""
+
+    def __init__(self, ids, coords):
+        self.ids = ids
+        self.coords = coords
+
+    def _index(self, nid):
+        i = int(np.searchsorted(self.ids, nid))
+        if i < len(self.ids) and self.ids[i] == nid:
+            return i
+        raise KeyError(nid)
+
+    def __getitem__(self, nid):
+        return tuple(self.coords[self._index(nid)].tolist())
+
+    def __contains__(self, nid):
+        try:
+            self._index(nid)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ElementView(Mapping):
+    """Read-only {eid: [n1, n2, n3, n4]} view over connectivity arrays."""
+
+    def __init__(self, ids, conn):
+        self.ids = ids
+        self.conn = conn
+        self._order = np.argsort(ids, kind='stable')
+        self._sorted = ids[self._order]
+
+    def _index(self, eid):
+        i = int(np.searchsorted(self._sorted, eid, side='right')) - 1
+        if i >= 0 and self._sorted[i] == eid:
+            return self._order[i]
+        raise KeyError(eid)
+
+    def __getitem__(self, eid):
+        return self.conn[self._index(eid)].tolist()
+
+    def __contains__(self, eid):
+        try:
+            self._index(eid)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(np.unique(self.ids).tolist())
+
+    def __len__(self):
+        return len(np.unique(self.ids))
+
+    def rows(self, eids):
+        """Connectivity rows for eids; ids that are not present are dropped."""
+        eids = np.asarray(eids, dtype=np.int64)
+        i = np.searchsorted(self._sorted, eids, side='right') - 1
+        ok = i >= 0
+        ok[ok] = self._sorted[i[ok]] == eids[ok]
+        return self.conn[self._order[i[ok]]]
+
+
+def node_arrays(nodes):
+    """(ids, coords) sorted by id for a NodeView or a plain {nid: xyz} dict."""
+    if isinstance(nodes, NodeView):
+        return nodes.ids, nodes.coords
+    ids = np.fromiter(nodes.keys(), dtype=np.int64, count=len(nodes))
+    order = np.argsort(ids)
+    coords = np.array(list(nodes.values()), dtype=np.float64).reshape(-1, 3)
+    return ids[order], coords[order]
+
+
+def max_element_id(elements):
+    """Largest element id of an ElementView or dict (0 when empty)."""
+    if isinstance(elements, ElementView):
+        return int(elements.ids.max()) if len(elements.ids) else 0
+    return max(elements.keys()) if elements else 0
+
+
+def element_rows(elements, eids):
+    """(E,4) connectivity of eids, skipping ids missing from elements."""
+    if isinstance(elements, ElementView):
+        return elements.rows(eids)
+    rows = [elements[eid] for eid in eids if eid in elements]
+    return np.array(rows, dtype=np.int64).reshape(-1, 4)
+
+
+def mesh_from_views(nodes, elements, elset_elements):
+    """Inverse of mesh_views: build the array mesh dict from parse_inp_file output
+    (works for the legacy dicts as well as for the views)."""
+    ids, xyz = node_arrays(nodes)
+    names = list(elset_elements)
+    eids, conn = [], []
+    for name in names:
+        e = np.asarray(elset_elements[name], dtype=np.int64)
+        if not isinstance(elements, ElementView):
+            e = e[[int(x) in elements for x in e.tolist()]] if len(e) else e
+        eids.append(e)
+        conn.append(element_rows(elements, e))
+    offsets = np.cumsum([0] + [len(e) for e in eids]).astype(np.int64)
+    return {
+        'node_ids': ids,
+        'coords': xyz,
+        'elem_ids': np.concatenate(eids) if eids else np.zeros(0, dtype=np.int64),
+        'conn': np.concatenate(conn) if conn else np.zeros((0, 4), dtype=np.int64),
+        'elset_names': names,
+        'elset_offsets': offsets,
+    }
+
+
+def mesh_views(mesh):
+    """Return (nodes, elements, elset_elements) shaped like parse_inp_file."""
+    nodes = NodeView(mesh['node_ids'], mesh['coords'])
+    elements = ElementView(mesh['elem_ids'], mesh['conn'])
+    off = mesh['elset_offsets']
+    elset_elements = {name: mesh['elem_ids'][off[k]:off[k + 1]]
+                      for k, name in enumerate(mesh['elset_names'])}
+    return nodes, elements, elset_elements
+
+
+if __name__ == "__main__":
+    import time
+    if len(sys.argv) < 2:
+        print("Usage: python inp_fast.py file.inp [workers]")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    mesh = parse_inp_arrays(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    dt = time.perf_counter() - t0
+    print(f"{len(mesh['node_ids'])} nodes, {len(mesh['elem_ids'])} elements in {dt:.3f} s")
+    off = mesh['elset_offsets']
+    for k, name in enumerate(mesh['elset_names']):
+        print(f"  {name}: {off[k + 1] - off[k]}")
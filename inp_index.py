@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Persistent keyword/block index of an INP deck
+
+One regex pass over the memory-mapped deck (inp_fast.scan_blocks) records,
+for every keyword block: keyword, header text, line number, byte offset,
+data byte range and data line count, element type and set name. The index
+is stored next to the deck and checked like the mesh cache (size + mtime,
+sha1 when only the mtime moved):
+
+    deck.inp.kwindex.json
+
+With it the tools answer "which elsets / keywords are there" without
+touching the deck, and read_elset() / read_nset() parse just the byte ranges
+of one set.
+
+    python inp_index.py deck.inp [--elset NAME] [--rebuild]
+"""
+
+import mmap
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from inp_fast import _TYPE_RE, _first_ncols, _parse_chunk, classify_block, scan_blocks
+from mesh_cache import read_json, file_sha1, is_current, write_json
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.kwindex.json'
+
+
+def index_path(inp_path):
+    return os.path.abspath(inp_path) + INDEX_SUFFIX
+
+
+def build_index(inp_path):
+    """Scan the deck and write its index. Returns the index dict."""
+    inp_path = os.path.abspath(inp_path)
+    st = os.stat(inp_path)
+    blocks = []
+    total_lines = 0
+    if st.st_size:
+        with open(inp_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = scan_blocks(mm, with_lines=True)
+            total_lines = raw[-1]['line'] - 1 + mm[raw[-1]['offset']:].count(b'\n') if raw else mm[:].count(b'\n')
+            for k, b in enumerate(raw):
+                kind, name = classify_block(b['header'])
+                match = _TYPE_RE.search(b['header'])
+                next_line = raw[k + 1]['line'] if k + 1 < len(raw) else total_lines + 1
+                blocks.append({
+                    'keyword': b['header'].split(',')[0].strip().upper(),
+                    'header': b['header'],
+                    'line': b['line'],
+                    'offset': b['offset'],
+                    'data_start': b['data_start'],
+                    'data_end': b['data_end'],
+                    'lines': next_line - b['line'] - 1,
+                    'kind': kind,
+                    'name': name,
+                    'type': match.group(1).upper() if match else None,
+                })
+    index = {
+        'version': INDEX_VERSION,
+        'source': os.path.basename(inp_path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha1': file_sha1(inp_path),
+        'total_lines': total_lines,
+        'blocks': blocks,
+    }
+    try:
+        write_json(index_path(inp_path), index)
+    except OSError as e:
+        print(f"  Keyword index not written ({e})")
+    return index
+
+
+def load_index(inp_path, rebuild=False, verbose=True):
+    """Index of the deck, rebuilt when missing or out of date."""
+    path = index_path(inp_path)
+    index = None if rebuild else read_json(path)
+    if not is_current(inp_path, index, header_path=path, version=INDEX_VERSION):
+        if verbose:
+            print(f"  Building keyword index: {path}")
+        index = build_index(inp_path)
+    return index
+
+
+def elsets(index):
+    """{elset name: {'type', 'lines', 'blocks'}} in deck order."""
+    out = OrderedDict()
+    for b in index['blocks']:
+        if b['kind'] == 'element':
+            e = out.setdefault(b['name'], {'type': b['type'], 'lines': 0, 'blocks': 0})
+            e['lines'] += b['lines']
+            e['blocks'] += 1
+    return out
+
+
+def block_stats(index):
+    """{keyword: {'blocks', 'lines', 'bytes'}} in deck order."""
+    out = OrderedDict()
+    for b in index['blocks']:
+        s = out.setdefault(b['keyword'], {'blocks': 0, 'lines': 0, 'bytes': 0})
+        s['blocks'] += 1
+        s['lines'] += b['lines']
+        s['bytes'] += b['data_end'] - b['offset']
+    return out
+
+
+def _read_blocks(inp_path, blocks, kind):
+    parts = []
+    with open(inp_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for b in blocks:
+            start, end = b['data_start'], b['data_end']
+            if end > start:
+                parts.append(_parse_chunk(mm[start:end], kind, _first_ncols(mm[start:min(end, start + 4096)])))
+    return parts
+
+
+def read_elset(inp_path, name, index=None):
+    """(elem_ids, (E,4) conn) of one elset, parsing only its blocks."""
+    index = index or load_index(inp_path, verbose=False)
+    blocks = [b for b in index['blocks'] if b['kind'] == 'element' and b['name'] == name]
+    if not blocks:
+        raise KeyError(f"elset '{name}' not found")
+    parts = _read_blocks(inp_path, blocks, 'element')
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def read_nset(inp_path, name, index=None):
+    """Member node ids of one nset (plain or GENERATE)."""
+    index = index or load_index(inp_path, verbose=False)
+    parts = []
+    for b in index['blocks']:
+        if b['kind'] in ('nset', 'nset_gen') and b['name'] == name:
+            parts.extend(_read_blocks(inp_path, [b], b['kind']))
+    if not parts:
+        raise KeyError(f"nset '{name}' not found")
+    return np.concatenate([p[0] for p in parts])
+
+
+def print_stats(index):
+    print(f"{index['source']}: {index['size'] / 1e6:.1f} MB, {index['total_lines']} lines, "
+          f"{len(index['blocks'])} keyword blocks")
+    for kw, s in block_stats(index).items():
+        print(f"  {kw:20s} {s['blocks']:6d} block(s) {s['lines']:10d} lines {s['bytes'] / 1e6:10.2f} MB")
+    sets = elsets(index)
+    if sets:
+        print("Elsets:")
+        for name, e in sets.items():
+            print(f"  {name:40s} {e['type'] or '':8s} {e['lines']:10d} lines")
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Keyword/block index of an INP deck")
+    ap.add_argument("inp_path")
+    ap.add_argument("--elset", default=None, help="load this elset's connectivity only")
+    ap.add_argument("--rebuild", action="store_true", help="rebuild the index")
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    index = load_index(args.inp_path, rebuild=args.rebuild)
+    print_stats(index)
+    print(f"({time.perf_counter() - t0:.3f} s)")
+    if args.elset:
+        t0 = time.perf_counter()
+        ids, conn = read_elset(args.inp_path, args.elset, index)
+        print(f"Elset {args.elset}: {len(ids)} elements, nodes {int(conn.min())}..{int(conn.max())} "
+              f"({time.perf_counter() - t0:.3f} s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
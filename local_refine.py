@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Local tetra refinement of the Material in the shear band
+
+The knowledge doc asks for ~0.05 mm elements at the cutting edge, but a
+global refinement multiplies the Material by 8 and lowers the time step
+everywhere. refine_mesh() splits only the Material tets whose centroid lies
+in a region:
+
+    box           lo <= centroid <= hi (mm)
+    cutting edge  within `radius` (in XY, i.e. through the thickness) of the
+                  Punch / Die cutting edges: sharp skin edges (dihedral angle
+                  above FEATURE_ANGLE) of the extract_surface_faces_np skins
+                  that lie near the Material and face an edge of the other
+                  tool
+
+Refinement is red-green and conforming: every edge of a marked tet gets its
+midpoint, marked tets are split 1 -> 8 (inner octahedron cut along its
+shortest diagonal) and their neighbours get transition tets: one split edge
+-> 2 tets, three split edges of one face -> 4 tets; any other pattern is
+promoted to a full split until the marking is closed. New nodes and
+elements take ids past the existing maxima (children replace their parent),
+and midpoints of edges on a symmetry / cut plane join its node group.
+levels > 1 repeats the pass on the children inside the region (transition
+tets of the previous level are split again, so quality drops slowly).
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from inp2radioss_v6 import MATERIALS, ROLE_MATERIAL
+from preflight_dt import DTFAC, dilatational_speed, part_rows, tet_char_length
+from spatial_index import UniformGrid
+from strip_model import role_of_elset, row_elsets
+from surface_fast import extract_surface_faces_np
+
+FEATURE_ANGLE = 45.0        # degrees between skin normals for a sharp edge
+# Local node pairs of the 6 tet edges, and the edge bits of the face opposite each node
+TET_EDGES = np.array([(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)])
+FACE_BITS = np.array([(1 << 3) | (1 << 4) | (1 << 5), (1 << 1) | (1 << 2) | (1 << 5),
+                      (1 << 0) | (1 << 2) | (1 << 4), (1 << 0) | (1 << 1) | (1 << 3)])
+
+
+def _templates():
+    """Children as indices into [v0 v1 v2 v3 m01 m02 m03 m12 m13 m23]:
+    green-1 per split edge (6,2,4), green-3 per split face (4,4,4), red per
+    octahedron diagonal (3,8,4)."""
+    edge_mid = {tuple(e): 4 + k for k, e in enumerate(TET_EDGES.tolist())}
+
+    def mid(a, b):
+        return edge_mid[(min(a, b), max(a, b))]
+
+    green1 = []
+    for a, b in TET_EDGES.tolist():
+        c1, c2 = [0, 1, 2, 3], [0, 1, 2, 3]
+        c1[b] = c2[a] = mid(a, b)
+        green1.append([c1, c2])
+    green3 = []
+    for d in range(4):
+        a, b, c = [v for v in range(4) if v != d]
+        children = []
+        for corner, others in ((a, (b, c)), (b, (a, c)), (c, (a, b))):
+            child = [0, 1, 2, 3]
+            for v in others:
+                child[v] = mid(corner, v)
+            children.append(child)
+        child = [0, 1, 2, 3]
+        child[a], child[b], child[c] = mid(a, b), mid(b, c), mid(c, a)
+        children.append(child)
+        green3.append(children)
+    corners = [[0, 4, 5, 6], [4, 1, 7, 8], [5, 7, 2, 9], [6, 8, 9, 3]]
+    red = []
+    # Octahedron diagonal and its equator in cyclic order
+    for p, q, ring in ((4, 9, (5, 6, 8, 7)), (5, 8, (4, 6, 9, 7)), (6, 7, (4, 5, 9, 8))):
+        red.append(corners + [[p, q, ring[k], ring[(k + 1) % 4]] for k in range(4)])
+    return np.array(green1), np.array(green3), np.array(red)
+
+
+GREEN1, GREEN3, RED = _templates()
+
+
+def _signed_volume(xyz):
+    a, b, c, d = xyz[:, 0], xyz[:, 1], xyz[:, 2], xyz[:, 3]
+    return np.einsum('ij,ij->i', np.cross(b - a, c - a), d - a)
+
+
+def tet_edges(conn):
+    """(edges (M,2) sorted node ids, (E,6) edge index of every tet edge)."""
+    pairs = np.sort(np.asarray(conn)[:, TET_EDGES], axis=2).reshape(-1, 2)
+    base = int(pairs.max()) + 1 if len(pairs) else 1
+    edges_key, inverse = np.unique(pairs[:, 0] * base + pairs[:, 1], return_inverse=True)
+    edges = np.column_stack([edges_key // base, edges_key % base])
+    return edges, inverse.reshape(-1, 6)
+
+
+def close_marking(edge_idx, split):
+    """Promote tets with a non-template pattern to a full split until every tet
+    has 0, 1, 6 or one face's 3 edges split. Modifies split (edge mask) in
+    place and returns the (E,) pattern bits."""
+    weights = 1 << np.arange(6)
+    while True:
+        marks = split[edge_idx]
+        bits = marks @ weights
+        count = marks.sum(axis=1)
+        ok = (count <= 1) | (count == 6) | np.isin(bits, FACE_BITS)
+        if ok.all():
+            return bits
+        split[edge_idx[~ok]] = True
+
+
+def _children(local, template):
+    """(T*C,4) children of tets with local vertex table (T,10), template (T,C,4)."""
+    rows = np.arange(len(local))[:, None, None]
+    return local[rows, template].reshape(-1, 4)
+
+
+def refine_once(mesh, marked, groups=None):
+    """One red-green pass; marked is an (E,) bool mask of tets to split 1 -> 8.
+    Returns (mesh, groups, stats)."""
+    node_ids = np.asarray(mesh['node_ids'])
+    coords = np.asarray(mesh['coords'])
+    conn = np.asarray(mesh['conn'])
+    elem_ids = np.asarray(mesh['elem_ids'])
+    edges, edge_idx = tet_edges(conn)
+    split = np.zeros(len(edges), dtype=bool)
+    split[edge_idx[marked]] = True
+    bits = close_marking(edge_idx, split)
+
+    # Midpoint nodes, ids past the largest one
+    n_new = int(split.sum())
+    mid_id = np.zeros(len(edges), dtype=np.int64)
+    mid_id[split] = int(node_ids.max()) + 1 + np.arange(n_new)
+    ends = coords[np.searchsorted(node_ids, edges[split])]
+    new_coords = np.concatenate([coords, ends.mean(axis=1)])
+    new_node_ids = np.concatenate([node_ids, mid_id[split]])
+
+    refined = bits > 0
+    rows = np.flatnonzero(refined)
+    local = np.concatenate([conn[rows], mid_id[edge_idx[rows]]], axis=1)
+    b = bits[rows]
+    red = b == 63
+    green3 = np.isin(b, FACE_BITS)
+    green1 = ~red & ~green3
+    parts, parents = [], []
+    if green1.any():
+        which = np.log2(b[green1]).astype(np.int64)
+        parts.append(_children(local[green1], GREEN1[which]))
+        parents.append(np.repeat(rows[green1], 2))
+    if green3.any():
+        face = np.argmax(b[green3][:, None] == FACE_BITS, axis=1)
+        parts.append(_children(local[green3], GREEN3[face]))
+        parents.append(np.repeat(rows[green3], 4))
+    if red.any():
+        xyz = new_coords[np.searchsorted(new_node_ids, local[red][:, 4:])]
+        diag = np.stack([np.linalg.norm(xyz[:, 0] - xyz[:, 5], axis=1),
+                         np.linalg.norm(xyz[:, 1] - xyz[:, 4], axis=1),
+                         np.linalg.norm(xyz[:, 2] - xyz[:, 3], axis=1)], axis=1)
+        parts.append(_children(local[red], RED[np.argmin(diag, axis=1)]))
+        parents.append(np.repeat(rows[red], 8))
+    child = np.concatenate(parts) if parts else np.zeros((0, 4), dtype=np.int64)
+    parent = np.concatenate(parents) if parents else np.zeros(0, dtype=np.int64)
+
+    # Children keep the orientation of their parent
+    pv = _signed_volume(coords[np.searchsorted(node_ids, conn[parent])])
+    cv = _signed_volume(new_coords[np.searchsorted(new_node_ids, child)])
+    flip = np.sign(cv) != np.sign(pv)
+    child[flip] = child[flip][:, [0, 2, 1, 3]]
+
+    # Elsets stay contiguous: kept rows of each set, then its children
+    sets = row_elsets(mesh)
+    keep = np.flatnonzero(~refined)
+    all_conn = np.concatenate([conn[keep], child])
+    all_sets = np.concatenate([sets[keep], sets[parent]])
+    source = np.concatenate([keep, parent])
+    is_new = np.concatenate([np.zeros(len(keep), dtype=bool), np.ones(len(child), dtype=bool)])
+    order = np.argsort(all_sets, kind='stable')
+    all_ids = np.concatenate([elem_ids[keep], np.zeros(len(child), dtype=np.int64)])[order]
+    is_new = is_new[order]
+    all_ids[is_new] = int(elem_ids.max()) + 1 + np.arange(int(is_new.sum()))
+    counts = np.bincount(all_sets, minlength=len(mesh['elset_names']))
+    out = dict(mesh)
+    out.update({
+        'node_ids': new_node_ids,
+        'coords': new_coords,
+        'elem_ids': all_ids,
+        'conn': all_conn[order],
+        'elset_offsets': np.cumsum(np.concatenate([[0], counts])).astype(np.int64),
+    })
+    if 'orig_node_ids' in mesh:
+        # Midpoints have no INP node; children map to their parent's INP element
+        out['orig_node_ids'] = np.concatenate([mesh['orig_node_ids'], np.zeros(n_new, dtype=np.int64)])
+        out['orig_elem_ids'] = np.asarray(mesh['orig_elem_ids'])[source[order]]
+
+    new_groups = []
+    for grp in groups or []:
+        nodes = np.asarray(grp['nodes'])
+        on_plane = split & np.isin(edges[:, 0], nodes) & np.isin(edges[:, 1], nodes)
+        new_groups.append(dict(grp, nodes=np.concatenate([nodes, mid_id[on_plane]])))
+    stats = {'red': int(red.sum()), 'transition': int(green1.sum() + green3.sum()),
+             'nodes_added': n_new, 'elements_added': int(len(child) - len(rows)),
+             'children': all_ids[is_new]}
+    return out, new_groups, stats
+
+
+def _feature_edges(faces, node_ids, coords, angle):
+    """(K,2) node ids of skin edges whose two faces meet at more than angle."""
+    xyz = coords[np.searchsorted(node_ids, faces)]
+    n = np.cross(xyz[:, 1] - xyz[:, 0], xyz[:, 2] - xyz[:, 0])
+    n /= np.maximum(np.linalg.norm(n, axis=1), 1e-300)[:, None]
+    pairs = np.sort(faces[:, [[0, 1], [1, 2], [2, 0]]], axis=2).reshape(-1, 2)
+    owner = np.repeat(np.arange(len(faces)), 3)
+    base = int(pairs.max()) + 1
+    key = pairs[:, 0] * base + pairs[:, 1]
+    order = np.argsort(key, kind='stable')
+    key, owner, pairs = key[order], owner[order], pairs[order]
+    # A closed skin has every edge exactly twice: consecutive rows after the sort
+    twin = np.flatnonzero(key[1:] == key[:-1])
+    sharp = np.einsum('ij,ij->i', n[owner[twin]], n[owner[twin + 1]]) < np.cos(np.radians(angle))
+    return pairs[twin[sharp]]
+
+
+def _edge_samples(edges, node_ids, coords, spacing):
+    """Points every <= spacing along (K,2) edges, ends included."""
+    p = coords[np.searchsorted(node_ids, edges[:, 0])]
+    q = coords[np.searchsorted(node_ids, edges[:, 1])]
+    steps = np.maximum(1, np.ceil(np.linalg.norm(q - p, axis=1) / spacing)).astype(np.int64)
+    owner = np.repeat(np.arange(len(edges)), steps + 1)
+    t = np.arange(len(owner)) - np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+    t = t / steps[owner]
+    return p[owner] + t[:, None] * (q - p)[owner]
+
+
+def cutting_edges(mesh, radius, angle=FEATURE_ANGLE):
+    """(P,3) points (mm) along the Punch / Die cutting edges: sharp skin edges
+    within `radius` + clearance + one element size of the Material whose XY
+    distance to a sharp edge of the other tool is at most `radius`."""
+    node_ids = np.asarray(mesh['node_ids'])
+    coords = np.asarray(mesh['coords'])
+    conn = np.asarray(mesh['conn'])
+    rows = part_rows(mesh)
+    if 'MATERIAL' not in rows:
+        return np.zeros((0, 3))
+    mat_conn = conn[rows['MATERIAL']]
+    mat_xyz = coords[np.searchsorted(node_ids, np.unique(mat_conn))]
+    mat_bottom, mat_top = mat_xyz[:, 2].min(), mat_xyz[:, 2].max()
+    # Tool edges and Material nodes do not coincide: allow one Material element size
+    ends = coords[np.searchsorted(node_ids, mat_conn[:, TET_EDGES[:, 0]])] \
+        - coords[np.searchsorted(node_ids, mat_conn[:, TET_EDGES[:, 1]])]
+    h = float(np.median(np.linalg.norm(ends, axis=2)))
+    mat_grid = UniformGrid(mat_xyz, cell=radius + h)
+    sharp = {}
+    for role in ('PUNCH', 'DIE'):
+        if role not in rows:
+            return np.zeros((0, 3))
+        faces = extract_surface_faces_np(conn[rows[role]], node_ids, coords)
+        edges = _feature_edges(faces, node_ids, coords, angle)
+        mid = coords[np.searchsorted(node_ids, edges)].mean(axis=1)
+        # The tools start off the Material: allow their clearance
+        gap = 0.0
+        if len(mid):
+            gap = max(0.0, mid[:, 2].min() - mat_top) if role == 'PUNCH' else max(0.0, mat_bottom - mid[:, 2].max())
+        reach = radius + h + gap
+        near = np.isfinite(mat_grid.nearest_distance(mid, reach))
+        sharp[role] = (edges[near], mid[near])
+    samples = []
+    for role, other in (('PUNCH', 'DIE'), ('DIE', 'PUNCH')):
+        edges, mid = sharp[role]
+        if not len(edges) or not len(sharp[other][1]):
+            continue
+        flat = np.column_stack([sharp[other][1][:, :2], np.zeros(len(sharp[other][1]))])
+        grid = UniformGrid(flat, cell=radius)
+        facing = grid.within(np.column_stack([mid[:, :2], np.zeros(len(mid))]), radius)
+        samples.append(_edge_samples(edges[facing], node_ids, coords, 0.5 * radius))
+    return np.concatenate(samples) if samples else np.zeros((0, 3))
+
+
+def region_mask(mesh, box=None, edge_points=None, radius=None, candidates=None):
+    """(E,) Material tets (among the candidates mask) with the centroid in the
+    box or within radius (XY) of the edge points."""
+    sets = row_elsets(mesh)
+    mat = [k for k, n in enumerate(mesh['elset_names']) if role_of_elset(n) == 'MATERIAL']
+    mask = np.isin(sets, mat)
+    if candidates is not None:
+        mask &= candidates
+    rows = np.flatnonzero(mask)
+    cent = np.asarray(mesh['coords'])[np.searchsorted(mesh['node_ids'], np.asarray(mesh['conn'])[rows])].mean(axis=1)
+    keep = np.ones(len(rows), dtype=bool)
+    if box is not None:
+        lo, hi = np.asarray(box[0], dtype=np.float64), np.asarray(box[1], dtype=np.float64)
+        keep &= np.all((cent >= lo) & (cent <= hi), axis=1)
+    if edge_points is not None:
+        # Bounding box of the band first, the grid only for the tets inside it
+        lo = edge_points[:, :2].min(axis=0) - radius
+        hi = edge_points[:, :2].max(axis=0) + radius
+        keep &= np.all((cent[:, :2] >= lo) & (cent[:, :2] <= hi), axis=1)
+        grid = UniformGrid(np.column_stack([edge_points[:, :2], np.zeros(len(edge_points))]), cell=radius)
+        keep[keep] = grid.within(np.column_stack([cent[keep, :2], np.zeros(int(keep.sum()))]), radius)
+    mask[rows[~keep]] = False
+    return mask
+
+
+def material_time_steps(mesh, rows):
+    """Initial time step (s) of the given tets with the Material /MAT card."""
+    xyz = np.asarray(mesh['coords'])[np.searchsorted(mesh['node_ids'], np.asarray(mesh['conn'])[rows])]
+    c = dilatational_speed(MATERIALS[ROLE_MATERIAL['MATERIAL']])
+    return DTFAC * tet_char_length(xyz / 1000.0) / c
+
+
+def refine_mesh(mesh, box=None, edge_radius=None, levels=1, groups=None, angle=FEATURE_ANGLE):
+    """Refine the Material in the box and/or the cutting-edge band.
+    Returns (mesh, groups, report)."""
+    report = {'elements_before': len(mesh['elem_ids']), 'nodes_before': len(mesh['node_ids']),
+              'levels': [], 'edge_points': None}
+    points = None
+    if edge_radius:
+        points = cutting_edges(mesh, edge_radius, angle)
+        report['edge_points'] = len(points)
+        if not len(points):
+            report['levels'].append({'marked': 0})
+            report['elements_after'] = report['elements_before']
+            return mesh, groups, report
+    marked = region_mask(mesh, box, points, edge_radius)
+    report['dt_region_before'] = float(material_time_steps(mesh, np.flatnonzero(marked)).min()) \
+        if marked.any() else None
+    children = None
+    for _ in range(levels):
+        if not marked.any():
+            break
+        n_marked = int(marked.sum())
+        mesh, groups, stats = refine_once(mesh, marked, groups)
+        children = stats.pop('children')
+        stats['marked'] = n_marked
+        report['levels'].append(stats)
+        if len(report['levels']) < levels:
+            # Next level: the children that are still inside the region
+            marked = region_mask(mesh, box, points, edge_radius, np.isin(mesh['elem_ids'], children))
+    report['elements_after'] = len(mesh['elem_ids'])
+    report['nodes_after'] = len(mesh['node_ids'])
+    if children is not None:
+        dt = material_time_steps(mesh, np.flatnonzero(np.isin(mesh['elem_ids'], children)))
+        report['dt_refined_min'] = float(dt.min())
+        report['dt_refined_median'] = float(np.median(dt))
+    return mesh, groups, report
+
+
+def print_report(report):
+    print(f"  Local refinement of the Material"
+          + (f" ({report['edge_points']} cutting-edge points)" if report['edge_points'] is not None else ""))
+    for k, lv in enumerate(report['levels']):
+        if not lv['marked']:
+            print("    no Material tet in the region")
+            continue
+        print(f"    level {k + 1}: {lv['marked']} marked, {lv['red']} split 1:8, {lv['transition']} transition, "
+              f"+{lv['elements_added']} tets, +{lv['nodes_added']} nodes")
+    print(f"  Elements {report['elements_before']} -> {report['elements_after']} "
+          f"(+{report['elements_after'] - report['elements_before']})")
+    if report.get('dt_refined_min') is not None:
+        before = report['dt_region_before']
+        print(f"  Refined zone time step {report['dt_refined_min']:.3E} s (median {report['dt_refined_median']:.3E} s)"
+              + (f", was {before:.3E} s" if before else ""))
+
+
+def main():
+    from mesh_cache import load_mesh
+    ap = argparse.ArgumentParser(description="Preview a local Material refinement (no deck written)")
+    ap.add_argument("inp_path")
+    ap.add_argument("--box", type=float, nargs=6, default=None, metavar=("X0", "Y0", "Z0", "X1", "Y1", "Z1"))
+    ap.add_argument("--edge-radius", type=float, default=None, help="band around the cutting edges (mm)")
+    ap.add_argument("--levels", type=int, default=1)
+    args = ap.parse_args()
+    if args.box is None and not args.edge_radius:
+        ap.error("give --box and/or --edge-radius")
+    box = (args.box[:3], args.box[3:]) if args.box else None
+    _, _, report = refine_mesh(load_mesh(args.inp_path), box, args.edge_radius, args.levels)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
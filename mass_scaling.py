@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Selective mass-scaling planner
+
+Global mass scaling was removed from the deck (instability); this planner
+adds mass only where it pays off: on the tool parts (Punch / Die / Stripper)
+whose elements hold the time step below a target, and optionally a capped
+amount on the Material.
+
+For every tet the density factor that lifts its CFL step to the target is
+f_e = (dt_target / dt_e)^2 (dt ~ L sqrt(rho / M)). Each node takes the largest
+factor of its tets, so the added nodal mass is m_n (max f_e - 1), with
+m_n = sum(rho V / 4). The nodes are binned by added mass (bin value = largest
+need in the bin); inp2radioss_v6 writes them as /GRNOD + /ADMAS (mass per
+node) in the starter and switches the engine to the nodal time step
+(/DT/NODA/CST) so that the added mass is what controls the step.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from preflight_dt import DTFAC, dilatational_speed, part_rows, tet_char_length
+from inp2radioss_v6 import MATERIALS, ROLE_MATERIAL
+
+TOOL_ROLES = ('PUNCH', 'DIE', 'STRIPPER')
+MAX_BINS = 24           # /ADMAS groups per part
+BIN_RATIO = 1.25        # mass ratio between consecutive bins
+
+
+def _bins(added, max_bins=MAX_BINS):
+    """Bin index per node (geometric bins over the positive added masses)."""
+    lo, hi = added.min(), added.max()
+    if hi <= lo * BIN_RATIO:
+        return np.zeros(len(added), dtype=np.int64)
+    ratio = max(BIN_RATIO, (hi / lo) ** (1.0 / max_bins))
+    n = int(np.ceil(np.log(hi / lo) / np.log(ratio)))
+    return np.minimum((np.log(added / lo) / np.log(ratio)).astype(np.int64), n - 1)
+
+
+def plan_mass_scaling(mesh, target_dt, roles=TOOL_ROLES, material_cap=None, dtfac=DTFAC):
+    """Added mass needed for target_dt (s).
+
+    material_cap: None leaves the Material untouched; a fraction (e.g. 0.05)
+    also scales the Material with at most +5 % mass per node.
+    Returns a plan dict: per-part totals and the /ADMAS node groups
+    ({'name', 'nodes', 'mass'} with the mass added to each node, kg).
+    """
+    node_ids = np.asarray(mesh['node_ids'])
+    coords = np.asarray(mesh['coords'])
+    conn = np.asarray(mesh['conn'])
+    scaled_roles = list(roles) + (['MATERIAL'] if material_cap is not None else [])
+    plan = {'target_dt': target_dt, 'material_cap': material_cap, 'parts': {}, 'groups': []}
+    for role, rows in part_rows(mesh).items():
+        mat = MATERIALS[ROLE_MATERIAL[role]]
+        pos = np.searchsorted(node_ids, conn[rows])
+        xyz = coords[pos] / 1000.0
+        a, b, c, d = xyz[:, 0], xyz[:, 1], xyz[:, 2], xyz[:, 3]
+        vol = np.abs(np.einsum('ij,ij->i', np.cross(b - a, c - a), d - a)) / 6.0
+        dt = dtfac * tet_char_length(xyz) / dilatational_speed(mat)
+        factor = np.where(dt > 0, (target_dt / np.maximum(dt, 1e-300)) ** 2, 1.0)
+        factor = np.maximum(factor, 1.0)
+
+        # Nodal mass and the largest factor among the tets of each node
+        local, inv = np.unique(pos, return_inverse=True)
+        inv = inv.reshape(-1, 4)
+        nodal_mass = np.zeros(len(local))
+        np.add.at(nodal_mass, inv, np.repeat(mat['rho'] * vol / 4.0, 4).reshape(-1, 4))
+        nodal_factor = np.ones(len(local))
+        np.maximum.at(nodal_factor, inv, np.repeat(factor, 4).reshape(-1, 4))
+        if role == 'MATERIAL' and material_cap is not None:
+            nodal_factor = np.minimum(nodal_factor, 1.0 + material_cap)
+        added = nodal_mass * (nodal_factor - 1.0)
+        if role not in scaled_roles:
+            added[:] = 0.0
+
+        need = added > 0
+        emitted = 0.0
+        if need.any():
+            ids = node_ids[local[need]]
+            bins = _bins(added[need])
+            for k in np.unique(bins):
+                sel = bins == k
+                mass = float(added[need][sel].max())
+                emitted += mass * int(sel.sum())
+                plan['groups'].append({
+                    'name': f"{role.capitalize()}_AddedMass_{len(plan['groups']) + 1}",
+                    'nodes': ids[sel],
+                    'mass': mass,
+                })
+        total = float(nodal_mass.sum())
+        plan['parts'][role.capitalize()] = {
+            'mass': total,
+            'added': emitted,
+            'percent': 100.0 * emitted / total if total else 0.0,
+            'nodes_scaled': int(need.sum()),
+            'elements_below_target': int(np.sum(dt < target_dt)),
+            'dt_min': float(dt.min()) if len(dt) else 0.0,
+        }
+    return plan
+
+
+def print_plan(plan):
+    print(f"  Mass scaling plan: target dt {plan['target_dt']:.3E} s"
+          + (f", Material cap +{100 * plan['material_cap']:.1f} %" if plan['material_cap'] is not None else ""))
+    for part, p in plan['parts'].items():
+        print(f"    {part:10s} dt_min {p['dt_min']:.3E} s  {p['elements_below_target']:8d} el below target  "
+              f"{p['nodes_scaled']:8d} nodes  +{p['added']:.4E} kg ({p['percent']:.2f} %)")
+    print(f"    {len(plan['groups'])} /ADMAS groups")
+
+
+def main():
+    from mesh_cache import load_mesh
+    ap = argparse.ArgumentParser(description="Selective mass-scaling plan for a target time step")
+    ap.add_argument("inp_path")
+    ap.add_argument("target_dt", type=float, help="target time step (s)")
+    ap.add_argument("--material-cap", type=float, default=None,
+                    help="also scale the Material, at most this added-mass fraction per node")
+    args = ap.parse_args()
+    print_plan(plan_mass_scaling(load_mesh(args.inp_path), args.target_dt,
+                                 material_cap=args.material_cap))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
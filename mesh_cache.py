@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Binary mesh cache shared by the INP tools
+
+The parsed mesh (nodes, connectivity, elsets, nsets, keyword lines) is stored
+next to the deck as raw .npy arrays plus a small JSON header:
+
+    deck.inp.meshcache/
+        header.json      source size/mtime/sha1, set names, keyword lines
+        node_ids.npy  coords.npy  elem_ids.npy  conn.npy
+        elset_offsets.npy  nset_offsets.npy  nset_members.npy
+
+load_mesh() memory-maps the arrays when the header still matches the deck
+(size + mtime, falling back to the sha1 when only the mtime moved) and
+rebuilds the cache with inp_fast.parse_inp_arrays otherwise. A cache is
+written into a temporary directory next to it and renamed into place, so
+processes converting the same deck at once never see a half-written cache.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from inp_fast import parse_inp_arrays
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.meshcache'
+HEADER_NAME = 'header.json'
+ARRAYS = ('node_ids', 'coords', 'elem_ids', 'conn',
+          'elset_offsets', 'nset_offsets', 'nset_members')
+HEADER_KEYS = ('elset_names', 'elset_types', 'nset_names', 'keywords')
+
+
+def cache_dir(inp_path):
+    return os.path.abspath(inp_path) + CACHE_SUFFIX
+
+
+def file_sha1(path, block=1 << 23):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_header(cdir):
+    return read_json(os.path.join(cdir, HEADER_NAME))
+
+
+def write_json(path, obj):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _write_header(cdir, header):
+    write_json(os.path.join(cdir, HEADER_NAME), header)
+
+
+def is_current(inp_path, header, header_path=None, version=CACHE_VERSION):
+    """True when header describes the deck as it is on disk now.
+    Refreshes the stored mtime (in header_path, default the cache header)
+    when only the timestamp changed."""
+    if header is None or header.get('version') != version:
+        return False
+    st = os.stat(inp_path)
+    if st.st_size != header['size']:
+        return False
+    if st.st_mtime_ns == header['mtime_ns']:
+        return True
+    if file_sha1(inp_path) != header['sha1']:
+        return False
+    header['mtime_ns'] = st.st_mtime_ns
+    try:
+        if header_path:
+            write_json(header_path, header)
+        else:
+            _write_header(cache_dir(inp_path), header)
+    except OSError:
+        pass
+    return True
+
+
+def build_cache(inp_path, workers=None, force=False):
+    """Parse the deck and (re)write its cache directory. Returns the header.
+    A current cache installed meanwhile by another process is kept unless force."""
+    cdir = cache_dir(inp_path)
+    st = os.stat(inp_path)
+    sha1 = file_sha1(inp_path)
+    mesh = parse_inp_arrays(inp_path, workers=workers, keywords=True)
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(cdir) + '.', suffix='.tmp', dir=os.path.dirname(cdir))
+    try:
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, name + '.npy'), mesh[name])
+        header = _header(inp_path, st, sha1, mesh)
+        _write_header(tmp, header)
+        if not force and is_current(inp_path, _read_header(cdir)):
+            return header
+        if os.path.isdir(cdir):
+            # Stale cache: move it aside first (another process may do the same)
+            old = tmp + '.old'
+            try:
+                os.rename(cdir, old)
+            except OSError:
+                pass
+            shutil.rmtree(old, ignore_errors=True)
+        try:
+            os.rename(tmp, cdir)
+        except OSError:
+            # Another process installed its cache first; load_mesh checks it
+            pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return header
+
+
+def _header(inp_path, st, sha1, mesh):
+    header = {
+        'version': CACHE_VERSION,
+        'source': os.path.basename(inp_path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha1': sha1,
+        'num_nodes': int(len(mesh['node_ids'])),
+        'num_elements': int(len(mesh['elem_ids'])),
+    }
+    for key in HEADER_KEYS:
+        header[key] = mesh[key]
+    return header
+
+
+def load_mesh(inp_path, workers=None, rebuild=False, verbose=True):
+    """Return the mesh dict of inp_fast.parse_inp_arrays, arrays memory-mapped
+    from the cache. The cache is (re)built when missing or out of date."""
+    cdir = cache_dir(inp_path)
+    header = None if rebuild else _read_header(cdir)
+    if not is_current(inp_path, header):
+        if verbose:
+            print(f"  Building mesh cache: {cdir}")
+        t0 = time.perf_counter()
+        try:
+            build_cache(inp_path, workers=workers, force=rebuild)
+        except OSError as e:
+            # Read-only location: fall back to an in-memory parse
+            print(f"  Mesh cache not written ({e}), parsing without cache")
+            return parse_inp_arrays(inp_path, workers=workers, keywords=True)
+        if verbose:
+            print(f"  Cache built in {time.perf_counter() - t0:.2f} s")
+        # The installed cache may be another process's build
+        header = _read_header(cdir)
+    try:
+        if not is_current(inp_path, header):
+            raise OSError(f"{cdir} replaced by an out-of-date cache")
+        mesh = {name: np.load(os.path.join(cdir, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+    except OSError as e:
+        # Cache replaced or removed by a concurrent build: parse instead
+        print(f"  Mesh cache not read ({e}), parsing without cache")
+        return parse_inp_arrays(inp_path, workers=workers, keywords=True)
+    for key in HEADER_KEYS:
+        mesh[key] = header[key]
+    mesh['header'] = header
+    return mesh
+
+
+def nset_dict(mesh):
+    """{nset_name: member id array} from a cached mesh."""
+    off = mesh['nset_offsets']
+    return {name: mesh['nset_members'][off[k]:off[k + 1]]
+            for k, name in enumerate(mesh['nset_names'])}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python mesh_cache.py file.inp [--rebuild]")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    m = load_mesh(sys.argv[1], rebuild='--rebuild' in sys.argv[2:])
+    print(f"{m['header']['num_nodes']} nodes, {m['header']['num_elements']} elements, "
+          f"{len(m['elset_names'])} elsets, {len(m['nset_names'])} nsets "
+          f"({time.perf_counter() - t0:.3f} s)")
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Phase profiling of the converter pipeline (inp2radioss_v6.py --profile)
+
+The pipeline marks its phases with
+
+    with phase('extract_surfaces') as p:
+        ...
+        p.count(faces=len(faces))
+
+or decorates whole functions with @profiled(counts=...). While no profile is
+running phase() hands back one shared do-nothing object, so the marks cost a
+function call each. With start() every phase records
+
+    wall and CPU time, current and peak RSS of the process
+    tracemalloc peak and net allocation, and the top allocation sites
+    (snapshots of the top-level phases)
+    item counts and throughput (nodes/s, faces/s, ... ; bytes_in / bytes_out as MB/s)
+
+Phases nest ('write_starter_file/extract_surfaces'). finish() prints the
+table and writes the JSON report; cProfile stats (.prof, for snakeviz or
+pstats) and folded stacks sampled every SAMPLE_INTERVAL s (flamegraph.pl,
+speedscope) are optional. tracemalloc slows allocation-heavy Python code:
+trace=False keeps the timings clean.
+
+Any helper script runs under the profiler with
+
+    python phase_profile.py [--json report.json] [--cprofile out.prof] [--flame out.folded] script.py args...
+"""
+
+import argparse
+import functools
+import os
+import platform
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:         # Windows
+    resource = None
+
+SAMPLE_INTERVAL = 0.005     # s between stack samples of the flame graph
+TOP_ALLOCATIONS = 5         # allocation sites kept per phase
+
+_active = None              # running Profiler
+
+
+def _rss():
+    """(current, peak) resident set size of the process in bytes; None when unknown."""
+    current = peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == 'darwin' else 1024
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            current, peak = info.rss, getattr(info, 'peak_wset', peak)
+        except ImportError:
+            pass
+    if current is not None and peak is not None:
+        peak = max(peak, current)
+    return current, peak
+
+
+def _mb(n):
+    return None if n is None else round(n / 1e6, 2)
+
+
+class _Off:
+    """Shared no-op phase while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, **counts):
+        pass
+
+
+_OFF = _Off()
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.counts = {}
+
+    def count(self, **counts):
+        """Add item counts (nodes=..., faces=..., bytes_in=..., bytes_out=...)."""
+        for k, v in counts.items():
+            self.counts[k] = self.counts.get(k, 0) + int(v)
+
+    def __enter__(self):
+        prof = self.profiler
+        parent = prof.stack[-1] if prof.stack else None
+        self.path = f"{parent.path}/{self.name}" if parent else self.name
+        self.depth = len(prof.stack)
+        prof.order.setdefault(self.path, len(prof.order))
+        self.peak = 0
+        if prof.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.traced = current
+            # Allocation sites of the top-level phases only: snapshots are slow
+            self.snapshot = tracemalloc.take_snapshot() if parent is None else None
+        prof.stack.append(self)
+        self.rss = _rss()[0]
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        prof = self.profiler
+        prof.stack.pop()
+        rss, rss_peak = _rss()
+        entry = {'phase': self.path, 'depth': self.depth, 'wall_s': round(wall, 4), 'cpu_s': round(cpu, 4),
+                 'rss_mb': _mb(rss), 'rss_delta_mb': _mb(rss - self.rss) if rss and self.rss else None,
+                 'rss_peak_mb': _mb(rss_peak)}
+        if prof.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            if prof.stack:
+                prof.stack[-1].peak = max(prof.stack[-1].peak, self.peak)
+            entry['traced_peak_mb'] = _mb(self.peak - self.traced)
+            entry['traced_net_mb'] = _mb(current - self.traced)
+            if self.snapshot is not None:
+                stats = tracemalloc.take_snapshot().compare_to(self.snapshot, 'lineno')
+                entry['top_allocations'] = [
+                    {'site': f"{s.traceback[0].filename}:{s.traceback[0].lineno}", 'mb': _mb(s.size_diff),
+                     'blocks': s.count_diff}
+                    for s in stats[:TOP_ALLOCATIONS] if s.size_diff > 0]
+                self.snapshot = None
+        entry['counts'] = dict(self.counts)
+        rates = {}
+        for k, v in self.counts.items():
+            if wall <= 0:
+                continue
+            if k == 'bytes_in':
+                rates['read_mb_s'] = round(v / 1e6 / wall, 2)
+            elif k == 'bytes_out':
+                rates['write_mb_s'] = round(v / 1e6 / wall, 2)
+            else:
+                rates[f"{k}_per_s"] = round(v / wall, 1)
+        entry['rates'] = rates
+        prof.phases.append(entry)
+        return False
+
+
+class _Sampler(threading.Thread):
+    """Samples the main thread stack (under the current phase path) into folded counts."""
+
+    def __init__(self, profiler, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.target = threading.main_thread().ident
+        self.folded = {}
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = list(self.profiler.stack)
+            head = [stack[-1].path.replace('/', ';')] if stack else []
+            key = ";".join(head + names[::-1])
+            self.folded[key] = self.folded.get(key, 0) + 1
+
+
+class Profiler:
+    def __init__(self, trace=True, cprofile=None, flame=None):
+        self.trace = trace
+        self.cprofile_path = cprofile
+        self.flame_path = flame
+        self.stack = []
+        self.phases = []
+        self.order = {}         # phase path -> start order
+        self._cprofile = None
+        self._sampler = None
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_path:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if self.flame_path:
+            self._sampler = _Sampler(self)
+            self._sampler.start()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            print(f"cProfile stats written: {self.cprofile_path}")
+        if self._sampler is not None:
+            self._sampler.done.set()
+            self._sampler.join()
+            with open(self.flame_path, 'w') as f:
+                for stack, n in sorted(self._sampler.folded.items()):
+                    f.write(f"{stack} {n}\n")
+            print(f"Folded stacks written: {self.flame_path} ({sum(self._sampler.folded.values())} samples)")
+        if self.trace:
+            tracemalloc.stop()
+
+    def report(self, command=None):
+        import numpy as np
+        rss, rss_peak = _rss()
+        return {
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'command': command if command is not None else sys.argv,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpus",
+            'tracemalloc': self.trace,
+            'wall_s': round(time.perf_counter() - self.t0, 4),
+            'cpu_s': round(time.process_time() - self.cpu0, 4),
+            'rss_mb': _mb(rss),
+            'rss_peak_mb': _mb(rss_peak),
+            # Phases end children first: report them in start order
+            'phases': sorted(self.phases, key=lambda e: self.order[e['phase']]),
+        }
+
+
+def phase(name):
+    """Context manager timing one phase; a shared no-op while profiling is off."""
+    if _active is None:
+        return _OFF
+    return _Phase(_active, name)
+
+
+def profiled(name=None, counts=None):
+    """Decorator: run the function as a phase; counts(result, *args, **kwargs)
+    returns the item counts of the call."""
+    def wrap(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with phase(label) as p:
+                result = func(*args, **kwargs)
+                if counts is not None:
+                    p.count(**counts(result, *args, **kwargs))
+            return result
+        return call
+    return wrap
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def start(trace=True, cprofile=None, flame=None):
+    """Switch profiling on for the rest of the process."""
+    global _active
+    _active = Profiler(trace, cprofile, flame)
+    _active.start()
+    return _active
+
+
+def finish(json_path=None, command=None):
+    """Stop profiling, print the phase table and write the JSON report."""
+    global _active
+    prof, _active = _active, None
+    if prof is None:
+        return None
+    prof.stop()
+    report = prof.report(command)
+    print_report(report)
+    if json_path:
+        from mesh_cache import write_json
+        write_json(json_path, report)
+        print(f"Profile written: {json_path}")
+    return report
+
+
+def print_report(report):
+    print(f"Profile: {report['wall_s']:.3f} s wall, {report['cpu_s']:.3f} s CPU, "
+          f"peak RSS {report['rss_peak_mb']} MB" + ("" if report['tracemalloc'] else " (no tracemalloc)"))
+    print(f"  {'phase':44s} {'wall s':>8s} {'cpu s':>8s} {'RSS MB':>8s} {'traced':>8s}  throughput")
+    for e in report['phases']:
+        label = "  " * e['depth'] + e['phase'].rsplit('/', 1)[-1]
+        traced = e.get('traced_peak_mb')
+        rates = ", ".join(f"{v:.1f} {k[:-5]} MB/s" if k.endswith('_mb_s') else f"{v:.0f} {k[:-6]}/s"
+                          for k, v in e['rates'].items())
+        print(f"  {label:44s} {e['wall_s']:8.3f} {e['cpu_s']:8.3f} {e['rss_mb'] or 0:8.1f} "
+              f"{'' if traced is None else f'{traced:8.1f}':>8s}  {rates}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a converter helper script under the phase profiler")
+    ap.add_argument("--json", default=None, help="report file (default <script>_profile.json)")
+    ap.add_argument("--cprofile", default=None, help="also write cProfile stats to this .prof file")
+    ap.add_argument("--flame", default=None, help="also write sampled folded stacks (flame graph input)")
+    ap.add_argument("--no-trace", action="store_true", help="skip tracemalloc (clean timings)")
+    ap.add_argument("script")
+    ap.add_argument("args", nargs=argparse.REMAINDER)
+    args = ap.parse_args()
+    name = os.path.splitext(os.path.basename(args.script))[0]
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    # The script's 'from phase_profile import phase' must get this module (run
+    # as __main__), not a fresh import whose profiler is off
+    sys.modules.setdefault('phase_profile', sys.modules[__name__])
+    start(not args.no_trace, args.cprofile, args.flame)
+    code = 0
+    try:
+        with phase(name):
+            runpy.run_path(args.script, run_name='__main__')
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        finish(args.json or f"{name}_profile.json", command=sys.argv)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
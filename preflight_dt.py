@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Pre-flight stable time-step estimate and runtime prediction
+
+Computes the initial explicit (CFL) time step of every TETRA4 from its
+characteristic length (smallest altitude, 3V / A_max) and the dilatational
+wave speed of its /MAT card (inp2radioss_v6.MATERIALS), plus the SH3N skin
+triangles written for contact (plate wave speed, smallest altitude).
+From the smallest step it predicts the cycle count and wall time of the
+/RUN end time, so a bad mesh is rejected before the engine is launched.
+
+The prediction is for the *initial* mesh: element distortion during the
+fracture phase lowers the step further (1e-9 -> 4e-11 in attempt 6).
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from inp2radioss_v6 import MATERIALS, ROLE_MATERIAL, RUN_END_TIME
+from strip_model import role_of_elset, row_elsets
+from surface_fast import extract_surface_faces_np
+
+DTFAC = 0.9                 # Radioss default time-step scale factor
+# Engine cost per element and cycle, rough calibration from attempt 6
+# (~113k elements incl. skins, 4.5 h on 14 cores / -nt 20)
+COST_PER_ELEMENT_CYCLE = 2.0e-7
+SKIN_ROLES = {'PUNCH': 101, 'MATERIAL': 102, 'DIE': 103}
+
+
+def dilatational_speed(mat):
+    E, nu, rho = mat['E'], mat['nu'], mat['rho']
+    return np.sqrt(E * (1.0 - nu) / (rho * (1.0 + nu) * (1.0 - 2.0 * nu)))
+
+
+def plate_speed(mat):
+    return np.sqrt(mat['E'] / (mat['rho'] * (1.0 - mat['nu'] ** 2)))
+
+
+def tet_char_length(xyz):
+    """Smallest altitude 3V / A_max of (E,4,3) tets."""
+    a, b, c, d = xyz[:, 0], xyz[:, 1], xyz[:, 2], xyz[:, 3]
+    vol = np.abs(np.einsum('ij,ij->i', np.cross(b - a, c - a), d - a)) / 6.0
+    areas = np.stack([
+        np.linalg.norm(np.cross(c - a, b - a), axis=1),
+        np.linalg.norm(np.cross(b - a, d - a), axis=1),
+        np.linalg.norm(np.cross(c - b, d - b), axis=1),
+        np.linalg.norm(np.cross(a - c, d - c), axis=1),
+    ], axis=1) * 0.5
+    amax = areas.max(axis=1)
+    return np.divide(3.0 * vol, amax, out=np.zeros_like(vol), where=amax > 0)
+
+
+def tri_char_length(xyz):
+    """Smallest altitude 2A / max edge of (F,3,3) triangles."""
+    a, b, c = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    area2 = np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    edge = np.max(np.stack([np.linalg.norm(b - a, axis=1), np.linalg.norm(c - b, axis=1),
+                            np.linalg.norm(a - c, axis=1)], axis=1), axis=1)
+    return np.divide(area2, edge, out=np.zeros_like(area2), where=edge > 0)
+
+
+def part_rows(mesh):
+    """{role: row indices} using the converter's elset -> part mapping."""
+    sets = row_elsets(mesh)
+    rows = {}
+    for k, name in enumerate(mesh['elset_names']):
+        role = role_of_elset(name)
+        if role:
+            rows.setdefault(role, []).append(np.flatnonzero(sets == k))
+    if not rows and len(sets):
+        # write_starter_file falls back to one steel part
+        return {'PUNCH': np.arange(len(sets))}
+    return {role: np.concatenate(r) for role, r in rows.items()}
+
+
+def element_time_steps(mesh, skins=True, dtfac=DTFAC):
+    """Per-element initial time step (s).
+
+    Returns a dict of arrays: dt, length (m), centroid (mm), ids, part label.
+    Skin triangles get ids past the largest solid id, as in the starter deck.
+    """
+    node_ids = np.asarray(mesh['node_ids'])
+    coords = np.asarray(mesh['coords'])
+    conn = np.asarray(mesh['conn'])
+    elem_ids = np.asarray(mesh['elem_ids'])
+    out = {'dt': [], 'length': [], 'centroid': [], 'ids': [], 'part': []}
+    faces = {}
+    for role, rows in part_rows(mesh).items():
+        xyz = coords[np.searchsorted(node_ids, conn[rows])]
+        L = tet_char_length(xyz / 1000.0)
+        c = dilatational_speed(MATERIALS[ROLE_MATERIAL[role]])
+        out['dt'].append(dtfac * L / c)
+        out['length'].append(L)
+        out['centroid'].append(xyz.mean(axis=1))
+        out['ids'].append(elem_ids[rows])
+        out['part'].append(np.full(len(rows), role.capitalize(), dtype=object))
+        if skins and role in SKIN_ROLES:
+            faces[role] = extract_surface_faces_np(conn[rows], node_ids, coords)
+    next_id = int(elem_ids.max()) + 1 if len(elem_ids) else 1
+    for role in ('PUNCH', 'MATERIAL', 'DIE'):
+        if role not in faces or not len(faces[role]):
+            continue
+        xyz = coords[np.searchsorted(node_ids, faces[role])]
+        L = tri_char_length(xyz / 1000.0)
+        c = plate_speed(MATERIALS[ROLE_MATERIAL[role]])
+        out['dt'].append(dtfac * L / c)
+        out['length'].append(L)
+        out['centroid'].append(xyz.mean(axis=1))
+        out['ids'].append(np.arange(next_id, next_id + len(L)))
+        out['part'].append(np.full(len(L), f"{role.capitalize()}_Skin", dtype=object))
+        next_id += len(L)
+    if not out['dt']:
+        return {k: np.zeros(0) for k in out}
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+
+def preflight(mesh, t_end=RUN_END_TIME, n_worst=10, cost=COST_PER_ELEMENT_CYCLE,
+              skins=True, bins=12):
+    """Time-step report dict (see print_report)."""
+    st = element_time_steps(mesh, skins=skins)
+    dt = st['dt']
+    report = {'t_end': t_end, 'dtfac': DTFAC, 'elements': int(len(dt)), 'parts': {}}
+    if not len(dt):
+        return report
+    for part in dict.fromkeys(st['part'].tolist()):
+        sel = st['part'] == part
+        i = np.flatnonzero(sel)[np.argmin(dt[sel])]
+        report['parts'][part] = {
+            'elements': int(sel.sum()),
+            'dt_min': float(dt[i]),
+            'dt_median': float(np.median(dt[sel])),
+            'min_length_mm': float(st['length'][i] * 1000.0),
+        }
+    positive = dt[dt > 0]
+    lo = np.log10(positive.min()) if len(positive) else -12
+    hi = np.log10(positive.max()) if len(positive) else -6
+    counts, edges = np.histogram(np.log10(positive), bins=bins, range=(lo, hi if hi > lo else lo + 1))
+    report['histogram'] = {'edges': (10.0 ** edges).tolist(), 'counts': counts.tolist()}
+    report['degenerate'] = int(np.sum(dt <= 0))
+
+    k = min(n_worst, len(dt))
+    worst = np.argpartition(dt, k - 1)[:k]
+    worst = worst[np.argsort(dt[worst])]
+    report['worst'] = [{
+        'id': int(st['ids'][i]), 'part': st['part'][i], 'dt': float(dt[i]),
+        'length_mm': float(st['length'][i] * 1000.0),
+        'x': float(st['centroid'][i][0]), 'y': float(st['centroid'][i][1]),
+        'z': float(st['centroid'][i][2]),
+    } for i in worst]
+
+    dt_min = float(positive.min()) if len(positive) else 0.0
+    cycles = t_end / dt_min if dt_min > 0 else float('inf')
+    report['dt_min'] = dt_min
+    report['controlling_part'] = min(report['parts'], key=lambda p: report['parts'][p]['dt_min'])
+    report['cycles'] = cycles
+    report['cost_per_element_cycle'] = cost
+    report['wall_time_s'] = cycles * len(dt) * cost
+    return report
+
+
+def print_report(report):
+    print(f"  Pre-flight time step (DTFAC={report['dtfac']}, {report['elements']} elements)")
+    for part, p in report['parts'].items():
+        print(f"    {part:14s} {p['elements']:9d} el  dt_min {p['dt_min']:.3E} s  "
+              f"median {p['dt_median']:.3E} s  L_min {p['min_length_mm']:.4f} mm")
+    if 'histogram' not in report:
+        return
+    counts = report['histogram']['counts']
+    edges = report['histogram']['edges']
+    peak = max(counts) or 1
+    print("    dt histogram:")
+    for c, a, b in zip(counts, edges[:-1], edges[1:]):
+        print(f"      {a:.2E} - {b:.2E} {c:9d} {'#' * int(round(40 * c / peak))}")
+    if report['degenerate']:
+        print(f"    WARNING: {report['degenerate']} degenerate (zero volume/area) elements")
+    print("    Worst elements:")
+    for w in report['worst']:
+        print(f"      {w['id']:10d} {w['part']:14s} dt {w['dt']:.3E} s  L {w['length_mm']:.4f} mm  "
+              f"at ({w['x']:.3f}, {w['y']:.3f}, {w['z']:.3f})")
+    hours = report['wall_time_s'] / 3600.0
+    print(f"  Initial dt {report['dt_min']:.3E} s ({report['controlling_part']}), "
+          f"{report['cycles']:.3E} cycles to t={report['t_end']} s, "
+          f"predicted wall time {hours:.2f} h (before fracture slowdown)")
+
+
+def main():
+    from mesh_cache import load_mesh
+    ap = argparse.ArgumentParser(description="Initial time step and runtime prediction for an INP deck")
+    ap.add_argument("inp_path")
+    ap.add_argument("--t-end", type=float, default=RUN_END_TIME, help="/RUN end time (s)")
+    ap.add_argument("--worst", type=int, default=10, help="number of worst elements to list")
+    ap.add_argument("--cost", type=float, default=COST_PER_ELEMENT_CYCLE,
+                    help="engine seconds per element and cycle")
+    ap.add_argument("--no-skins", action="store_true", help="ignore the SH3N contact skins")
+    ap.add_argument("--json", default=None, help="write the report to this JSON file")
+    args = ap.parse_args()
+    report = preflight(load_mesh(args.inp_path), t_end=args.t_end, n_worst=args.worst,
+                       cost=args.cost, skins=not args.no_skins)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
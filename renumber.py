@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Node / element renumbering for memory locality
+
+The converter writes /NODE in INP id order and /TETRA4 in elset order, which
+says nothing about which nodes are neighbours. renumber_mesh() orders the
+nodes either by reverse Cuthill-McKee on the tet node graph (small matrix
+bandwidth) or along a Morton (Z-order) curve of the coordinates, then
+assigns node ids 1..n in that order and element ids 1..E with every elset
+sorted by its elements' lowest new node id. Everything write_starter_file
+derives (parts, skins, node groups, interfaces) follows the new ids;
+orig_node_ids / orig_elem_ids keep the INP ids for write_id_map().
+"""
+
+from collections import deque
+
+import numpy as np
+
+from strip_model import row_elsets
+
+TET_EDGES = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+MORTON_BITS = 21
+
+
+def node_graph(conn, n):
+    """CSR (indptr, indices) of the node adjacency of (E,4) position arrays."""
+    a = np.concatenate([conn[:, i] for i, _ in TET_EDGES])
+    b = np.concatenate([conn[:, j] for _, j in TET_EDGES])
+    key = np.unique(np.concatenate([a * n + b, b * n + a]))
+    rows, cols = key // n, key % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols
+
+
+def rcm_order(indptr, indices):
+    """Reverse Cuthill-McKee permutation (new position -> old position).
+    Each component starts from a pseudo-peripheral node; neighbours are
+    visited by increasing degree."""
+    n = len(indptr) - 1
+    degree = np.diff(indptr)
+    row = np.repeat(np.arange(n), degree)
+    nbrs = indices[np.lexsort((indices, degree[indices], row))].tolist()
+    ptr = indptr.tolist()
+    visited = bytearray(n)
+    order = []
+
+    def bfs(start, seen):
+        seen[start] = 1
+        out = [start]
+        queue = deque(out)
+        while queue:
+            v = queue.popleft()
+            for w in nbrs[ptr[v]:ptr[v + 1]]:
+                if not seen[w]:
+                    seen[w] = 1
+                    out.append(w)
+                    queue.append(w)
+        return out
+
+    for start in np.argsort(degree, kind='stable').tolist():
+        if visited[start]:
+            continue
+        if degree[start]:
+            # Farthest node of a first sweep as pseudo-peripheral start
+            first = bfs(start, bytearray(n))
+            start = first[-1]
+        order.extend(bfs(start, visited))
+    return np.array(order[::-1], dtype=np.int64)
+
+
+def _spread_bits(v):
+    """Insert two zero bits between the low 21 bits of v (uint64)."""
+    v = v & np.uint64(0x1FFFFF)
+    v = (v | v << np.uint64(32)) & np.uint64(0x1F00000000FFFF)
+    v = (v | v << np.uint64(16)) & np.uint64(0x1F0000FF0000FF)
+    v = (v | v << np.uint64(8)) & np.uint64(0x100F00F00F00F00F)
+    v = (v | v << np.uint64(4)) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | v << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_order(points):
+    """Permutation sorting (N,3) points along the Morton curve."""
+    p = np.asarray(points, dtype=np.float64)
+    if not len(p):
+        return np.zeros(0, dtype=np.int64)
+    lo = p.min(axis=0)
+    span = max(float((p.max(axis=0) - lo).max()), 1e-300)
+    q = np.minimum((p - lo) / span * (1 << MORTON_BITS), (1 << MORTON_BITS) - 1).astype(np.uint64)
+    key = _spread_bits(q[:, 0]) | _spread_bits(q[:, 1]) << np.uint64(1) | _spread_bits(q[:, 2]) << np.uint64(2)
+    return np.argsort(key, kind='stable')
+
+
+def bandwidth(conn_pos):
+    """(bandwidth, mean element span) of (E,4) node positions in /NODE order."""
+    if not len(conn_pos):
+        return 0, 0.0
+    span = conn_pos.max(axis=1) - conn_pos.min(axis=1)
+    return int(span.max()), float(span.mean())
+
+
+def renumber_mesh(mesh, method='rcm'):
+    """Renumbered copy of the mesh dict. Returns (mesh, new_id_of, report):
+    new_id_of[k] is the new id of the input node mesh['node_ids'][k]."""
+    node_ids = np.asarray(mesh['node_ids'])
+    conn = np.asarray(mesh['conn'])
+    pos = np.searchsorted(node_ids, conn)
+    n = len(node_ids)
+    if method == 'rcm':
+        order = rcm_order(*node_graph(pos, n))
+    elif method == 'morton':
+        order = morton_order(mesh['coords'])
+    else:
+        raise ValueError(f"unknown renumbering method '{method}'")
+    new_id_of = np.empty(n, dtype=np.int64)
+    new_id_of[order] = np.arange(1, n + 1)
+    new_conn = new_id_of[pos]
+
+    # Elements: keep the elset blocks, sort each by its lowest new node id
+    sets = row_elsets(mesh)
+    rows = np.lexsort((new_conn.mean(axis=1), new_conn.min(axis=1), sets))
+    orig_nodes = np.asarray(mesh.get('orig_node_ids', node_ids))
+    orig_elems = np.asarray(mesh.get('orig_elem_ids', mesh['elem_ids']))
+    out = dict(mesh)
+    out.update({
+        'node_ids': np.arange(1, n + 1, dtype=np.int64),
+        'coords': np.asarray(mesh['coords'])[order],
+        'elem_ids': np.arange(1, len(rows) + 1, dtype=np.int64),
+        'conn': new_conn[rows],
+        'orig_node_ids': orig_nodes[order],
+        'orig_elem_ids': orig_elems[rows],
+    })
+    before = bandwidth(pos)
+    after = bandwidth(new_conn - 1)
+    report = {'method': method, 'nodes': n, 'elements': len(rows),
+              'bandwidth_before': before[0], 'bandwidth_after': after[0],
+              'mean_span_before': before[1], 'mean_span_after': after[1]}
+    return out, new_id_of, report
+
+
+def remap_groups(groups, node_ids, new_id_of):
+    """Node groups ({'nodes': ids, ...}) expressed in the renumbered ids."""
+    return [dict(g, nodes=np.sort(new_id_of[np.searchsorted(node_ids, g['nodes'])])) for g in groups]
+
+
+def write_id_map(path, mesh):
+    """CSV 'kind,rad_id,inp_id' for nodes (N) and elements (E)."""
+    with open(path, 'w') as f:
+        f.write("kind,rad_id,inp_id\n")
+        for kind, new, old in (('N', mesh['node_ids'], mesh['orig_node_ids']),
+                               ('E', mesh['elem_ids'], mesh['orig_elem_ids'])):
+            n = len(new)
+            f.write((f'{kind},%d,%d\n' * n) % tuple(np.column_stack([new, old]).ravel().tolist()))
+    print(f"  Id map written: {path}")
+
+
+def print_report(report):
+    print(f"  Renumbering ({report['method']}): {report['nodes']} nodes, {report['elements']} elements")
+    print(f"    bandwidth {report['bandwidth_before']} -> {report['bandwidth_after']}, "
+          f"mean element span {report['mean_span_before']:.1f} -> {report['mean_span_after']:.1f}")
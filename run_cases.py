@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Batch runner for OpenRadioss case sweeps (Linux counterpart of
+run_simulation.bat)
+
+A cases file lists the decks to run, each with its converter arguments:
+
+    {"defaults": {"np": 1, "args": ["--fast"]},
+     "cases": [
+        {"name": "strip_1mm", "inp": "ASSY.inp", "args": ["--strip-width", "1.0"]},
+        {"name": "strip_2mm", "inp": "ASSY.inp", "args": ["--strip-width", "2.0"], "np": 2}
+     ]}
+
+(a plain list of cases is accepted too). Every case runs in its own
+directory <workdir>/<name>: inp2radioss_v6.py, then the starter and the
+engine, once per engine deck when the converter wrote staged runs
+(_0001, _0002, ... with --stages). Up to --jobs cases run at once and the cores are split between
+them: each job gets cores // jobs threads, shared by its np MPI domains
+(-nt = threads // np). Exit codes, durations and log files are kept in
+<workdir>/run_state.json with the command of every stage; running the
+same sweep again skips the stages that already finished with the same
+command and, for the converter, the same INP (--force reruns them).
+The mesh cache of every INP is built once before the jobs start, so
+concurrent conversions of one deck only read it.
+
+The executables come from --starter / --engine, the OPENRADIOSS_STARTER /
+OPENRADIOSS_ENGINE environment variables, or the OpenRadioss Linux build
+names below; --mpirun sets the MPI launcher used when np > 1.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONVERTER = os.path.join(HERE, 'inp2radioss_v6.py')
+DEFAULT_STARTER = 'starter_linux64_gf'
+DEFAULT_ENGINE = 'engine_linux64_gf'
+DEFAULT_MPIRUN = 'mpiexec -n {np}'
+STATE_NAME = 'run_state.json'
+
+
+def load_cases(path):
+    """Case dicts (name, inp, args, np) with the file defaults applied."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {'cases': data}
+    defaults = data.get('defaults', {})
+    base = os.path.dirname(os.path.abspath(path))
+    cases = []
+    for k, c in enumerate(data['cases']):
+        case = dict(defaults, **c)
+        case['args'] = list(defaults.get('args', [])) + list(c.get('args', []))
+        case.setdefault('name', f"case_{k + 1:03d}")
+        case['inp'] = os.path.join(base, case['inp'])
+        case['np'] = int(case.get('np', 1))
+        cases.append(case)
+    names = [c['name'] for c in cases]
+    if len(set(names)) != len(names):
+        raise ValueError("case names must be unique")
+    return cases
+
+
+class RunState:
+    """run_state.json, shared by the job threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def get(self, case, stage):
+        return self.data.get(case, {}).get(stage)
+
+    def stages(self, case):
+        return [(stage, rec) for stage, rec in self.data.get(case, {}).items() if rec]
+
+    def drop_after(self, case, stage):
+        """Forget the stages recorded after stage (they are stale)."""
+        with self.lock:
+            recs = self.data.get(case, {})
+            names = list(recs)
+            for later in names[names.index(stage) + 1:]:
+                del recs[later]
+        self.set(case, stage, recs[stage])
+
+    def set(self, case, stage, record):
+        with self.lock:
+            self.data.setdefault(case, {})[stage] = record
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+def run_stage(cmd, cwd, log_path, env=None):
+    """Run cmd with stdout/stderr to log_path. Returns (exit code, seconds)."""
+    t0 = time.perf_counter()
+    with open(log_path, 'w') as log:
+        log.write("$ " + " ".join(shlex.quote(c) for c in cmd) + "\n")
+        log.flush()
+        try:
+            code = subprocess.call(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT, env=env)
+        except OSError as e:
+            log.write(f"{e}\n")
+            code = 127
+    return code, time.perf_counter() - t0
+
+
+def _log_failed(log_path):
+    """OpenRadioss may exit 0 after an ERROR TERMINATION: check the log tail."""
+    try:
+        with open(log_path, 'rb') as f:
+            f.seek(max(0, os.path.getsize(log_path) - 65536))
+            return b'ERROR TERMINATION' in f.read()
+    except OSError:
+        return False
+
+
+def engine_decks(cwd, base):
+    """<base>_0001.rad, _0002.rad, ... (staged runs chained by restart) written
+    with the current starter deck; older leftovers are ignored."""
+    starter = os.path.join(cwd, f"{base}_0000.rad")
+    if not os.path.exists(starter):
+        return []
+    t0 = os.path.getmtime(starter)
+    decks = []
+    k = 1
+    while os.path.exists(os.path.join(cwd, f"{base}_{k:04d}.rad")):
+        deck = f"{base}_{k:04d}.rad"
+        if os.path.getmtime(os.path.join(cwd, deck)) < t0:
+            break
+        decks.append(deck)
+        k += 1
+    return decks
+
+
+def _executable(command):
+    """Command string with a relative executable path made absolute (the
+    stages run inside the case directories)."""
+    tok = shlex.split(command)
+    if tok and os.sep in tok[0] and not os.path.isabs(tok[0]):
+        tok[0] = os.path.abspath(tok[0])
+    return tok
+
+
+def _source(inp_path):
+    """[size, mtime_ns] of the INP (None when missing): a changed deck is converted again."""
+    try:
+        st = os.stat(inp_path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def prepare_caches(cases):
+    """Build the mesh cache of every INP once, before the jobs convert it concurrently."""
+    from mesh_cache import load_mesh
+    for inp in sorted({c['inp'] for c in cases if '--no-cache' not in c['args']}):
+        if not os.path.exists(inp):
+            continue
+        try:
+            load_mesh(inp)
+        except (OSError, ValueError) as e:
+            print(f"  Mesh cache of {inp} not built ({e})")
+
+
+def run_case(case, workdir, state, threads, cfg):
+    """Convert, start and run one case; returns its final status."""
+    name = case['name']
+    cwd = os.path.join(workdir, name)
+    os.makedirs(cwd, exist_ok=True)
+    base = os.path.splitext(os.path.basename(case['inp']))[0]
+    nt = max(1, threads // case['np'])
+    env = dict(os.environ, OMP_NUM_THREADS=str(nt), OMP_STACKSIZE=os.environ.get('OMP_STACKSIZE', '400m'))
+    mpirun = shlex.split(cfg['mpirun'].format(np=case['np'])) if case['np'] > 1 else []
+
+    def stages():
+        # Generator: the engine decks are listed once the converter has run
+        yield 'convert', [sys.executable, CONVERTER, case['inp']] + case['args'], [f"{base}_0000.rad", f"{base}_0001.rad"]
+        yield 'starter', _executable(cfg['starter']) + ['-i', f"{base}_0000.rad", '-np', str(case['np'])], []
+        for k, deck in enumerate(engine_decks(cwd, base)):
+            yield ('engine' if k == 0 else f"engine_{k + 1:04d}",
+                   mpirun + _executable(cfg['engine']) + ['-i', deck, '-nt', str(nt)], [])
+
+    rerun = cfg['force']
+    for stage, cmd, outputs in stages():
+        prev = state.get(name, stage)
+        source = _source(case['inp']) if stage == 'convert' else None
+        if (not rerun and prev and prev['status'] == 'ok'
+                and prev.get('cmd') == cmd and prev.get('source') == source
+                and all(os.path.exists(os.path.join(cwd, o)) for o in outputs)):
+            continue
+        rerun = True        # the stages after a rerun one are stale
+        log_path = os.path.join(cwd, f"{stage}.log")
+        print(f"[{name}] {stage}: {' '.join(cmd)}")
+        state.set(name, stage, {'status': 'running', 'started': time.strftime('%Y-%m-%d %H:%M:%S')})
+        code, seconds = run_stage(cmd, cwd, log_path, env)
+        ok = code == 0 and not (stage != 'convert' and _log_failed(log_path))
+        state.set(name, stage, {'status': 'ok' if ok else 'failed', 'exit_code': code,
+                                'seconds': round(seconds, 2), 'log': log_path, 'threads': nt,
+                                'np': case['np'], 'cmd': cmd, 'source': source})
+        print(f"[{name}] {stage}: {'ok' if ok else 'FAILED'} (exit {code}, {seconds:.1f} s)")
+        if not ok:
+            state.drop_after(name, stage)
+            return 'failed'
+    return 'ok'
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert and run a sweep of OpenRadioss cases")
+    ap.add_argument("cases", help="cases JSON file")
+    ap.add_argument("--workdir", default="runs", help="one sub-directory per case (default ./runs)")
+    ap.add_argument("--jobs", type=int, default=1, help="cases run concurrently")
+    ap.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="cores shared by the jobs")
+    ap.add_argument("--starter", default=os.environ.get('OPENRADIOSS_STARTER', DEFAULT_STARTER))
+    ap.add_argument("--engine", default=os.environ.get('OPENRADIOSS_ENGINE', DEFAULT_ENGINE))
+    ap.add_argument("--mpirun", default=DEFAULT_MPIRUN, help="MPI launcher for np > 1 ({np} is replaced)")
+    ap.add_argument("--force", action="store_true", help="rerun the stages that already finished")
+    args = ap.parse_args()
+
+    cases = load_cases(args.cases)
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    state = RunState(os.path.join(workdir, STATE_NAME))
+    jobs = max(1, min(args.jobs, len(cases)))
+    threads = max(1, args.cores // jobs)
+    cfg = {'starter': args.starter, 'engine': args.engine, 'mpirun': args.mpirun, 'force': args.force}
+    print(f"{len(cases)} case(s), {jobs} concurrent job(s), {threads} thread(s) per job")
+    prepare_caches(cases)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = dict(zip([c['name'] for c in cases],
+                           pool.map(lambda c: run_case(c, workdir, state, threads, cfg), cases)))
+    print("Summary:")
+    for name, status in results.items():
+        stages = ", ".join(f"{s} {rec['status']}" for s, rec in state.stages(name))
+        print(f"  {name:20s} {status:6s} ({stages})")
+    return 0 if all(s == 'ok' for s in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
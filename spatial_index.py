@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Uniform-grid spatial index on NumPy point clouds
+
+Points are binned into cubic cells; the cell keys are sorted once so that
+box and radius queries only touch the cells they overlap. All queries are
+vectorized over many query points at once (processed in batches to bound
+memory).
+"""
+
+import numpy as np
+
+QUERY_BATCH = 1 << 16
+
+
+class UniformGrid:
+    """Static uniform grid over (N,3) points."""
+
+    def __init__(self, points, cell=None, per_cell=8):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = len(self.points)
+        if n:
+            self.lo = self.points.min(axis=0)
+            span = self.points.max(axis=0) - self.lo
+        else:
+            self.lo = np.zeros(3)
+            span = np.ones(3)
+        if cell is None:
+            # About per_cell points per occupied cell for a volume-filling cloud
+            vol = float(np.prod(np.maximum(span, span.max() * 1e-3 + 1e-12)))
+            cell = (vol * per_cell / max(n, 1)) ** (1.0 / 3.0)
+        self.cell = float(max(cell, 1e-12))
+        self.dims = np.floor(span / self.cell).astype(np.int64) + 1
+        keys = self._keys(self._cells(self.points))
+        self.order = np.argsort(keys, kind='stable')
+        skeys = keys[self.order]
+        self.keys, self.starts = np.unique(skeys, return_index=True)
+        self.ends = np.append(self.starts[1:], len(skeys))
+
+    def _cells(self, pts):
+        return np.floor((pts - self.lo) / self.cell).astype(np.int64)
+
+    def _keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def _cell_ranges(self, cells):
+        """[start, end) into self.order for each (M,3) cell; empty when unoccupied."""
+        inside = np.all((cells >= 0) & (cells < self.dims), axis=1)
+        keys = self._keys(np.where(inside[:, None], cells, 0))
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        hit = inside & (self.keys[pos] == keys)
+        return np.where(hit, self.starts[pos], 0), np.where(hit, self.ends[pos], 0)
+
+    def query_box(self, lo, hi):
+        """Indices of points with lo <= p <= hi (inclusive, per axis)."""
+        lo = np.maximum(np.asarray(lo, dtype=np.float64), self.lo - self.cell)
+        hi = np.minimum(np.asarray(hi, dtype=np.float64), self.lo + self.dims * self.cell)
+        if len(self.points) == 0 or np.any(hi < lo):
+            return np.zeros(0, dtype=np.int64)
+        c0 = np.maximum(self._cells(lo[None])[0], 0)
+        c1 = np.minimum(self._cells(hi[None])[0], self.dims - 1)
+        # Occupied cells whose key lies in the box
+        kx = self.keys // (self.dims[1] * self.dims[2])
+        ky = (self.keys // self.dims[2]) % self.dims[1]
+        kz = self.keys % self.dims[2]
+        sel = ((kx >= c0[0]) & (kx <= c1[0]) & (ky >= c0[1]) & (ky <= c1[1])
+               & (kz >= c0[2]) & (kz <= c1[2]))
+        idx = _expand(self.starts[sel], self.ends[sel])
+        cand = self.order[idx]
+        p = self.points[cand]
+        ok = np.all((p >= lo) & (p <= hi), axis=1)
+        return np.sort(cand[ok])
+
+    def nearest_distance(self, queries, radius):
+        """Distance from each query point to the closest indexed point,
+        np.inf when there is none within radius."""
+        q = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        out = np.full(len(q), np.inf)
+        if len(self.points) == 0 or len(q) == 0:
+            return out
+        reach = int(np.ceil(radius / self.cell))
+        rng = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(rng, rng, rng, indexing='ij'), -1).reshape(-1, 3)
+        r2 = radius * radius
+        for a in range(0, len(q), QUERY_BATCH):
+            qb = q[a:a + QUERY_BATCH]
+            qc = self._cells(qb)
+            best = np.full(len(qb), np.inf)
+            for off in offsets:
+                start, end = self._cell_ranges(qc + off)
+                counts = end - start
+                if not counts.any():
+                    continue
+                owner = np.repeat(np.arange(len(qb)), counts)
+                cand = self.order[_expand(start, end)]
+                d2 = np.sum((self.points[cand] - qb[owner]) ** 2, axis=1)
+                np.minimum.at(best, owner, d2)
+            best[best > r2] = np.inf
+            out[a:a + QUERY_BATCH] = np.sqrt(best)
+        return out
+
+    def within(self, queries, radius):
+        """Boolean mask over queries: True when an indexed point is within radius.
+
+        Neighbour cells lying entirely inside the radius only have to be
+        occupied; exact distances are computed for the boundary cells, and
+        only for queries that are still undecided."""
+        q = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        out = np.zeros(len(q), dtype=bool)
+        if len(self.points) == 0 or len(q) == 0:
+            return out
+        reach = int(np.ceil(radius / self.cell))
+        rng = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(rng, rng, rng, indexing='ij'), -1).reshape(-1, 3)
+        # Closest / farthest distance between points of two cells `off` apart
+        gap = self.cell * np.sqrt(np.sum(np.maximum(np.abs(offsets) - 1, 0) ** 2, axis=1))
+        span = self.cell * np.sqrt(np.sum((np.abs(offsets) + 1) ** 2, axis=1))
+        full = offsets[span <= radius]
+        partial = offsets[(span > radius) & (gap <= radius)]
+        partial = partial[np.argsort(np.abs(partial).sum(axis=1), kind='stable')]
+        r2 = radius * radius
+        for a in range(0, len(q), QUERY_BATCH):
+            qb = q[a:a + QUERY_BATCH]
+            qc = self._cells(qb)
+            hit = np.zeros(len(qb), dtype=bool)
+            for off in full:
+                start, end = self._cell_ranges(qc + off)
+                hit |= end > start
+            for off in partial:
+                todo = np.flatnonzero(~hit)
+                if not len(todo):
+                    break
+                start, end = self._cell_ranges(qc[todo] + off)
+                counts = end - start
+                if not counts.any():
+                    continue
+                owner = np.repeat(todo, counts)
+                cand = self.order[_expand(start, end)]
+                near = np.sum((self.points[cand] - qb[owner]) ** 2, axis=1) <= r2
+                hit[owner[near]] = True
+            out[a:a + QUERY_BATCH] = hit
+        return out
+
+
+def _expand(starts, ends):
+    """Concatenate np.arange(s, e) for all ranges without a Python loop."""
+    counts = ends - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    base = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return base + np.arange(total)
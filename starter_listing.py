@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Starter listing (*_0000.out) parser
+
+Reads the listing line by line (never the whole file) and collects:
+  - WARNING / ERROR messages grouped by ID, with their title, count and the
+    entities they reference ("-- INTERFACE ID: 2", "-- BLOCK: /PROP/SOLID/1")
+  - the model-size counters (NUMNOD, NUMELS, NUMELTG, NINTER, ...)
+  - the element / nodal time-step tables (smallest step and its element)
+  - the /DT/NODA/CST added-mass estimation, total mass and added mass
+  - memory, restart size, elapsed time and the termination status
+
+Usage:
+    python starter_listing.py run_0000.out [--json summary.json]
+    python starter_listing.py --diff old_0000.out new_0000.out
+(--diff also accepts the JSON summaries written by --json.)
+"""
+
+import argparse
+import json
+import re
+import sys
+
+_NUM = r'[-+]?\d+(?:\.\d*)?(?:E[-+]?\d+)?'
+_MESSAGE_RE = re.compile(r'^(WARNING|ERROR) ID :\s*(\d+)\s*$')
+_ENTITY_RE = re.compile(r'^\s*--\s*([A-Z][A-Z0-9 _/]*?)\s*[:=]\s*(.*?)\s*$')
+_COUNTER_RE = re.compile(r'^\s+([A-Z][A-Z0-9_]*)\s*:\s*(NUMBER OF .*?)[ .]*\s(\d+)\s*$')
+_TS_TABLE_RE = re.compile(r'^\s+([A-Z][A-Z /]* TIME STEP(?: \(estimation\))?)\s*$')
+_TS_ROW_RE = re.compile(r'^\s+(' + _NUM + r')\s+(\d+)\s*$')
+_DM_ROW_RE = re.compile(r'^\s+(' + _NUM + r')\s+\|\s+(' + _NUM + r')\s+\|\s+(' + _NUM + r')\s*$')
+_VALUES = [
+    ('starter_memory_mb', re.compile(r'STARTER MEMORY USAGE\s+(\d+) MB')),
+    ('restart_file_mb', re.compile(r'RESTART FILE SIZE\s+(\d+) MB')),
+    ('elapsed_s', re.compile(r'ELAPSED TIME\.*=\s*(' + _NUM + r') s')),
+    ('total_added_mass', re.compile(r'TOTAL ADDED MASS =\s*(' + _NUM + r')')),
+    ('brick_min_time_step', re.compile(r'BRICK MINIMUM TIME STEP\.*=\s*(' + _NUM + r')')),
+    ('errors', re.compile(r'^\s+(\d+) ERROR\(S\)\s*$')),
+    ('warnings', re.compile(r'^\s+(\d+) WARNING\(S\)\s*$')),
+]
+MAX_ENTITIES = 50           # referenced entity values kept per message ID and key
+TS_ROWS = 10                # rows kept per time-step table
+
+
+def _number(s):
+    v = float(s)
+    return int(v) if v.is_integer() and 'E' not in s.upper() and '.' not in s else v
+
+
+def parse_listing(path):
+    """Structured summary dict of a starter listing."""
+    summary = {'file': path, 'messages': {}, 'counters': {}, 'time_steps': {},
+               'added_mass_estimation': [], 'termination': None}
+    msg = None              # message being read
+    table = None            # time-step table being read
+    mass_next = False
+    with open(path, 'r', encoding='latin-1') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            # Message blocks end at the first blank line
+            if msg is not None:
+                if not line.strip() or _MESSAGE_RE.match(line):
+                    msg = None
+                else:
+                    if msg['title'] is None and line.startswith('**'):
+                        msg['title'] = line.strip('* ').strip()
+                    m = _ENTITY_RE.match(line)
+                    if m:
+                        vals = msg['entities'].setdefault(m.group(1), [])
+                        if m.group(2) not in vals and len(vals) < MAX_ENTITIES:
+                            vals.append(m.group(2))
+                    continue
+            m = _MESSAGE_RE.match(line)
+            if m:
+                key = m.group(2)
+                msg = summary['messages'].setdefault(key, {'type': m.group(1), 'id': int(key), 'title': None,
+                                                           'count': 0, 'entities': {}})
+                msg['count'] += 1
+                continue
+
+            if table is not None:
+                m = _TS_ROW_RE.match(line)
+                if m:
+                    rows = summary['time_steps'][table]
+                    if len(rows['rows']) < TS_ROWS:
+                        rows['rows'].append([float(m.group(1)), int(m.group(2))])
+                    rows['listed'] += 1
+                    continue
+                if rows['listed'] or (line.strip() and not line.strip().startswith(('-', 'TIME STEP'))):
+                    table = None
+            m = _TS_TABLE_RE.match(line)
+            if m and 'DISTRIBUTION' not in line:
+                table = m.group(1).strip()
+                rows = summary['time_steps'].setdefault(table, {'rows': [], 'listed': 0})
+                continue
+
+            m = _COUNTER_RE.match(line)
+            if m:
+                summary['counters'][m.group(1)] = int(m.group(3))
+                continue
+            m = _DM_ROW_RE.match(line)
+            if m:
+                summary['added_mass_estimation'].append([float(g) for g in m.groups()])
+                continue
+            if mass_next and line.strip():
+                summary['total_mass'] = float(line.split()[0])
+                mass_next = False
+                continue
+            if 'MASS' in line and line.split()[:1] == ['MASS'] and 'X' in line:
+                mass_next = True        # header of the TOTAL MASS AND MASS CENTER row
+                continue
+            if 'TERMINATION' in line and summary['termination'] is None:
+                summary['termination'] = line.strip()
+                continue
+            for key, rx in _VALUES:
+                if key not in summary:
+                    m = rx.search(line)
+                    if m:
+                        summary[key] = _number(m.group(1))
+                        break
+    for name, t in summary['time_steps'].items():
+        if t['rows']:
+            t['dt_min'], t['id_min'] = t['rows'][0]
+    return summary
+
+
+def load_summary(path):
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return parse_listing(path)
+
+
+def diff_summaries(a, b):
+    """Differences between two summaries as a dict of (old, new) pairs."""
+    out = {'counters': {}, 'time_steps': {}, 'messages': {}, 'values': {}}
+    for k in sorted(set(a['counters']) | set(b['counters'])):
+        va, vb = a['counters'].get(k), b['counters'].get(k)
+        if va != vb:
+            out['counters'][k] = (va, vb)
+    for k in sorted(set(a['time_steps']) | set(b['time_steps'])):
+        va = a['time_steps'].get(k, {}).get('dt_min')
+        vb = b['time_steps'].get(k, {}).get('dt_min')
+        if va != vb:
+            out['time_steps'][k] = (va, vb)
+    for k in sorted(set(a['messages']) | set(b['messages']), key=int):
+        ma, mb = a['messages'].get(k), b['messages'].get(k)
+        ca, cb = (ma or {}).get('count', 0), (mb or {}).get('count', 0)
+        if ca != cb:
+            out['messages'][k] = (ca, cb, (mb or ma)['type'], (mb or ma)['title'])
+    for k in ('total_mass', 'total_added_mass', 'starter_memory_mb', 'restart_file_mb', 'elapsed_s',
+              'errors', 'warnings', 'termination'):
+        if a.get(k) != b.get(k):
+            out['values'][k] = (a.get(k), b.get(k))
+    return out
+
+
+def print_summary(s):
+    print(f"Listing: {s['file']}")
+    print(f"  {s.get('termination') or 'no termination line'}: "
+          f"{s.get('errors', '?')} error(s), {s.get('warnings', '?')} warning(s)")
+    for key, m in sorted(s['messages'].items(), key=lambda kv: (kv[1]['type'], -kv[1]['count'])):
+        ents = "; ".join(f"{k}: {', '.join(v[:8])}{' ...' if len(v) > 8 else ''}"
+                         for k, v in m['entities'].items() if 'TITLE' not in k)
+        print(f"  {m['type']:7s} {m['id']:7d} x{m['count']:<4d} {m['title'] or ''}" + (f"  [{ents}]" if ents else ""))
+    size = {k: v for k, v in s['counters'].items() if v}
+    print("  Model size: " + ", ".join(f"{k}={v}" for k, v in size.items()))
+    for name, t in s['time_steps'].items():
+        if 'dt_min' in t:
+            print(f"  {name}: min {t['dt_min']:.4E} s (id {t['id_min']})")
+    for key in ('total_mass', 'total_added_mass', 'starter_memory_mb', 'restart_file_mb', 'elapsed_s'):
+        if key in s:
+            print(f"  {key}: {s[key]}")
+
+
+def print_diff(d, a, b):
+    print(f"Diff: {a['file']} -> {b['file']}")
+    if not any(d.values()):
+        print("  no differences")
+    for k, (va, vb) in d['counters'].items():
+        delta = f" ({vb - va:+d})" if va is not None and vb is not None else ""
+        print(f"  {k:10s} {va} -> {vb}{delta}")
+    for k, (va, vb) in d['time_steps'].items():
+        ratio = f" (x{vb / va:.3f})" if va and vb else ""
+        print(f"  {k}: {va} -> {vb}{ratio}")
+    for k, (ca, cb, typ, title) in d['messages'].items():
+        print(f"  {typ} {k} {title or ''}: {ca} -> {cb}")
+    for k, (va, vb) in d['values'].items():
+        print(f"  {k}: {va} -> {vb}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Summarize / compare OpenRadioss starter listings")
+    ap.add_argument("listing", nargs="+", help="starter .out (or JSON summary with --diff)")
+    ap.add_argument("--json", default=None, help="write the summary (or diff) to this JSON file")
+    ap.add_argument("--diff", action="store_true", help="compare two listings")
+    args = ap.parse_args()
+    if args.diff:
+        if len(args.listing) != 2:
+            ap.error("--diff needs two listings")
+        a, b = (load_summary(p) for p in args.listing)
+        result = diff_summaries(a, b)
+        print_diff(result, a, b)
+    else:
+        result = [parse_listing(p) for p in args.listing]
+        for s in result:
+            print_summary(s)
+        if len(result) == 1:
+            result = result[0]
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
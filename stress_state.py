@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Stress-state post-processing of the animation frames
+
+write_engine_file requests /ANIM/ELEM/SIGX ... SIGZX for the fracture
+criteria; this module turns them into, per element:
+
+    Von_Mises          sqrt(3 J2)
+    Triaxiality        eta = sigma_m / sigma_vm
+    Lode_Parameter     normalized Lode angle 1 - (2/pi) arccos(27 J3 / (2 sigma_vm^3))
+    Sigma1..Sigma3     principal stresses (sigma1 >= sigma2 >= sigma3)
+
+The six components of a frame are read with fix_vtk.read_legacy_ascii
+(only those arrays are parsed), stacked into an (E,3,3) tensor and solved
+with one batched np.linalg.eigvalsh call. Frames are processed across a
+process pool; each worker appends the results as cell arrays to its frame
+and returns one summary row, so only one frame per worker is in memory.
+The rows go to a CSV table (one line per frame); a frame without stress
+arrays is reported and left out of the table. Non-finite values are fixed
+in place (fix_vtk.clean_vtk) before a frame is read, also with --no-arrays:
+the reader needs purely numeric data lines.
+
+Run on the ASCII frames written by anim_to_vtk (after fix_vtk.py, before any
+--binary conversion):
+
+    python stress_state.py "A*.vtk" [--table stress_state.csv] [--no-arrays]
+"""
+
+import csv
+import glob
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fix_vtk import CHUNK_BYTES, clean_vtk, read_legacy_ascii
+
+# Component suffixes of the /ANIM/ELEM/SIGxx arrays, e.g. SIGX, 3DELEM_Sigma_XY
+_COMPONENT_RE = re.compile(r'(?:^|_)(?:sig(?:ma)?|stress)_?\(?(xx|yy|zz|xy|yz|zx|xz|x|y|z)\)?$', re.I)
+_TENSOR_RE = re.compile(r'sig|stress', re.I)
+_COMPONENTS = {'x': 0, 'xx': 0, 'y': 1, 'yy': 1, 'z': 2, 'zz': 2, 'xy': 3, 'yz': 4, 'zx': 5, 'xz': 5}
+OUTPUT_ARRAYS = ('Von_Mises', 'Triaxiality', 'Lode_Parameter', 'Sigma1', 'Sigma2', 'Sigma3')
+TABLE_COLUMNS = ('frame', 'time', 'cells', 'loaded_cells', 'von_mises_max', 'sigma1_max',
+                 'cell_sigma1_max', 'sigma3_min', 'triaxiality_min', 'triaxiality_max',
+                 'lode_min', 'lode_max')
+
+
+def stress_invariants(sig):
+    """Invariants of (E,6) stresses [xx, yy, zz, xy, yz, zx] as a dict of (E,) arrays."""
+    sig = np.asarray(sig, dtype=np.float64)
+    xx, yy, zz, xy, yz, zx = sig.T
+    t = np.empty((len(sig), 3, 3))
+    t[:, 0, 0], t[:, 1, 1], t[:, 2, 2] = xx, yy, zz
+    t[:, 0, 1] = t[:, 1, 0] = xy
+    t[:, 1, 2] = t[:, 2, 1] = yz
+    t[:, 0, 2] = t[:, 2, 0] = zx
+    principal = np.linalg.eigvalsh(t)[:, ::-1]      # descending
+    mean = principal.mean(axis=1)
+    dev = principal - mean[:, None]
+    vm = np.sqrt(1.5 * np.sum(dev ** 2, axis=1))
+    j3 = np.prod(dev, axis=1)
+    loaded = vm > 0
+    safe = np.where(loaded, vm, 1.0)
+    xi = np.clip(np.where(loaded, 13.5 * j3 / safe ** 3, 0.0), -1.0, 1.0)
+    return {
+        'Von_Mises': vm,
+        'Triaxiality': np.where(loaded, mean / safe, 0.0),
+        'Lode_Parameter': np.where(loaded, 1.0 - 2.0 / np.pi * np.arccos(xi), 0.0),
+        'Sigma1': principal[:, 0],
+        'Sigma2': principal[:, 1],
+        'Sigma3': principal[:, 2],
+    }
+
+
+def _cell_arrays(sections):
+    """[(name, ncomp)] of the CELL_DATA arrays of a frame."""
+    out = []
+    cell = False
+    for line, _, _ in sections:
+        tok = line.split()
+        key = tok[0].upper()
+        if key in ('CELL_DATA', 'POINT_DATA'):
+            cell = key == 'CELL_DATA'
+        elif cell and key == 'SCALARS':
+            out.append((tok[1], int(tok[3]) if len(tok) > 3 else 1))
+        elif cell and key == 'TENSORS':
+            out.append((tok[1], 9))
+    return out
+
+
+def find_stress_arrays(sections, prefix=None):
+    """Names of the six stress components, or of a 9-component stress tensor."""
+    comps = {}
+    tensor = None
+    for name, ncomp in _cell_arrays(sections):
+        if prefix and not name.startswith(prefix):
+            continue
+        m = _COMPONENT_RE.search(name) if ncomp == 1 else None
+        if m:
+            k = _COMPONENTS[m.group(1).lower()]
+            # Prefer the solid (3D) arrays over the shell ones
+            if k not in comps or '3D' in name.upper():
+                comps[k] = name
+        elif ncomp == 9 and _TENSOR_RE.search(name) and tensor is None:
+            tensor = name
+    if len(comps) == 6:
+        return [comps[k] for k in range(6)]
+    if tensor:
+        return [tensor]
+    raise ValueError(f"no stress arrays found (cell arrays: {[n for n, _ in _cell_arrays(sections)]})")
+
+
+def _values_by_name(sections, names):
+    out = {}
+    name = None
+    for line, _, values in sections:
+        tok = line.split()
+        if tok[0].upper() in ('SCALARS', 'TENSORS'):
+            name = tok[1]
+        elif tok[0].upper() != 'LOOKUP_TABLE':
+            name = None
+        if values is not None and name in names:
+            out[name] = values
+    return out
+
+
+def read_stress(file_path, prefix=None, names=None):
+    """((E,6) stresses, frame time or None) of an ASCII legacy VTK frame;
+    names (from find_stress_arrays) saves the scan of the array headers."""
+    if names is None:
+        _, sections = read_legacy_ascii(file_path, names=())
+        names = find_stress_arrays(sections, prefix)
+    _, sections = read_legacy_ascii(file_path, names=set(names) | {'TIME'})
+    values = _values_by_name(sections, names)
+    if len(names) == 1:
+        t = values[names[0]].reshape(-1, 3, 3)
+        sig = np.stack([t[:, 0, 0], t[:, 1, 1], t[:, 2, 2], t[:, 0, 1], t[:, 1, 2], t[:, 0, 2]], axis=1)
+    else:
+        sig = np.stack([values[n] for n in names], axis=1)
+    time = next((v[0] for line, _, v in sections if line.split()[0] == 'TIME' and v is not None), None)
+    return sig, time
+
+
+def append_cell_arrays(file_path, arrays):
+    """Insert SCALARS cell arrays at the end of the CELL_DATA block (atomic rewrite)."""
+    tmp_path = file_path + '.tmp'
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        m = re.compile(rb'^CELL_DATA\b', re.M).search(mm)
+        if m is None:
+            raise ValueError(f"{file_path}: no CELL_DATA block")
+        nxt = re.compile(rb'^POINT_DATA\b', re.M).search(mm, m.end())
+        at = nxt.start() if nxt else len(mm)
+        try:
+            with open(tmp_path, 'wb') as out:
+                for a in range(0, at, CHUNK_BYTES):
+                    out.write(mm[a:min(at, a + CHUNK_BYTES)])
+                if at and mm[at - 1:at] != b'\n':
+                    out.write(b'\n')
+                for name, values in arrays.items():
+                    out.write(f"SCALARS {name} float 1\nLOOKUP_TABLE default\n".encode('ascii'))
+                    out.write((('%.6g\n' * len(values)) % tuple(values.tolist())).encode('ascii'))
+                for a in range(at, len(mm), CHUNK_BYTES):
+                    out.write(mm[a:min(len(mm), a + CHUNK_BYTES)])
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, file_path)
+
+
+def process_frame(file_path, write_arrays=True, prefix=None):
+    """Stress state of one frame; returns its table row (None when the frame
+    cannot be read or has no stress arrays)."""
+    try:
+        clean_vtk(file_path)
+        _, sections = read_legacy_ascii(file_path, names=())
+        done = {n for n, _ in _cell_arrays(sections)}
+        sig, time = read_stress(file_path, prefix, find_stress_arrays(sections, prefix))
+    except (OSError, ValueError) as e:
+        print(f"  {os.path.basename(file_path)}: skipped ({e})")
+        return None
+    res = stress_invariants(sig)
+    if write_arrays and not done.issuperset(OUTPUT_ARRAYS):
+        append_cell_arrays(file_path, {k: res[k] for k in OUTPUT_ARRAYS})
+    loaded = res['Von_Mises'] > 0
+    row = {'frame': os.path.basename(file_path), 'time': time, 'cells': len(sig),
+           'loaded_cells': int(loaded.sum())}
+    if loaded.any():
+        i = int(np.argmax(res['Sigma1']))
+        row.update({
+            'von_mises_max': float(res['Von_Mises'].max()),
+            'sigma1_max': float(res['Sigma1'][i]),
+            'cell_sigma1_max': i,
+            'sigma3_min': float(res['Sigma3'].min()),
+            'triaxiality_min': float(res['Triaxiality'][loaded].min()),
+            'triaxiality_max': float(res['Triaxiality'][loaded].max()),
+            'lode_min': float(res['Lode_Parameter'][loaded].min()),
+            'lode_max': float(res['Lode_Parameter'][loaded].max()),
+        })
+    print(f"  {row['frame']}: {row['loaded_cells']}/{row['cells']} loaded cells"
+          + (f", vm_max {row['von_mises_max']:.4E}, eta [{row['triaxiality_min']:.3f}, "
+             f"{row['triaxiality_max']:.3f}]" if loaded.any() else ""))
+    return row
+
+
+def _write_rows(writer, rows):
+    """Write the table rows; returns the number of skipped frames."""
+    skipped = 0
+    for row in rows:
+        if row is None:
+            skipped += 1
+        else:
+            writer.writerow(row)
+    return skipped
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Triaxiality / Lode / principal stresses of VTK frames")
+    ap.add_argument("patterns", nargs="*", default=["*.vtk"], help="files or glob patterns (default *.vtk)")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--table", default="stress_state.csv", help="per-frame summary table (CSV)")
+    ap.add_argument("--no-arrays", action="store_true",
+                    help="only write the table, no arrays added to the frames (non-finite values are still fixed)")
+    ap.add_argument("--prefix", default=None, help="only use stress arrays whose name starts with this")
+    args = ap.parse_args()
+    frames = sorted({p for pat in args.patterns for p in glob.glob(pat)})
+    if not frames:
+        print("No frames found")
+        return 1
+    workers = min(args.workers or os.cpu_count() or 1, len(frames))
+    n = len(frames)
+    with open(args.table, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS)
+        writer.writeheader()
+        if workers <= 1:
+            skipped = _write_rows(writer, (process_frame(p, not args.no_arrays, args.prefix) for p in frames))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map yields in frame order as the results arrive
+                skipped = _write_rows(writer, pool.map(process_frame, frames, [not args.no_arrays] * n,
+                                                       [args.prefix] * n))
+    print(f"Table written: {args.table} ({n - skipped} frames" + (f", {skipped} skipped)" if skipped else ")"))
+    return 1 if skipped == n else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Strip-model cutout (shearing knowledge doc, next step 1: "reduce model width
+to 1/6 or 1/8")
+
+Keeps the Punch / Material / Die / Stripper tets whose centroid lies inside a
+clipping box or a slab of given width, compacts node and element numbering,
+and returns the nodes on each cut plane as symmetry groups for
+write_starter_file (zero normal velocity via /IMPVEL).
+Element centroids are binned in a spatial_index.UniformGrid, so only the
+cells overlapping the slab are visited.
+"""
+
+import numpy as np
+
+from inp2radioss_v6 import ROLE_ELSETS
+from spatial_index import UniformGrid
+
+AXES = {'x': 0, 'y': 1, 'z': 2}
+# Directions already held by /IMPVEL in write_starter_file (Punch 1, Die 2-4,
+# Stripper 5): a cut plane of that normal must not add a zero velocity there
+DRIVEN_DIRS = {'PUNCH': 'Z', 'DIE': 'XYZ', 'STRIPPER': 'Z'}
+
+
+def role_of_elset(name):
+    for role, names in ROLE_ELSETS.items():
+        if name in names:
+            return role
+    return None
+
+
+def element_centroids(mesh):
+    """(E,3) centroids of all tets in the mesh (mm)."""
+    pos = np.searchsorted(mesh['node_ids'], mesh['conn'])
+    return mesh['coords'][pos].mean(axis=1)
+
+
+def row_elsets(mesh):
+    """(E,) index into mesh['elset_names'] for every element row."""
+    off = np.asarray(mesh['elset_offsets'])
+    return np.repeat(np.arange(len(off) - 1), np.diff(off))
+
+
+def subset_mesh(mesh, keep_rows, renumber=True):
+    """New mesh dict with only keep_rows (sorted row indices) and their nodes.
+    renumber=True compacts ids to 1..n; orig_node_ids / orig_elem_ids keep the
+    input ids either way."""
+    keep_rows = np.asarray(keep_rows, dtype=np.int64)
+    conn = np.asarray(mesh['conn'])[keep_rows]
+    used = np.unique(conn)
+    pos = np.searchsorted(mesh['node_ids'], used)
+    old_eids = np.asarray(mesh['elem_ids'])[keep_rows]
+    if renumber:
+        new_nids = np.arange(1, len(used) + 1, dtype=np.int64)
+        new_conn = np.searchsorted(used, conn) + 1
+        new_eids = np.arange(1, len(keep_rows) + 1, dtype=np.int64)
+    else:
+        new_nids, new_conn, new_eids = used, conn, old_eids
+    sets = row_elsets(mesh)[keep_rows]
+    counts = np.bincount(sets, minlength=len(mesh['elset_names']))
+    names = [n for n, c in zip(mesh['elset_names'], counts) if c]
+    types = mesh.get('elset_types')
+    out = {
+        'node_ids': new_nids,
+        'coords': np.asarray(mesh['coords'])[pos],
+        'elem_ids': new_eids,
+        'conn': new_conn,
+        'elset_names': names,
+        'elset_offsets': np.cumsum([0] + [int(c) for c in counts if c]).astype(np.int64),
+        'orig_node_ids': used,
+        'orig_elem_ids': old_eids,
+    }
+    if types is not None:
+        out['elset_types'] = [t for t, c in zip(types, counts) if c]
+    return out
+
+
+def slab_box(mesh, axis, width, center=None):
+    """Clipping box for a slab of `width` mm normal to `axis`, centred on
+    `center` (default: middle of the Material part)."""
+    a = AXES[axis.lower()]
+    if center is None:
+        sets = row_elsets(mesh)
+        mat = [k for k, n in enumerate(mesh['elset_names']) if role_of_elset(n) == 'MATERIAL']
+        rows = np.flatnonzero(np.isin(sets, mat)) if mat else np.arange(len(sets))
+        pts = mesh['coords'][np.searchsorted(mesh['node_ids'], np.unique(mesh['conn'][rows]))]
+        center = 0.5 * (pts[:, a].min() + pts[:, a].max())
+    lo = np.full(3, -np.inf)
+    hi = np.full(3, np.inf)
+    lo[a] = center - 0.5 * width
+    hi[a] = center + 0.5 * width
+    return lo, hi
+
+
+def clip_mesh(mesh, lo, hi, roles=('PUNCH', 'MATERIAL', 'DIE', 'STRIPPER')):
+    """Cut the mesh to the box [lo, hi] (mm, +-inf for unbounded axes).
+
+    Returns (strip_mesh, symmetry_groups, report). symmetry_groups lists the
+    compacted ids of the nodes shared by kept and removed tets, one group per
+    active cut plane, with the plane normal as IMPVEL direction. Nodes of
+    parts whose /IMPVEL already drives that direction (DRIVEN_DIRS) are left out.
+    """
+    lo = np.asarray(lo, dtype=np.float64)
+    hi = np.asarray(hi, dtype=np.float64)
+    cent = element_centroids(mesh)
+    sets = row_elsets(mesh)
+    set_roles = [role_of_elset(n) for n in mesh['elset_names']]
+    wanted = [k for k, r in enumerate(set_roles) if r in roles]
+    if not any(set_roles):
+        # No elset matches a role: write_starter_file converts all elements
+        # as one part (AllElements, driven like the Punch), so the cut keeps
+        # them all as well
+        wanted = list(range(len(set_roles)))
+        set_roles = ['PUNCH'] * len(set_roles)
+    in_role = np.isin(sets, wanted)
+
+    grid = UniformGrid(cent)
+    inside = np.zeros(len(cent), dtype=bool)
+    inside[grid.query_box(lo, hi)] = True
+    keep = np.flatnonzero(inside & in_role)
+    strip = subset_mesh(mesh, keep)
+
+    # Cut-plane nodes: used by a kept tet and by a removed tet of the same roles
+    removed = np.asarray(mesh['conn'])[~inside & in_role]
+    cut_old = np.intersect1d(strip['orig_node_ids'], removed)
+    pts = mesh['coords'][np.searchsorted(mesh['node_ids'], cut_old)]
+    # Nodes of driven parts, per direction (no symmetry condition on top of their /IMPVEL)
+    driven = {}
+    for d in 'XYZ':
+        rows = np.isin(sets, [k for k, r in enumerate(set_roles) if d in DRIVEN_DIRS.get(r, '')])
+        driven[d] = np.isin(cut_old, np.asarray(mesh['conn'])[rows])
+    planes = []
+    bb_lo = mesh['coords'].min(axis=0)
+    bb_hi = mesh['coords'].max(axis=0)
+    for a, name in enumerate('XYZ'):
+        if np.isfinite(lo[a]) and lo[a] > bb_lo[a]:
+            planes.append((f"Cut_{name}min_Nodes", name, a, lo[a]))
+        if np.isfinite(hi[a]) and hi[a] < bb_hi[a]:
+            planes.append((f"Cut_{name}max_Nodes", name, a, hi[a]))
+    groups = []
+    if planes and len(cut_old):
+        dist = np.stack([np.where(driven[d], np.inf, np.abs(pts[:, a] - v)) for _, d, a, v in planes], axis=1)
+        nearest = dist.argmin(axis=1)
+        nearest[~np.isfinite(dist.min(axis=1))] = -1
+        new_ids = np.searchsorted(strip['orig_node_ids'], cut_old) + 1
+        for k, (gname, direction, _, _) in enumerate(planes):
+            groups.append({'name': gname, 'dir': direction, 'nodes': new_ids[nearest == k]})
+
+    n_before = int(in_role.sum())
+    n_after = len(keep)
+    report = {
+        'elements_before': n_before,
+        'elements_after': n_after,
+        'nodes_after': len(strip['node_ids']),
+        'per_part': {},
+        'cut_nodes': {g['name']: len(g['nodes']) for g in groups},
+        # Explicit cost ~ elements x cycles; the time step is unchanged by the cut
+        'estimated_speedup': n_before / n_after if n_after else float('inf'),
+    }
+    for k, name in enumerate(mesh['elset_names']):
+        if k in wanted:
+            report['per_part'][name] = (int(np.sum(sets == k)), int(np.sum(sets[keep] == k)))
+    return strip, groups, report
+
+
+def print_report(report, lo, hi):
+    box = ", ".join(f"{a.upper()} [{l:.3f}, {h:.3f}]" for a, l, h in zip('xyz', lo, hi)
+                    if np.isfinite(l) or np.isfinite(h))
+    print(f"  Strip model: {box} mm")
+    for name, (before, after) in report['per_part'].items():
+        print(f"    {name}: {before} -> {after} tets")
+    for name, n in report['cut_nodes'].items():
+        print(f"    {name}: {n} nodes (zero normal velocity)")
+    print(f"  Elements {report['elements_before']} -> {report['elements_after']}, "
+          f"estimated speedup {report['estimated_speedup']:.1f}x")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Mirror-symmetry detection and half / quarter models
+
+Punch / die set-ups are often symmetric about the X and/or Y mid-plane of
+the Material (Z is the stroke direction and never a symmetry plane).
+detect_planes() mirrors every part (elset) on its own about each candidate
+plane and looks the mirrored nodes up in a spatial_index.UniformGrid of the
+same part: a part passes when every mirrored node lands within tol of one of
+its nodes, and a plane is accepted only when all parts pass.
+
+symmetric_model() cuts the mesh on the accepted planes with
+strip_model.clip_mesh (the + side is kept); the cut-plane nodes come back as
+symmetry groups with zero normal velocity (/IMPVEL). Element count and wall
+time drop to about 1/2 (one plane) or 1/4 (two planes). Reaction and contact
+forces, masses and energies of the cut model are the same fraction of the
+full model: force_factor (2 or 4) is written to <deck>_symmetry.json so that
+post-processing can scale them back.
+
+    python symmetry.py deck.inp [--tol 0.001]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from mesh_cache import write_json
+from spatial_index import UniformGrid
+from strip_model import AXES, clip_mesh, role_of_elset, row_elsets
+
+SYMMETRY_TOL = 1.0e-3       # mm, mirrored node to its partner
+ROLES = ('PUNCH', 'MATERIAL', 'DIE', 'STRIPPER')
+
+
+def material_center(mesh):
+    """(3,) centre of the Material bounding box (whole mesh without Material)."""
+    sets = row_elsets(mesh)
+    mat = [k for k, n in enumerate(mesh['elset_names']) if role_of_elset(n) == 'MATERIAL']
+    rows = np.flatnonzero(np.isin(sets, mat)) if mat else np.arange(len(sets))
+    pts = mesh['coords'][np.searchsorted(mesh['node_ids'], np.unique(mesh['conn'][rows]))]
+    return 0.5 * (pts.min(axis=0) + pts.max(axis=0))
+
+
+def part_points(mesh, roles=ROLES):
+    """{elset name: (N,3) coords of its nodes} for the parts of the given roles."""
+    sets = row_elsets(mesh)
+    out = {}
+    for k, name in enumerate(mesh['elset_names']):
+        if role_of_elset(name) in roles:
+            used = np.unique(mesh['conn'][sets == k])
+            out[name] = mesh['coords'][np.searchsorted(mesh['node_ids'], used)]
+    return out
+
+
+def mirror_error(pts, axis, center, tol):
+    """Largest distance (mm) from a mirrored node to the nearest node of the
+    same cloud; np.inf when some mirrored node has no partner within tol."""
+    if len(pts) == 0:
+        return 0.0
+    mirrored = pts.copy()
+    mirrored[:, axis] = 2.0 * center - mirrored[:, axis]
+    # Bounding boxes first: most asymmetric parts fail here without a lookup
+    if np.any(np.abs(mirrored.min(axis=0) - pts.min(axis=0)) > tol) or \
+            np.any(np.abs(mirrored.max(axis=0) - pts.max(axis=0)) > tol):
+        return np.inf
+    return float(UniformGrid(pts).nearest_distance(mirrored, tol).max())
+
+
+def detect_planes(mesh, tol=SYMMETRY_TOL, axes='xy', roles=ROLES):
+    """Test the Material mid-planes normal to `axes`.
+
+    Returns {'center', 'tol', 'planes': accepted axes, 'parts': {name: {axis:
+    worst distance or inf}}}; the first failing part ends the test of a plane.
+    """
+    center = material_center(mesh)
+    parts = part_points(mesh, roles)
+    report = {'center': center.tolist(), 'tol': tol, 'planes': [],
+              'parts': {name: {} for name in parts}}
+    for axis in axes:
+        a = AXES[axis]
+        ok = bool(parts)
+        for name, pts in parts.items():
+            err = mirror_error(pts, a, center[a], tol)
+            report['parts'][name][axis] = err
+            if not np.isfinite(err):
+                ok = False
+                break
+        if ok:
+            report['planes'].append(axis)
+    return report
+
+
+def symmetric_model(mesh, planes, center, roles=ROLES):
+    """Cut the mesh on the planes (axes through center), keeping the + side.
+    Returns (mesh, symmetry_groups, report) like strip_model.clip_mesh, with
+    the cut-plane groups named Symmetry_X_Nodes / Symmetry_Y_Nodes and
+    report['force_factor'] = full model / cut model."""
+    lo = np.full(3, -np.inf)
+    hi = np.full(3, np.inf)
+    for axis in planes:
+        lo[AXES[axis]] = center[AXES[axis]]
+    cut, groups, report = clip_mesh(mesh, lo, hi, roles)
+    # clip_mesh gives each cut node to its nearest plane only; nodes on the
+    # X/Y intersection line need the zero normal velocity of both planes
+    offset = 0.0
+    if groups:
+        nodes = np.unique(np.concatenate([g['nodes'] for g in groups]))
+        axes = [AXES[g['dir'].lower()] for g in groups]
+        xyz = cut['coords'][nodes - 1]
+        dist = np.stack([np.abs(xyz[:, a] - center[a]) for a in axes], axis=1)
+        nearest = dist.min(axis=1)
+        offset = float(nearest.max()) if len(nodes) else 0.0
+        for k, grp in enumerate(groups):
+            grp['name'] = f"Symmetry_{grp['dir']}_Nodes"
+            grp['nodes'] = nodes[dist[:, k] <= nearest + SYMMETRY_TOL]
+    report['cut_nodes'] = {g['name']: len(g['nodes']) for g in groups}
+    report['planes'] = list(planes)
+    report['center'] = [float(center[AXES[axis]]) for axis in planes]
+    report['force_factor'] = 2 ** len(planes)
+    # Tets are not split: cut nodes off the plane get the zero normal velocity too
+    report['max_plane_offset'] = offset
+    return cut, groups, report
+
+
+def write_sidecar(path, report):
+    """<deck>_symmetry.json: planes, centre (mm) and force_factor for post-processing."""
+    write_json(path, {'planes': report['planes'], 'center_mm': report['center'],
+                      'force_factor': report['force_factor']})
+
+
+def print_detection(report):
+    c = report['center']
+    print(f"  Symmetry: Material centre X {c[0]:.4f}  Y {c[1]:.4f} mm, tol {report['tol']:g} mm")
+    for name, errs in report['parts'].items():
+        cols = "  ".join(f"{a.upper()} " + (f"{e:.2E} mm" if np.isfinite(e) else "no match")
+                         for a, e in errs.items())
+        print(f"    {name:40s} {cols}")
+    if report['planes']:
+        print(f"  Symmetry planes: {', '.join(a.upper() for a in report['planes'])}")
+    else:
+        print("  No symmetry plane found, full model kept")
+
+
+def print_report(report):
+    name = {1: 'Half', 2: 'Quarter'}.get(len(report['planes']), 'Full')
+    print(f"  {name} model on " + ", ".join(f"{a.upper()} = {c:.4f} mm"
+                                           for a, c in zip(report['planes'], report['center'])))
+    for part, (before, after) in report['per_part'].items():
+        print(f"    {part}: {before} -> {after} tets")
+    for group, n in report['cut_nodes'].items():
+        print(f"    {group}: {n} nodes (zero normal velocity)")
+    if report['max_plane_offset'] > 0:
+        print(f"    cut nodes up to {report['max_plane_offset']:.4f} mm off the plane (tets not split)")
+    print(f"  Elements {report['elements_before']} -> {report['elements_after']}, "
+          f"estimated speedup {report['estimated_speedup']:.1f}x; "
+          f"forces and energies x{report['force_factor']} for the full model")
+
+
+def main():
+    from mesh_cache import load_mesh
+    ap = argparse.ArgumentParser(description="Detect mirror-symmetry planes of a punch/die deck")
+    ap.add_argument("inp_path")
+    ap.add_argument("--tol", type=float, default=SYMMETRY_TOL, help="node match tolerance (mm)")
+    args = ap.parse_args()
+    mesh = load_mesh(args.inp_path)
+    report = detect_planes(mesh, args.tol)
+    print_detection(report)
+    if report['planes']:
+        _, _, cut = symmetric_model(mesh, report['planes'], np.asarray(report['center']))
+        print_report(cut)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
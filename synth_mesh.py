@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Synthetic punch / die C3D4 decks for benchmarks
+
+Writes a blanking set-up with the production elset names, so every tool
+treats it like a real deck:
+
+    From_parts-Material         plate 20 x 10 x 1 mm at z = 0 .. 1
+    From_parts-Die              two blocks under the plate, 4 mm opening
+    Solid_part-Punch_Hole       punch over the opening (0.05 mm clearance,
+    Solid_part-Punch_Trim       0.3 mm above the plate), split in y
+    From_parts-Punch_Rectangle  punch holder on top
+    From_parts-Stripper         blocks on the plate beside the punch
+
+Every box is a structured grid of cubes cut into 6 tets (one cube
+diagonal, so the tets are conforming); the cube size is chosen for the
+requested total tet count (10^4 .. 10^7). Parts do not share nodes.
+Writing is chunked and vectorized, a 10^7 tet deck takes well under a minute.
+
+    python synth_mesh.py out.inp 1e6
+"""
+
+import sys
+
+import numpy as np
+
+PLATE = (20.0, 10.0, 1.0)           # Material x, y, z size (mm)
+GAP = 0.3                           # punch above the plate
+CLEARANCE = 0.05                    # punch / die clearance
+ROWS_PER_CHUNK = 1 << 16
+# Unit-cube corners and the 6 tets around the 0-6 diagonal
+CORNERS = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)])
+CUBE_TETS = np.array([(0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6)])
+
+
+def _positive_tets():
+    """CUBE_TETS with the node order flipped where the volume is negative."""
+    tets = CUBE_TETS.copy()
+    p = CORNERS[tets].astype(np.float64)
+    vol = np.einsum('ij,ij->i', np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]), p[:, 3] - p[:, 0])
+    tets[vol < 0] = tets[vol < 0][:, [0, 2, 1, 3]]
+    return tets
+
+
+def layout(w=PLATE[0], d=PLATE[1], t=PLATE[2]):
+    """[(elset, [(lo, hi), ...])] boxes of the set-up (mm)."""
+    x0, x1 = 0.4 * w, 0.6 * w                       # die opening
+    top = t + GAP
+    return [
+        ('Solid_part-Punch_Hole', [((x0 + CLEARANCE, 0.0, top), (x1 - CLEARANCE, d / 2, top + 3.0))]),
+        ('Solid_part-Punch_Trim', [((x0 + CLEARANCE, d / 2, top), (x1 - CLEARANCE, d, top + 3.0))]),
+        ('From_parts-Material', [((0.0, 0.0, 0.0), (w, d, t))]),
+        ('From_parts-Stripper', [((0.0, 0.0, t), (x0 - 0.1, d, t + 1.0)), ((x1 + 0.1, 0.0, t), (w, d, t + 1.0))]),
+        ('From_parts-Die', [((0.0, 0.0, -4.0), (x0, d, 0.0)), ((x1, 0.0, -4.0), (w, d, 0.0))]),
+        ('From_parts-Punch_Rectangle', [((x0 + CLEARANCE, 0.0, top + 3.0), (x1 - CLEARANCE, d, top + 4.0))]),
+    ]
+
+
+def box_mesh(lo, hi, h):
+    """(coords (N,3), conn (E,4) 0-based) of a tet grid with cells of about h."""
+    lo = np.asarray(lo, dtype=np.float64)
+    hi = np.asarray(hi, dtype=np.float64)
+    n = np.maximum(1, np.round((hi - lo) / h)).astype(np.int64)
+    axes = [np.linspace(lo[k], hi[k], n[k] + 1) for k in range(3)]
+    coords = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    i, j, k = (a.ravel() for a in np.meshgrid(*(np.arange(m) for m in n), indexing='ij'))
+    corner = ((i[:, None] + CORNERS[:, 0]) * (n[1] + 1) + j[:, None] + CORNERS[:, 1]) * (n[2] + 1) \
+        + k[:, None] + CORNERS[:, 2]
+    conn = corner[:, _positive_tets()].reshape(-1, 4)
+    return coords, conn
+
+
+def cell_size(target_tets, parts):
+    vol = sum(float(np.prod(np.subtract(hi, lo))) for _, boxes in parts for lo, hi in boxes)
+    return (6.0 * vol / target_tets) ** (1.0 / 3.0)
+
+
+def _write_rows(f, fmt, table):
+    for a in range(0, len(table), ROWS_PER_CHUNK):
+        chunk = table[a:a + ROWS_PER_CHUNK]
+        f.write((fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def write_deck(path, target_tets):
+    """Write the deck; returns (nodes, elements) counts."""
+    parts = layout()
+    h = cell_size(target_tets, parts)
+    meshes = []
+    nid = 1
+    for name, boxes in parts:
+        for lo, hi in boxes:
+            coords, conn = box_mesh(lo, hi, h)
+            meshes.append((name, nid, coords, conn + nid))
+            nid += len(coords)
+    with open(path, 'w') as f:
+        f.write("*Heading\n** synthetic punch/die deck (synth_mesh.py)\n*Node\n")
+        for _, n0, coords, _ in meshes:
+            ids = np.arange(n0, n0 + len(coords))
+            table = np.empty(len(coords), dtype=[('id', 'i8'), ('x', 'f8'), ('y', 'f8'), ('z', 'f8')])
+            table['id'], table['x'], table['y'], table['z'] = ids, coords[:, 0], coords[:, 1], coords[:, 2]
+            for a in range(0, len(coords), ROWS_PER_CHUNK):
+                rows = table[a:a + ROWS_PER_CHUNK].tolist()
+                f.write(("%7d, %.6f, %.6f, %.6f\n" * len(rows)) % tuple(v for r in rows for v in r))
+        eid = 1
+        for name in dict.fromkeys(p[0] for p in parts):
+            f.write(f"*Element, Type=C3D4, Elset={name}\n")
+            for part, _, _, conn in meshes:
+                if part == name:
+                    _write_rows(f, "%d, %d, %d, %d, %d\n",
+                                np.column_stack([np.arange(eid, eid + len(conn)), conn]))
+                    eid += len(conn)
+        die = [(n0, n0 + len(c) - 1) for part, n0, c, _ in meshes if part == 'From_parts-Die']
+        f.write("*Nset, Nset=Node_Set-Die, generate\n" + "".join(f"{a}, {b}, 1\n" for a, b in die))
+        f.write("*Step\n*Static\n*Node Output\nU, RF\n*End Step\n")
+    return nid - 1, eid - 1
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python synth_mesh.py out.inp TETS   (e.g. 1e6)")
+        return 1
+    nodes, elems = write_deck(sys.argv[1], int(float(sys.argv[2])))
+    print(f"{sys.argv[1]}: {nodes} nodes, {elems} tets")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
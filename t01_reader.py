@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped reader for the engine time-history file (<deck>T01)
+
+The T01 is a sequential Fortran file (big-endian on the Windows and Linux
+builds): every record is framed by its byte length. The header holds
+
+    version code + run title, date / build string
+    NPART NUMMAT NUMGEO NSUBS NTHGRP NGLOB, the global variable numbers
+    parts (id, title, material / property index, variable numbers),
+    materials and properties (id, title), subsets, /TH groups
+
+followed by one block of records per output step: time, global variables,
+then the part, subset and group values when there are any. The layout of
+the first step is measured and every channel is returned as a strided
+NumPy view into the mapped file: nothing is copied or converted until a
+channel is used, channel[::k] downsamples for free, and opening a run with
+millions of steps only reads the header. A step cut off at the end of a
+running or crashed job is ignored.
+
+Titles are 40 characters in the 3040 format written here; the title length
+is taken from the record lengths, so longer titles work as well.
+
+force_stroke() gives the punch force against the /FUNCT/1 stroke; without
+a force channel it is d(EXTERNAL WORK)/d(stroke): the punch is the only
+driven part once the stripper has stopped, so the work rate is the punch
+force. The full-model factor of a symmetry cut (<deck>_symmetry.json) is
+applied.
+
+    python t01_reader.py ASSY_..._T01 [--channel NAME ...] [--every 10] [--csv out.csv]
+    python t01_reader.py --compare runs/*/ASSY_*T01 [--csv force_stroke.csv]
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import sys
+
+import numpy as np
+
+# Global variables in T01 order (NGLOB record numbers 1..)
+GLOBAL_NAMES = ['INTERNAL ENERGY', 'KINETIC ENERGY', 'X-MOMENTUM', 'Y-MOMENTUM', 'Z-MOMENTUM', 'MASS',
+                'TIME STEP', 'ROTATION ENERGY', 'EXTERNAL WORK', 'SPRING ENERGY', 'CONTACT ENERGY',
+                'HOURGLASS ENERGY', 'ELASTIC CONTACT ENERGY', 'FRICTIONAL CONTACT ENERGY',
+                'DAMPING CONTACT ENERGY', 'PLASTIC WORK']
+# Part / subset variables (IE KE XMOM YMOM ZMOM MASS HE)
+PART_NAMES = ['IE', 'KE', 'XMOM', 'YMOM', 'ZMOM', 'MASS', 'HE']
+MAX_LAYOUT_RECORDS = 100000     # records scanned to find the length of one output step
+WORK_POINTS = 2000              # at most this many samples for d(EXTERNAL WORK)/d(stroke)
+
+
+class T01:
+    """Header and lazily mapped channels of one T01 file (use as a context manager)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < 8:
+            self._file.close()
+            raise ValueError(f"{path}: not a time-history file")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        first = int.from_bytes(self._mm[:4], 'big')
+        self.endian = '>' if 0 < first < (1 << 20) else '<'
+        self._int = np.dtype(self.endian + 'i4')
+        self._parse_header()
+        self._parse_layout()
+
+    # -- Fortran records ----------------------------------------------------
+    def _record(self, pos):
+        """(data offset, length, next record offset) of the record at pos."""
+        n = int(np.frombuffer(self._mm, self._int, 1, pos)[0])
+        end = pos + 4 + n
+        if n < 0 or end + 4 > len(self._mm) or int(np.frombuffer(self._mm, self._int, 1, end)[0]) != n:
+            raise ValueError(f"{self.path}: broken record at byte {pos}")
+        return pos + 4, n, end + 4
+
+    def _ints(self, start, count):
+        return np.frombuffer(self._mm, self._int, count, start).tolist()
+
+    def _text(self, start, length):
+        return self._mm[start:start + length].decode('latin-1').strip()
+
+    def _id_title(self, pos, head=1, tail=0, title_len=None):
+        """(ints before the title, title, ints after it, next offset)."""
+        start, n, pos = self._record(pos)
+        tl = n - 4 * (head + tail) if title_len is None else title_len
+        ints = self._ints(start, head)
+        after = self._ints(start + 4 * head + tl, tail) if tail else []
+        return ints, self._text(start + 4 * head, tl), after, pos
+
+    def _parse_header(self):
+        start, n, pos = self._record(0)
+        self.version = self._ints(start, 1)[0]
+        self.title = self._text(start + 4, n - 4)
+        start, n, pos = self._record(pos)
+        self.build = self._text(start, n)
+        start, n, pos = self._record(pos)
+        npart, nmat, ngeo, nsubs, nthgrp, nglob = self._ints(start, 6)
+        self.global_vars = []
+        if nglob:
+            start, n, pos = self._record(pos)
+            self.global_vars = self._ints(start, nglob)
+        self.parts = []
+        for _ in range(npart):
+            (pid,), title, (_, imat, igeo, nvar), pos = self._id_title(pos, 1, 4)
+            part = {'id': pid, 'title': title, 'mat': imat, 'prop': igeo, 'vars': []}
+            if nvar:
+                start, n, pos = self._record(pos)
+                part['vars'] = self._ints(start, nvar)
+            self.parts.append(part)
+        self.materials = []
+        for _ in range(nmat):
+            (mid,), title, _, pos = self._id_title(pos)
+            self.materials.append({'id': mid, 'title': title})
+        self.properties = []
+        for _ in range(ngeo):
+            (gid,), title, _, pos = self._id_title(pos)
+            self.properties.append({'id': gid, 'title': title})
+        # Title length of this build (first record: version + run title)
+        title_len = self._record(0)[1] - 4
+        self.subsets = []
+        for _ in range(nsubs):
+            # id, child subset and part counts (one record each), variable count
+            ints, title, _, pos = self._id_title(pos, 5)
+            sub = {'id': ints[0], 'title': title, 'lists': [], 'vars': []}
+            for count in ints[1:3]:
+                if count:
+                    start, n, pos = self._record(pos)
+                    sub['lists'].append(self._ints(start, count))
+            if ints[3]:
+                start, n, pos = self._record(pos)
+                sub['vars'] = self._ints(start, ints[3])
+            self.subsets.append(sub)
+        self.groups = []
+        for _ in range(nthgrp):
+            # id, type, ..., element count, variable count; then the elements and the variable numbers
+            start, n, pos = self._record(pos)
+            grp_len = n
+            ints = self._ints(start, 5)
+            grp = {'id': ints[0], 'type': ints[1], 'title': self._text(start + 20, grp_len - 20),
+                   'elements': [], 'vars': []}
+            for _ in range(ints[3]):
+                (eid,), title, _, pos = self._id_title(pos, 1, 0, title_len)
+                grp['elements'].append({'id': eid, 'title': title})
+            if ints[4]:
+                start, n, pos = self._record(pos)
+                grp['vars'] = self._ints(start, ints[4])
+            self.groups.append(grp)
+        self.data_offset = pos
+
+    def _parse_layout(self):
+        """Record lengths of one output step and the channel table."""
+        lengths, pos = [], self.data_offset
+        while pos < len(self._mm) and len(lengths) < MAX_LAYOUT_RECORDS:
+            try:
+                _, n, pos = self._record(pos)
+            except ValueError:
+                break
+            lengths.append(n)
+        if not lengths:
+            self.steps, self.step_bytes, self.record_lengths, self._columns = 0, 0, [], {}
+            self.value_size = 4
+            return
+        # Smallest period of the record-length sequence = one step
+        period = len(lengths)
+        for p in range(1, len(lengths)):
+            if lengths[p:] == lengths[:len(lengths) - p]:
+                period = p
+                break
+        self.record_lengths = lengths[:period]
+        self.value_size = lengths[0]
+        self.step_bytes = sum(n + 8 for n in self.record_lengths)
+        steps = (len(self._mm) - self.data_offset) // self.step_bytes
+        # Every step must start with the time record marker
+        marker = np.ndarray((steps,), self._int, self._mm, self.data_offset, (self.step_bytes,))
+        bad = np.flatnonzero(marker != self.value_size)
+        self.steps = int(bad[0]) if len(bad) else steps
+        self._columns = self._channel_table()
+
+    def _channel_table(self):
+        """{name: byte offset inside a step}."""
+        vs = self.value_size
+        blocks = [('global', [GLOBAL_NAMES[v - 1] if 0 < v <= len(GLOBAL_NAMES) else f"GLOBAL {v}"
+                              for v in self.global_vars])]
+        names = []
+        for p in self.parts:
+            names += [f"PART {p['id']} {p['title']}/" + _var_name(v) for v in p['vars']]
+        blocks.append(('part', names))
+        names = []
+        for s in self.subsets:
+            names += [f"SUBSET {s['title']}/" + _var_name(v) for v in s['vars']]
+        blocks.append(('subset', names))
+        names = []
+        for g in self.groups:
+            for e in g['elements']:
+                names += [f"{g['title']}/{e['title'] or e['id']}/{v}" for v in g['vars']]
+        blocks.append(('group', names))
+        blocks = [(kind, names) for kind, names in blocks if names]
+
+        columns = {'TIME': 4}
+        offset = self.record_lengths[0] + 8
+        known = [len(names) * vs for _, names in blocks]
+        for k, n in enumerate(self.record_lengths[1:]):
+            if known[:1] == [n]:
+                names = blocks.pop(0)[1]
+                known.pop(0)
+            else:
+                names = [f"RECORD {k + 1}/{j}" for j in range(n // vs)]
+            for j, name in enumerate(names):
+                columns.setdefault(name, offset + 4 + j * vs)
+            offset += n + 8
+        return columns
+
+    # -- channels ------------------------------------------------------------
+    @property
+    def channels(self):
+        return list(self._columns)
+
+    def channel(self, name, step=1):
+        """Strided view of one channel (no copy); step > 1 downsamples."""
+        if name not in self._columns:
+            raise KeyError(f"channel '{name}' not in {self.path}")
+        dtype = np.dtype(self.endian + ('f4' if self.value_size == 4 else 'f8'))
+        view = np.ndarray((self.steps,), dtype, self._mm, self.data_offset + self._columns[name],
+                          (self.step_bytes,))
+        return view[::step]
+
+    def __getitem__(self, name):
+        return self.channel(name)
+
+    @property
+    def time(self):
+        return self.channel('TIME')
+
+    def part_names(self):
+        """[(part title, material title, property title)]"""
+        def title(table, k):
+            return table[k - 1]['title'] if 0 < k <= len(table) else ''
+        return [(p['title'], title(self.materials, p['mat']), title(self.properties, p['prop']))
+                for p in self.parts]
+
+    def close(self):
+        # Views handed out keep the mapping alive; only close when none are left
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _var_name(v):
+    return PART_NAMES[v - 1] if 0 < v <= len(PART_NAMES) else str(v)
+
+
+def stroke_curve(t, points=None):
+    """Punch stroke (mm) at the times t (s) of a piecewise-linear (t, v m/s) table."""
+    if points is None:
+        from inp2radioss_v6 import PUNCH_VELOCITY
+        points = PUNCH_VELOCITY
+    tk = np.array([p[0] for p in points], dtype=np.float64)
+    vk = np.array([p[1] for p in points], dtype=np.float64)
+    cum = np.concatenate([[0.0], np.cumsum(0.5 * (vk[1:] + vk[:-1]) * np.diff(tk))])
+    t = np.asarray(t, dtype=np.float64)
+    i = np.clip(np.searchsorted(tk, t, side='right') - 1, 0, len(tk) - 1)
+    v = np.interp(t, tk, vk)
+    return 1000.0 * np.abs(cum[i] + 0.5 * (vk[i] + v) * (t - tk[i]))
+
+
+def force_factor(t01_path):
+    """Full-model factor from <deck>_symmetry.json next to <deck>T01 (1 when absent)."""
+    base = re.sub(r'_?T\d\d$', '', os.path.basename(t01_path))
+    path = os.path.join(os.path.dirname(t01_path), f"{base}_symmetry.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return float(json.load(f).get('force_factor', 1))
+    except (OSError, ValueError):
+        return 1.0
+
+
+def force_stroke(th, channel=None, step=1, factor=1.0):
+    """(stroke mm, force N) of a run; force from `channel` or d(EXTERNAL WORK)/d(stroke)."""
+    if not channel:
+        # Time and work are single precision: differentiating millions of
+        # steps would only show their round-off, so the work is sampled coarser
+        step = max(step, -(-th.steps // WORK_POINTS))
+    t = np.asarray(th.channel('TIME', step), dtype=np.float64)
+    s = stroke_curve(t)
+    if channel:
+        return s, factor * np.asarray(th.channel(channel, step), dtype=np.float64)
+    w = np.asarray(th.channel('EXTERNAL WORK', step), dtype=np.float64)
+    moving = np.concatenate([[False], np.diff(s) > 0])
+    s, w = s[moving], w[moving]
+    if len(s) < 2:
+        return s, np.zeros(len(s))
+    # J per m = N; the stroke is in mm
+    return s, factor * np.abs(np.gradient(w, s / 1000.0))
+
+
+def compare_runs(paths, channel=None, step=1, points=200):
+    """Per-run peak force table and the curves on a common stroke grid."""
+    runs = []
+    for path in paths:
+        with T01(path) as th:
+            factor = force_factor(path)
+            s, f = force_stroke(th, channel, step, factor)
+            s, f = s.copy(), f.copy()
+            runs.append({'path': path, 'steps': th.steps, 'factor': factor, 'stroke': s, 'force': f,
+                         't_end': float(th.time[-1]) if th.steps else 0.0})
+    top = max((r['stroke'].max() for r in runs if len(r['stroke'])), default=0.0)
+    grid = np.linspace(0.0, top, points)
+    for r in runs:
+        ok = len(r['stroke']) > 1
+        r['peak'] = float(r['force'].max()) if ok else 0.0
+        r['stroke_at_peak'] = float(r['stroke'][np.argmax(r['force'])]) if ok else 0.0
+        r['on_grid'] = np.interp(grid, r['stroke'], r['force'], left=np.nan, right=np.nan) if ok \
+            else np.full(points, np.nan)
+    return grid, runs
+
+
+def write_curves(path, grid, runs):
+    with open(path, 'w') as f:
+        f.write("stroke_mm," + ",".join(os.path.dirname(r['path']) or r['path'] for r in runs) + "\n")
+        table = np.column_stack([grid] + [r['on_grid'] for r in runs])
+        np.savetxt(f, table, delimiter=',', fmt='%.6g')
+    print(f"Force-stroke curves written: {path}")
+
+
+def print_header(th):
+    print(f"{th.path}: {th.title}")
+    print(f"  format {th.version}, {th.build}")
+    print(f"  {th.steps} steps, {th.step_bytes} bytes per step, "
+          f"t = {float(th.time[0]) if th.steps else 0:.4E} .. {float(th.time[-1]) if th.steps else 0:.4E} s")
+    for (part, mat, prop), p in zip(th.part_names(), th.parts):
+        print(f"  part {p['id']:5d} {part:30s} {mat:24s} {prop}")
+    for g in th.groups:
+        print(f"  group {g['id']} {g['title']}: {len(g['elements'])} objects x {len(g['vars'])} variables")
+    print(f"  {len(th.channels)} channels")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Read OpenRadioss T01 time-history files")
+    ap.add_argument("files", nargs="+", help="T01 files (glob patterns are expanded)")
+    ap.add_argument("--channel", action="append", default=None, help="channel to print / export (repeatable)")
+    ap.add_argument("--every", type=int, default=1, help="keep every N-th step")
+    ap.add_argument("--csv", default=None, help="write the channels (or the compared curves) to this CSV")
+    ap.add_argument("--list", action="store_true", help="list the channel names")
+    ap.add_argument("--compare", action="store_true",
+                    help="force-stroke comparison of several runs (force: --channel or d(EXTERNAL WORK)/d(stroke))")
+    args = ap.parse_args()
+    paths = [p for pat in args.files for p in (sorted(glob.glob(pat)) or [pat])]
+    step = max(1, args.every)
+    if args.compare:
+        channel = args.channel[0] if args.channel else None
+        grid, runs = compare_runs(paths, channel, step)
+        print(f"  {'run':50s} {'steps':>9s} {'factor':>6s} {'peak N':>12s} {'at mm':>8s}")
+        for r in runs:
+            print(f"  {r['path']:50s} {r['steps']:9d} {r['factor']:6g} {r['peak']:12.4E} {r['stroke_at_peak']:8.4f}")
+        if args.csv:
+            write_curves(args.csv, grid, runs)
+        return 0
+    for path in paths:
+        with T01(path) as th:
+            print_header(th)
+            if args.list:
+                for name in th.channels:
+                    print(f"    {name}")
+            names = args.channel or []
+            if names and args.csv:
+                table = np.column_stack([th.channel(n, step) for n in ['TIME'] + names])
+                with open(args.csv, 'w') as f:
+                    f.write(",".join(['TIME'] + names) + "\n")
+                    np.savetxt(f, table, delimiter=',', fmt='%.7g')
+                print(f"Channels written: {args.csv}")
+            elif names:
+                for n in names:
+                    v = th.channel(n, step)
+                    print(f"  {n}: {len(v)} values, min {v.min():.4E}, max {v.max():.4E}, last {v[-1]:.4E}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())